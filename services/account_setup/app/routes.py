@@ -67,7 +67,7 @@ class ConfirmRequest(BaseModel):
 	Accepts an email address and optional workspace ID. Returns status and email_confirmation_status. In dev mode, does not hit the DB.
 	"""
 )
-async def signup(data: SignupRequest, db: Session = Depends(get_db)):
+def signup(data: SignupRequest, db: Session = Depends(get_db)):
 	logger.info(f"Signup attempt: {data}")
 	
 	# Validate email
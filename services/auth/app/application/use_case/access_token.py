@@ -0,0 +1,37 @@
+from typing import Optional
+
+from app.common.config import Config
+from app.common.utility import generate_token
+from app.common.signed_token import SignedClaims, sign_access_token
+
+DEFAULT_SIGNED_ACCESS_TOKEN_TTL = 300
+
+
+def signed_tokens_enabled(config: Config) -> bool:
+    return config.get("ACCESS_TOKEN_FORMAT", "opaque").lower() == "signed"
+
+
+def access_token_ttl(config: Config) -> int:
+    """Signed tokens cannot be recalled once issued, so they get their own, shorter TTL."""
+    if signed_tokens_enabled(config):
+        return int(config.get("SIGNED_ACCESS_TOKEN_TTL", DEFAULT_SIGNED_ACCESS_TOKEN_TTL))
+    return int(config.get("ACCESS_TOKEN_TTL", 3600))
+
+
+def revocation_ttl(config: Config) -> Optional[int]:
+    """How long a revoked session id must stay on the deny-list, or None in opaque mode."""
+    return access_token_ttl(config) if signed_tokens_enabled(config) else None
+
+
+def issue_access_token(config: Config, user_id, session_id: str, device_id: str, issued_at: int) -> str:
+    if not signed_tokens_enabled(config):
+        return generate_token()
+
+    claims = SignedClaims(
+        user_id=str(user_id),
+        session_id=session_id,
+        device_id=device_id,
+        issued_at=issued_at,
+        expires_at=issued_at + access_token_ttl(config)
+    )
+    return sign_access_token(config.get("SIGNED_TOKEN_SECRET"), claims)
@@ -0,0 +1,53 @@
+import hashlib
+import logging
+from typing import Optional
+
+from app.common.config import Config
+from app.common.bloom_filter import BloomFilter
+from app.common.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# Offline screening of new passwords against a breached-password corpus.
+#
+# BREACHED_PASSWORD_FILTER points at a Bloom filter file built with
+# app/dev/build_password_filter.py. It is memory-mapped read-only, so workers
+# share the page cache and nothing is loaded up front. A false positive (about
+# the build's --error-rate) only asks the user to pick another password.
+
+BREACHED_PASSWORD_MESSAGE = "This password has appeared in a data breach. Please choose a different one."
+
+breached_password_rejections = Counter(
+    "auth_breached_password_rejections_total",
+    "New passwords rejected because they are in the breached-password filter",
+    ("action",)
+)
+
+_filter: Optional[BloomFilter] = None
+
+
+def configure_breached_password_filter(config: Config) -> Optional[BloomFilter]:
+    """Map the configured filter file, or disable screening when none is set.
+
+    A configured but unreadable file raises, so a bad deploy fails at boot
+    instead of silently accepting every password.
+    """
+    global _filter
+    if _filter is not None:
+        _filter.close()
+        _filter = None
+
+    path = config.get("BREACHED_PASSWORD_FILTER", "")
+    if path:
+        _filter = BloomFilter.open_file(path)
+        logger.info("Breached-password filter mapped from %s (%d bits, %d hashes)", path, _filter.size_bits, _filter.num_hashes)
+    return _filter
+
+
+def is_breached_password(password: str, action: str) -> bool:
+    if _filter is None:
+        return False
+    if hashlib.sha1(password.encode("utf-8")).hexdigest().upper() in _filter:
+        breached_password_rejections.inc(action=action)
+        return True
+    return False
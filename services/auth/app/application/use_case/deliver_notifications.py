@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import List
+
+from app.common.config import Config
+from app.interfaces.user_notification.notification_outbox_repo import NotificationOutbox, OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DeliverySettings:
+    batch_size: int = 50
+    concurrency: int = 10
+    block_ms: int = 5000
+    retry_after_ms: int = 30000
+    max_attempts: int = 5
+
+    @staticmethod
+    def from_config(config: Config) -> "DeliverySettings":
+        return DeliverySettings(
+            batch_size=int(config.get("NOTIFY_BATCH_SIZE", 50)),
+            concurrency=int(config.get("NOTIFY_CONCURRENCY", 10)),
+            block_ms=int(config.get("NOTIFY_BLOCK_MS", 5000)),
+            retry_after_ms=int(config.get("NOTIFY_RETRY_AFTER_MS", 30000)),
+            max_attempts=int(config.get("NOTIFY_MAX_ATTEMPTS", 5))
+        )
+
+
+async def deliver_batch(
+    outbox: NotificationOutbox,
+    notifier,
+    consumer: str,
+    settings: DeliverySettings
+) -> dict:
+    """Send one batch: due retries first, then new messages.
+
+    Sent messages are acked together. Failed ones stay pending and come back via
+    claim_stale after retry_after_ms, until max_attempts sends have failed and
+    they are dead-lettered.
+    """
+    stats = {"sent": 0, "failed": 0, "dead_lettered": 0}
+
+    messages = await outbox.claim_stale(consumer, settings.retry_after_ms, settings.batch_size)
+    expired = [m for m in messages if m.previous_attempts >= settings.max_attempts]
+    for message in expired:
+        await outbox.dead_letter(message, "max attempts exceeded")
+        stats["dead_lettered"] += 1
+    messages = [m for m in messages if m.previous_attempts < settings.max_attempts]
+
+    room = settings.batch_size - len(messages)
+    if room > 0:
+        # Only block for new messages when there was nothing to retry
+        messages += await outbox.read_new(consumer, room, settings.block_ms if not messages else None)
+
+    if not messages:
+        return stats
+
+    semaphore = asyncio.Semaphore(settings.concurrency)
+
+    async def send(message: OutboxMessage):
+        async with semaphore:
+            fields = message.fields
+            if not fields.get("recipient"):
+                await outbox.dead_letter(message, "missing recipient")
+                stats["dead_lettered"] += 1
+                return None
+            try:
+                await notifier.notify(
+                    recipient_id=fields["recipient"],
+                    subject=fields.get("subject", ""),
+                    message=fields.get("message", "")
+                )
+                return message.message_id
+            except Exception as e:
+                logger.warning(
+                    "Notification %s failed (attempt %d/%d): %s",
+                    message.message_id, message.previous_attempts + 1, settings.max_attempts, str(e)
+                )
+                stats["failed"] += 1
+                return None
+
+    sent: List[str] = [mid for mid in await asyncio.gather(*(send(m) for m in messages)) if mid]
+    await outbox.ack(sent)
+    stats["sent"] = len(sent)
+    return stats
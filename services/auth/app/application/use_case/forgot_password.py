@@ -13,7 +13,7 @@ async def forgot_password(
     email: str,
     database_adapter,
     keyvalue_adapter,
-    notifier
+    notification_outbox
 ):
     user = database_adapter.get_user_by_email(email)
     if not user:
@@ -44,11 +44,15 @@ async def forgot_password(
         subject = "Password Reset Request"
         message = f"To reset your password, click the following link:\n\n{reset_link}\n\nIf you didn’t request this, ignore this message."
 
-        notifier.connect()
-        notifier.notify(recipient_id=user.email, subject=subject, message=message)
-        notifier.disconnect()
+        # Delivery happens in app/workers/notification_worker.py
+        await notification_outbox.enqueue(
+            recipient_id=user.email,
+            subject=subject,
+            message=message,
+            kind="password_reset"
+        )
     except Exception as e:
-        logger.error("Failed to send password reset notification to %s: %s", user.email, e)
+        logger.error("Failed to enqueue password reset notification for %s: %s", user.email, e)
         return {
             "success": False,
             "message": "Failed to send password reset notification.",
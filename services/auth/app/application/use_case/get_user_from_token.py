@@ -1,12 +1,49 @@
-import json
 import logging
 import time
+from typing import Optional
 from app.application.use_case.auth_response import AuthResponse
+from app.application.use_case.session_store import load_session, resolve_access_token
+from app.application.use_case.access_token import signed_tokens_enabled
+from app.application.use_case import session_cache
 from app.common.config import Config
+from app.common.metrics import Counter
+from app.common.signed_token import is_signed_token, verify_access_token
+from app.interfaces.keyvalue.session_record import decode_session, split_session_key
 from app.interfaces.keyvalue.token_data_object import UserToken
 
 logger = logging.getLogger(__name__)
 
+legacy_scans = Counter(
+    "auth_session_legacy_scans_total",
+    "Unresolved access tokens looked up by scanning user:tokens:* (SESSION_LEGACY_SCAN)",
+    ("result",)
+)
+
+
+def signed_token_rejected(access_token: str, config: Config) -> bool:
+    """True for forged or expired signed tokens, which are rejected before touching Redis."""
+    if not (is_signed_token(access_token) and signed_tokens_enabled(config)):
+        return False
+    return verify_access_token(config.get("SIGNED_TOKEN_SECRET"), access_token) is None
+
+
+def legacy_scan_enabled(config: Config) -> bool:
+    # Sessions written before access pointers existed can only be found by
+    # scanning. Off by default: any unknown token, including garbage sent by a
+    # client, would cost a scan of the whole keyspace. Turn it on only for the
+    # window before app/dev/migrate_session_records.py has run.
+    return config.get("SESSION_LEGACY_SCAN", "false").lower() == "true"
+
+
+def session_error(token_data: Optional[UserToken], access_token: str, now: int) -> Optional[str]:
+    """Why a loaded session does not authenticate access_token, or None if it does."""
+    if token_data is None or token_data.access_token != access_token:
+        return "Invalid access token"
+    if token_data.expires_at and now > int(token_data.expires_at):
+        return "Access token expired"
+    return None
+
+
 async def get_user_from_token(
     access_token: str,
     ip_address: str,
@@ -18,63 +55,76 @@ async def get_user_from_token(
 ):
     logger.debug("get_user_from_token called with device_id=%s", device_id)
 
-    pattern = f"user:tokens:*:{device_id}"
     try:
-        keys = [key async for key in keyvalue_adapter._client.scan_iter(match=pattern)]
-        for key_bytes in keys:
-            key = key_bytes
-            token_json = await keyvalue_adapter.get_token(key)
-            if not token_json:
-                continue
-
-            try:
-                token_data = json.loads(token_json)
-                if token_data.get("access_token") != access_token:
-                    continue
-
-                expires_at = token_data.get("expires_at")
-                if expires_at and int(time.time()) > int(expires_at):
-                    logger.warning("Access token expired for key: %s", key)
-                    return AuthResponse(
-                        user=None,
-                        tokens=None,
-                        error="Access token expired",
-                        status_code=401
-                    )
-
-                # Extract user ID from Redis key
-                user_id = key.split(":")[2]
-                user = database_adapter.get_user_by_id(user_id)
-                if not user:
-                    logger.warning("User not found for ID: %s", user_id)
-                    return AuthResponse(
-                        user=None,
-                        tokens=None,
-                        error="User not found",
-                        status_code=401
-                    )
-
-                logger.info("Token validated for user ID: %s", user_id)
-                return AuthResponse(
-                    user={
-                        "id": user.id,
-                        "email": user.email,
-                        "name": getattr(user, "name", None)
-                    },
-                    tokens=None,
-                    error=None,
-                    status_code=200
-                )
-            except Exception as e:
-                logger.warning("Failed to process token entry for key=%s: %s", key, str(e))
-                continue
-
-        logger.warning("No matching access token found")
+        token_data = None
+        user_id = None
+
+        cached = session_cache.lookup(access_token, device_id)
+        if cached:
+            return AuthResponse(user=cached["user"], tokens=None, error=None, status_code=200)
+        cache_generation = session_cache.generation()
+
+        if signed_token_rejected(access_token, config):
+            logger.warning("Signed access token failed verification")
+            return AuthResponse(
+                user=None,
+                tokens=None,
+                error="Invalid access token",
+                status_code=401
+            )
+
+        pointer = await resolve_access_token(keyvalue_adapter, access_token)
+        if pointer:
+            user_id, stored_device_id = pointer
+            if stored_device_id == device_id:
+                token_data = await load_session(keyvalue_adapter, user_id, device_id)
+        elif legacy_scan_enabled(config):
+            user_id, token_data = await scan_legacy_sessions(keyvalue_adapter, access_token, device_id)
+
+        now = int(time.time())
+        error = session_error(token_data, access_token, now)
+        if error:
+            logger.warning("Access token rejected for user ID %s: %s", user_id, error)
+            return AuthResponse(
+                user=None,
+                tokens=None,
+                error=error,
+                status_code=401
+            )
+
+        user = database_adapter.get_user_by_id(user_id)
+        if not user:
+            logger.warning("User not found for ID: %s", user_id)
+            return AuthResponse(
+                user=None,
+                tokens=None,
+                error="User not found",
+                status_code=401
+            )
+
+        logger.info("Token validated for user ID: %s", user_id)
+        user_data = {
+            "id": user.id,
+            "email": user.email,
+            "name": getattr(user, "name", None)
+        }
+        session_cache.store(
+            access_token,
+            {
+                "user_id": str(user_id),
+                "device_id": token_data.device_id,
+                "session_id": token_data.session_id,
+                "expires_at": token_data.expires_at,
+                "user": user_data
+            },
+            ttl=int(token_data.expires_at) - now if token_data.expires_at else session_cache.DEFAULT_TTL,
+            generation=cache_generation
+        )
         return AuthResponse(
-            user=None,
+            user=user_data,
             tokens=None,
-            error="Invalid access token",
-            status_code=401
+            error=None,
+            status_code=200
         )
     except Exception as e:
         logger.exception("Unexpected error while verifying token: %s", str(e))
@@ -84,3 +134,19 @@ async def get_user_from_token(
             error="Internal server error",
             status_code=500
         )
+
+
+async def scan_legacy_sessions(keyvalue_adapter, access_token: str, device_id: str):
+    pattern = f"user:tokens:*:{device_id}"
+    async for key in keyvalue_adapter.iter_keys(pattern):
+        try:
+            token_data = decode_session(await keyvalue_adapter.get_token(key), device_id)
+            if token_data and token_data.access_token == access_token:
+                user_id, _ = split_session_key(key)
+                legacy_scans.inc(result="found")
+                logger.info("Legacy session scan found user ID %s; run migrate_session_records", user_id)
+                return user_id, token_data
+        except Exception as e:
+            logger.warning("Failed to process token entry for key=%s: %s", key, str(e))
+    legacy_scans.inc(result="missed")
+    return None, None
@@ -0,0 +1,124 @@
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from app.common.config import Config
+from app.application.use_case import session_cache
+from app.application.use_case.get_user_from_token import (
+    signed_token_rejected,
+    legacy_scan_enabled,
+    session_error,
+    scan_legacy_sessions,
+)
+from app.interfaces.keyvalue.session_record import access_key, session_key, decode_pointer, decode_session
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH = 100
+
+
+def max_batch_size(config: Config) -> int:
+    return int(config.get("INTROSPECT_MAX_TOKENS", DEFAULT_MAX_BATCH))
+
+
+async def introspect_tokens(
+    tokens: List[Tuple[str, Optional[str]]],
+    database_adapter,
+    keyvalue_adapter,
+    config: Config
+) -> List[dict]:
+    """Validate many (access_token, device_id) pairs with the same rules as get_user_from_token.
+
+    Tokens found in the session near cache are answered from memory; the rest
+    are batched: one MGET for the access pointers, one for the session records
+    and one query for the users, however many tokens are passed. A
+    device_id of None skips the device check. Results are in input order.
+    """
+    now = int(time.time())
+    results: List[dict] = [None] * len(tokens)
+    sessions = {}
+
+    cache_generation = session_cache.generation()
+
+    pending = []
+    for i, (access_token, device_id) in enumerate(tokens):
+        if not access_token or signed_token_rejected(access_token, config):
+            results[i] = {"active": False, "error": "Invalid access token"}
+            continue
+        cached = session_cache.lookup(access_token, device_id)
+        if cached:
+            results[i] = _active_result(cached["user_id"], cached["device_id"], cached["session_id"], cached["expires_at"])
+        else:
+            pending.append(i)
+
+    pointers = await keyvalue_adapter.mget([access_key(tokens[i][0]) for i in pending])
+
+    to_load = []
+    for i, raw in zip(pending, pointers):
+        access_token, device_id = tokens[i]
+        try:
+            pointer = decode_pointer(raw)
+        except (ValueError, KeyError):
+            pointer = None
+
+        if pointer:
+            user_id, stored_device_id = pointer
+            if device_id is None or stored_device_id == device_id:
+                to_load.append((i, user_id, stored_device_id))
+                continue
+        elif legacy_scan_enabled(config) and device_id:
+            user_id, token_data = await scan_legacy_sessions(keyvalue_adapter, access_token, device_id)
+            if token_data is not None:
+                sessions[i] = (user_id, token_data)
+                continue
+        results[i] = {"active": False, "error": "Invalid access token"}
+
+    records = await keyvalue_adapter.mget([session_key(user_id, device_id) for _, user_id, device_id in to_load])
+    for (i, user_id, device_id), raw in zip(to_load, records):
+        try:
+            sessions[i] = (user_id, decode_session(raw, device_id))
+        except ValueError as e:
+            logger.warning("Unreadable session record for user ID %s: %s", user_id, e)
+            sessions[i] = (user_id, None)
+
+    valid = {}
+    for i, (user_id, token_data) in sessions.items():
+        error = session_error(token_data, tokens[i][0], now)
+        if error:
+            results[i] = {"active": False, "error": error}
+        else:
+            valid[i] = (user_id, token_data)
+
+    users = database_adapter.get_users_by_ids(list({user_id for user_id, _ in valid.values()})) if valid else {}
+    for i, (user_id, token_data) in valid.items():
+        if str(user_id) not in users:
+            results[i] = {"active": False, "error": "User not found"}
+            continue
+        results[i] = _active_result(user_id, token_data.device_id, token_data.session_id, token_data.expires_at)
+
+        user = users[str(user_id)]
+        session_cache.store(
+            tokens[i][0],
+            {
+                "user_id": str(user_id),
+                "device_id": token_data.device_id,
+                "session_id": token_data.session_id,
+                "expires_at": token_data.expires_at,
+                "user": {"id": user.id, "email": user.email, "name": getattr(user, "name", None)}
+            },
+            ttl=int(token_data.expires_at) - now if token_data.expires_at else session_cache.DEFAULT_TTL,
+            generation=cache_generation
+        )
+
+    logger.info("Introspected %d token(s), %d active", len(tokens), sum(1 for r in results if r["active"]))
+    return results
+
+
+def _active_result(user_id, device_id: str, session_id: str, expires_at: int) -> dict:
+    return {
+        "active": True,
+        "user_id": str(user_id),
+        "device_id": device_id,
+        "session_id": session_id,
+        "expires_at": expires_at
+    }
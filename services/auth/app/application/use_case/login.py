@@ -1,8 +1,9 @@
-import json
 import time
 import logging
-from app.common.utility import verify_password, generate_token
+from app.common.utility import verify_password_async, generate_token
 from app.application.use_case.auth_response import AuthResponse
+from app.application.use_case.session_store import save_session
+from app.application.use_case.access_token import access_token_ttl as get_access_token_ttl, issue_access_token
 from app.interfaces.keyvalue.token_data_object import UserToken
 from app.common.config import Config
 
@@ -39,7 +40,7 @@ async def login(
             status_code=401
         )
     
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         logger.info("Invalid password for email: %s", email)
         return AuthResponse(
             user=None,
@@ -49,11 +50,11 @@ async def login(
         )
 
     now = int(time.time())
-    access_token = generate_token()
     refresh_token = generate_token()
     session_id = generate_token()
+    access_token = issue_access_token(config, user.id, session_id, device_id, now)
 
-    access_token_ttl = int(config.get("ACCESS_TOKEN_TTL"))
+    access_token_ttl = get_access_token_ttl(config)
     refresh_token_ttl = int(config.get("REFRESH_TOKEN_TTL"))
 
     access_token_obj = UserToken(
@@ -67,23 +68,13 @@ async def login(
         session_id=session_id
     )
 
-    redis_key = f"user:tokens:{str(user.id)}:{device_id}"
-    redis_value = json.dumps(access_token_obj.__dict__)
-
-    await keyvalue_adapter.set_token(redis_key, redis_value, ex=refresh_token_ttl)
-
-    # FIXED: Also store refresh token as direct key for reverse lookup during refresh
-    refresh_lookup_data = {
-        "user_id": str(user.id),  # Convert UUID to string for JSON serialization
-        "device_id": device_id,
-        "redis_key": redis_key  # So we can find the full token data
-    }
-    refresh_lookup_value = json.dumps(refresh_lookup_data)
-    await keyvalue_adapter.set_token(refresh_token, refresh_lookup_value, ex=refresh_token_ttl)
-
-    stored_value = await keyvalue_adapter.get_token(redis_key)
-    logger.info("Stored token in Redis: key=%s, value=%s", redis_key, stored_value)
-    logger.info("Stored refresh lookup: token=%s..., data=%s", refresh_token[:20], refresh_lookup_value)
+    await save_session(
+        keyvalue_adapter,
+        user_id=user.id,
+        token=access_token_obj,
+        session_ttl=refresh_token_ttl,
+        access_token_ttl=access_token_ttl
+    )
 
     return AuthResponse(
         user={
@@ -1,8 +1,16 @@
-import json
 import time
 import logging
 from app.common.utility import generate_token
 from app.application.use_case.auth_response import AuthResponse
+from app.application.use_case.session_store import (
+    save_session,
+    load_session,
+    resolve_refresh_token,
+    delete_session,
+)
+from app.application.use_case.access_token import access_token_ttl as get_access_token_ttl, issue_access_token, revocation_ttl
+from app.application.use_case.revocation import revoke_session_ids
+from app.interfaces.keyvalue.session_record import access_key, refresh_key
 from app.interfaces.keyvalue.token_data_object import UserToken
 from app.common.config import Config
 
@@ -21,70 +29,61 @@ async def refresh(
     logger.info(f"Starting refresh for token: {refresh_token[:20]}... device: {device_id}")
     
     try:
-        # FIXED: Use refresh token as direct key to get lookup data
+        # Refresh token is a direct key pointing at the session record
         logger.info("Looking up refresh token in Redis...")
-        
-        refresh_lookup_json = await keyvalue_adapter.get_token(refresh_token)
-        
-        if not refresh_lookup_json:
-            logger.warning(f"Refresh token not found in Redis: {refresh_token[:20]}...")
-            raise Exception("Invalid refresh token")
-        
-        # Parse the lookup data
+
         try:
-            refresh_lookup = json.loads(refresh_lookup_json)
-            user_id = refresh_lookup["user_id"]
-            stored_device_id = refresh_lookup["device_id"]
-            redis_key = refresh_lookup["redis_key"]
-            logger.info(f"Found refresh lookup: user_id={user_id}, device_id={stored_device_id}")
-        except (json.JSONDecodeError, KeyError) as e:
+            refresh_lookup = await resolve_refresh_token(keyvalue_adapter, refresh_token)
+        except (ValueError, KeyError) as e:
             logger.error(f"Failed to parse refresh lookup data: {e}")
             raise Exception("Invalid refresh token")
-        
+
+        if not refresh_lookup:
+            logger.warning(f"Refresh token not found in Redis: {refresh_token[:20]}...")
+            raise Exception("Invalid refresh token")
+
+        user_id, stored_device_id = refresh_lookup
+        logger.info(f"Found refresh lookup: user_id={user_id}, device_id={stored_device_id}")
+
         # Validate device ID matches
         if stored_device_id != device_id:
             logger.warning(f"Device ID mismatch. Stored: {stored_device_id}, Provided: {device_id}")
             raise Exception("Invalid refresh token")
-        
+
         # Get the full token data
-        stored_token_json = await keyvalue_adapter.get_token(redis_key)
-        if not stored_token_json:
-            logger.warning(f"Token data not found for key: {redis_key}")
-            raise Exception("Invalid refresh token")
-        
         try:
-            stored_token_dict = json.loads(stored_token_json)
-        except json.JSONDecodeError as e:
+            stored_token = await load_session(keyvalue_adapter, user_id, device_id)
+        except ValueError as e:
             logger.error(f"Failed to parse stored token data: {e}")
             raise Exception("Invalid refresh token")
-        
+
+        if not stored_token:
+            logger.warning(f"Token data not found for user_id={user_id}, device_id={device_id}")
+            raise Exception("Invalid refresh token")
+
         # Verify the refresh token matches
-        if stored_token_dict.get("refresh_token") != refresh_token:
+        if stored_token.refresh_token != refresh_token:
             logger.warning("Refresh token mismatch in stored data")
             raise Exception("Invalid refresh token")
-        
+
         # Check if token is expired
         now = int(time.time())
-        expires_at = stored_token_dict.get("expires_at", 0)
+        expires_at = stored_token.expires_at
         if expires_at < now:
             logger.warning(f"Refresh token expired. Expires: {expires_at}, Now: {now}")
             # Clean up expired tokens
-            await keyvalue_adapter.delete_token(refresh_token)
-            await keyvalue_adapter.delete_token(redis_key)
+            await delete_session(keyvalue_adapter, user_id, device_id, token=stored_token)
             raise Exception("Refresh token expired")
-        
+
         logger.info("Refresh token validation passed, generating new tokens...")
         
         # Generate new tokens
-        new_access_token = generate_token()
         new_refresh_token = generate_token()
         new_session_id = generate_token()
+        new_access_token = issue_access_token(config, user_id, new_session_id, device_id, now)
         
         # Get TTL values from config
-        try:
-            access_token_ttl = int(config.get("ACCESS_TOKEN_TTL"))
-        except KeyError:
-            access_token_ttl = 3600  # 1 hour default
+        access_token_ttl = get_access_token_ttl(config)
             
         try:
             refresh_token_ttl = int(config.get("REFRESH_TOKEN_TTL"))
@@ -103,28 +102,25 @@ async def refresh(
             session_id=new_session_id
         )
         
-        # Store new token data using the same pattern as login
-        new_redis_key = f"user:tokens:{user_id}:{device_id}"
-        new_redis_value = json.dumps(new_token_data.__dict__)
-        
-        # Store new token data
-        await keyvalue_adapter.set_token(new_redis_key, new_redis_value, ex=refresh_token_ttl)
-        
-        # Store new refresh token lookup
-        new_refresh_lookup = {
-            "user_id": user_id,
-            "device_id": device_id,
-            "redis_key": new_redis_key
-        }
-        new_refresh_lookup_value = json.dumps(new_refresh_lookup)
-        await keyvalue_adapter.set_token(new_refresh_token, new_refresh_lookup_value, ex=refresh_token_ttl)
-        
-        # Clean up old tokens
-        await keyvalue_adapter.delete_token(refresh_token)  # Remove old refresh lookup
-        # NOTE: Don't delete redis_key since new_redis_key is the same for same user/device
-        # The new token data already overwrote the old token data at the same key
-        logger.info("FIXED: Only deleting old refresh token, not main token data")
-        
+        # Store new token data using the same pattern as login; this overwrites
+        # the session record at the same user/device key
+        await save_session(
+            keyvalue_adapter,
+            user_id=user_id,
+            token=new_token_data,
+            session_ttl=refresh_token_ttl,
+            access_token_ttl=access_token_ttl
+        )
+
+        # Clean up the pointers of the rotated tokens
+        await keyvalue_adapter.delete_token(refresh_key(refresh_token))
+        await keyvalue_adapter.delete_token(access_key(stored_token.access_token))
+
+        # Signed tokens of the rotated session would otherwise verify until they expire
+        deny_ttl = revocation_ttl(config)
+        if deny_ttl:
+            await revoke_session_ids(keyvalue_adapter, [stored_token.session_id], deny_ttl)
+
         logger.info("New tokens generated and stored successfully")
         
         # Get user data from database
@@ -1,8 +1,10 @@
-import json
 import time
 import logging
-from app.common.utility import generate_token, hash_password
+from app.common.utility import generate_token, hash_password_async
 from app.application.use_case.auth_response import AuthResponse
+from app.application.use_case.session_store import save_session
+from app.application.use_case.access_token import access_token_ttl as get_access_token_ttl, issue_access_token
+from app.application.use_case.breached_password import is_breached_password, BREACHED_PASSWORD_MESSAGE
 from app.interfaces.keyvalue.token_data_object import UserToken
 from app.common.config import Config
 
@@ -21,6 +23,15 @@ async def register(
     keyvalue_adapter,
     AuthResponse
 ):
+    if is_breached_password(password, "register"):
+        logger.info("Registration rejected: breached password")
+        return AuthResponse(
+            user=None,
+            tokens=None,
+            error=BREACHED_PASSWORD_MESSAGE,
+            status_code=400
+        )
+
     existing_user = database_adapter.get_user_by_email(email)
     if existing_user:
         return AuthResponse(
@@ -30,7 +41,7 @@ async def register(
             status_code=400
         )
 
-    password_hash = hash_password(password)
+    password_hash = await hash_password_async(password)
     try:
         new_user = database_adapter.create_user(
             email=email,
@@ -48,11 +59,11 @@ async def register(
         )
 
     now = int(time.time())
-    access_token = generate_token()
     refresh_token = generate_token()
     session_id = generate_token()
+    access_token = issue_access_token(config, new_user.id, session_id, device_id, now)
 
-    access_token_ttl = int(config.get("ACCESS_TOKEN_TTL"))
+    access_token_ttl = get_access_token_ttl(config)
     refresh_token_ttl = int(config.get("REFRESH_TOKEN_TTL"))
 
     token_data = UserToken(
@@ -66,12 +77,13 @@ async def register(
         session_id=session_id
     )
 
-    redis_key = f"user:tokens:{new_user.id}:{device_id}"
-    redis_value = json.dumps(token_data.__dict__)
-    await keyvalue_adapter.set_token(redis_key, redis_value, ex=access_token_ttl)
-
-    stored = await keyvalue_adapter.get_token(redis_key)
-    logger.info("Stored new user token in Redis: key=%s, value=%s", redis_key, stored)
+    await save_session(
+        keyvalue_adapter,
+        user_id=new_user.id,
+        token=token_data,
+        session_ttl=refresh_token_ttl,
+        access_token_ttl=access_token_ttl
+    )
 
     return AuthResponse(
         user={
@@ -5,6 +5,10 @@ import re
 
 from app.common.utility import hash_password
 from app.common.config import Config
+from app.application.use_case.access_token import revocation_ttl
+from app.application.use_case.session_store import delete_all_sessions
+from app.application.use_case.session_cache import invalidate_sessions
+from app.application.use_case.breached_password import is_breached_password, BREACHED_PASSWORD_MESSAGE
 
 logger = logging.getLogger(__name__)
 
@@ -17,13 +21,22 @@ async def reset_password(
 ):
     logger.info("Reset password requested")
 
+    # Checked before the token is looked up so a rejected password does not use it up
+    if is_breached_password(new_password, "reset_password"):
+        logger.info("Password reset rejected: breached password")
+        return {
+            "success": False,
+            "message": BREACHED_PASSWORD_MESSAGE,
+            "status_code": 400
+        }
+
     # Search Redis for matching reset token
     pattern = "user:password_reset:*"
     matching_key = None
+    matching_raw = None
     token_data = None
-    keys = await keyvalue_adapter.get_keys(pattern)
 
-    for key in keys:
+    async for key in keyvalue_adapter.iter_keys(pattern):
         raw = await keyvalue_adapter.get_token(key)
         if not raw:
             continue
@@ -31,6 +44,7 @@ async def reset_password(
             parsed = json.loads(raw)
             if parsed.get("reset_token") == token:
                 matching_key = key
+                matching_raw = raw
                 token_data = parsed
                 break
         except Exception as e:
@@ -67,18 +81,42 @@ async def reset_password(
 
     user_id = match.group(1)
 
+    # Consume the token before using it so two concurrent requests cannot both reset
+    if not await keyvalue_adapter.compare_and_swap(matching_key, matching_raw, None):
+        logger.warning("Reset token already used: %s", matching_key)
+        return {
+            "success": False,
+            "message": "Invalid or expired reset token.",
+            "status_code": 400
+        }
+
     try:
         database_adapter.update_user_password(user_id, new_password)
-        await keyvalue_adapter.delete_token(matching_key)
         logger.info("Password successfully reset for user_id: %s", user_id)
     except Exception as e:
         logger.error("Failed to update password for user_id %s: %s", user_id, e)
+        # Put the token back so the user can retry without a new email
+        remaining_ttl = int(token_data.get("expires_at", 0)) - int(time.time())
+        if remaining_ttl > 0:
+            try:
+                await keyvalue_adapter.compare_and_swap(matching_key, None, matching_raw, ex=remaining_ttl)
+            except Exception as restore_error:
+                logger.error("Failed to restore reset token %s: %s", matching_key, restore_error)
         return {
             "success": False,
             "message": "Unable to reset password.",
             "status_code": 500
         }
 
+    # Sessions opened with the old password end here, including cached validations.
+    # The password has changed either way, so a failure here does not fail the reset.
+    try:
+        revoked = await delete_all_sessions(keyvalue_adapter, user_id, revoke_ttl=revocation_ttl(config))
+        await invalidate_sessions(keyvalue_adapter, user_id)
+        logger.info("Revoked %d session(s) after password reset for user_id: %s", revoked, user_id)
+    except Exception as e:
+        logger.error("Password reset for user_id %s, but revoking its sessions failed: %s", user_id, e)
+
     return {
         "success": True,
         "message": "Password has been reset.",
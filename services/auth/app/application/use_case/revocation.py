@@ -0,0 +1,69 @@
+import time
+import base64
+import asyncio
+import logging
+from typing import Iterable, Optional, Tuple
+
+from app.common.config import Config
+from app.common.bloom_filter import BloomFilter
+from app.application.use_case.access_token import access_token_ttl
+from app.interfaces.keyvalue.session_record import (
+    REVOKED_SESSIONS_KEY,
+    REVOCATION_FILTER_KEY,
+    REVOCATION_CHANNEL,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PUBLISH_INTERVAL = 5
+DEFAULT_ERROR_RATE = 0.001
+
+
+async def revoke_session_ids(keyvalue_adapter, session_ids: Iterable[str], ttl: int) -> None:
+    """Deny-list session ids until every signed token issued for them has expired."""
+    expires_at = int(time.time()) + ttl
+    for session_id in session_ids:
+        if session_id:
+            await keyvalue_adapter.add_to_index(REVOKED_SESSIONS_KEY, session_id, score=expires_at, ex=ttl)
+
+
+async def publish_revocation_filter(keyvalue_adapter, error_rate: float, ttl: int) -> int:
+    """Rebuild the deny-list Bloom filter from the live revocations and publish it.
+
+    Returns the number of session ids in the filter.
+    """
+    now = int(time.time())
+    session_ids = await keyvalue_adapter.get_index(REVOKED_SESSIONS_KEY, min_score=now)
+    bloom = BloomFilter.from_items(session_ids, error_rate)
+
+    payload = f"{now}|{base64.b64encode(bloom.to_bytes()).decode('ascii')}"
+    await keyvalue_adapter.set_token(REVOCATION_FILTER_KEY, payload, ex=ttl)
+    await keyvalue_adapter.publish(REVOCATION_CHANNEL, str(now))
+    return len(session_ids)
+
+
+async def load_revocation_filter(keyvalue_adapter) -> Optional[Tuple[int, str]]:
+    """Return (generated_at, base64 filter) as last published, or None."""
+    raw = await keyvalue_adapter.get_token(REVOCATION_FILTER_KEY)
+    if not raw:
+        return None
+    generated_at, _, encoded = raw.partition("|")
+    return int(generated_at), encoded
+
+
+async def run_revocation_publisher(keyvalue_adapter, config: Config) -> None:
+    """Republish the deny-list every REVOCATION_FILTER_INTERVAL seconds until cancelled."""
+    interval = float(config.get("REVOCATION_FILTER_INTERVAL", DEFAULT_PUBLISH_INTERVAL))
+    error_rate = float(config.get("REVOCATION_FILTER_ERROR_RATE", DEFAULT_ERROR_RATE))
+    # Keep the published filter around long enough that a stalled publisher is
+    # noticed by verifiers (via generated_at) rather than by a missing key.
+    ttl = max(access_token_ttl(config), int(interval * 3))
+
+    logger.info("Revocation filter publisher started (interval=%ss)", interval)
+    while True:
+        try:
+            count = await publish_revocation_filter(keyvalue_adapter, error_rate, ttl)
+            logger.debug("Published revocation filter with %d session id(s)", count)
+        except Exception as e:
+            logger.warning("Failed to publish revocation filter: %s", str(e))
+        await asyncio.sleep(interval)
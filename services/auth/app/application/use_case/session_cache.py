@@ -0,0 +1,116 @@
+import asyncio
+import logging
+from typing import Optional
+
+from app.common.config import Config
+from app.common.metrics import Counter
+from app.common.near_cache import NearCache
+from app.interfaces.keyvalue.session_record import SESSION_INVALIDATION_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+# Optional per-process cache of validated access tokens in front of Redis.
+#
+# Entries live at most SESSION_NEAR_CACHE_TTL seconds and never past the token's
+# own expiry. Logout, refresh, revocation and password reset drop them locally
+# and publish "{user_id}" or "{user_id}:{device_id}" on the invalidation channel
+# so other replicas drop theirs. Pub/sub is best effort: if a replica misses a
+# message, the TTL is the upper bound on how long a revoked token still
+# validates there.
+
+DEFAULT_TTL = 5
+DEFAULT_MAX_ENTRIES = 10000
+
+near_cache_lookups = Counter(
+    "auth_session_near_cache_lookups_total",
+    "Session near cache lookups by result",
+    ("result",)
+)
+
+_cache: Optional[NearCache] = None
+
+
+def configure_session_cache(config: Config) -> Optional[NearCache]:
+    global _cache
+    if config.get("SESSION_NEAR_CACHE", "false").lower() == "true":
+        _cache = NearCache(
+            max_entries=int(config.get("SESSION_NEAR_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            max_ttl=float(config.get("SESSION_NEAR_CACHE_TTL", DEFAULT_TTL))
+        )
+    else:
+        _cache = None
+    return _cache
+
+
+def get_session_cache() -> Optional[NearCache]:
+    return _cache
+
+
+def user_tag(user_id) -> str:
+    return f"user:{user_id}"
+
+
+def session_tag(user_id, device_id: str) -> str:
+    return f"session:{user_id}:{device_id}"
+
+
+def lookup(access_token: str, device_id: Optional[str]) -> Optional[dict]:
+    """Return the cached validation for a token, or None. device_id None matches any device."""
+    if _cache is None:
+        return None
+    entry = _cache.get(access_token)
+    if entry is None or (device_id is not None and entry["device_id"] != device_id):
+        near_cache_lookups.inc(result="miss")
+        return None
+    near_cache_lookups.inc(result="hit")
+    return entry
+
+
+def store(access_token: str, entry: dict, ttl: float, generation: Optional[int]) -> None:
+    """Cache a successful validation. entry needs user_id and device_id."""
+    if _cache is None:
+        return
+    _cache.put(
+        access_token,
+        entry,
+        ttl,
+        tags=(user_tag(entry["user_id"]), session_tag(entry["user_id"], entry["device_id"])),
+        generation=generation
+    )
+
+
+def generation() -> Optional[int]:
+    return _cache.generation if _cache is not None else None
+
+
+def _apply(message: str) -> None:
+    if _cache is None:
+        return
+    user_id, _, device_id = message.partition(":")
+    _cache.invalidate_tag(session_tag(user_id, device_id) if device_id else user_tag(user_id))
+
+
+async def invalidate_sessions(keyvalue_adapter, user_id, device_id: Optional[str] = None) -> None:
+    """Drop cached validations of one session (or all of a user's) here and on every replica."""
+    message = f"{user_id}:{device_id}" if device_id else str(user_id)
+    _apply(message)
+    try:
+        await keyvalue_adapter.publish(SESSION_INVALIDATION_CHANNEL, message)
+    except Exception as e:
+        logger.warning("Failed to publish session invalidation %s: %s", message, str(e))
+
+
+async def run_invalidation_listener(keyvalue_adapter) -> None:
+    """Apply invalidations published by other replicas until cancelled."""
+    while True:
+        try:
+            # Anything published while unsubscribed was missed, so start clean
+            if _cache is not None:
+                _cache.clear()
+            async for message in keyvalue_adapter.listen(SESSION_INVALIDATION_CHANNEL):
+                _apply(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Session invalidation listener dropped, resubscribing: %s", str(e))
+            await asyncio.sleep(1)
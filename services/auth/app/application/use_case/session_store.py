@@ -0,0 +1,129 @@
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from app.interfaces.keyvalue.token_data_object import UserToken
+from app.application.use_case.revocation import revoke_session_ids
+from app.application.use_case.session_cache import invalidate_sessions
+from app.interfaces.keyvalue.session_record import (
+    session_key,
+    session_index_key,
+    access_key,
+    refresh_key,
+    encode_session,
+    decode_session,
+    encode_pointer,
+    decode_pointer,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def save_session(
+    keyvalue_adapter,
+    user_id,
+    token: UserToken,
+    session_ttl: int,
+    access_token_ttl: int
+) -> str:
+    """Store a session record, its access and refresh pointers and its entry in the
+    user's session index. Returns the session key."""
+    key = session_key(user_id, token.device_id)
+    pointer = encode_pointer(user_id, token.device_id)
+    replaced = await load_session(keyvalue_adapter, user_id, token.device_id)
+
+    await keyvalue_adapter.mset(
+        {key: encode_session(token), refresh_key(token.refresh_token): pointer},
+        ex=session_ttl
+    )
+    await keyvalue_adapter.set_token(access_key(token.access_token), pointer, ex=access_token_ttl)
+    await keyvalue_adapter.add_to_index(
+        session_index_key(user_id),
+        token.device_id,
+        score=int(time.time()) + session_ttl,
+        ex=session_ttl
+    )
+
+    # Tokens previously issued for this device are superseded; their pointers
+    # would otherwise still lead to this device's (new) session
+    if replaced is not None:
+        if replaced.access_token and replaced.access_token != token.access_token:
+            await keyvalue_adapter.delete_token(access_key(replaced.access_token))
+        if replaced.refresh_token and replaced.refresh_token != token.refresh_token:
+            await keyvalue_adapter.delete_token(refresh_key(replaced.refresh_token))
+    await invalidate_sessions(keyvalue_adapter, user_id, token.device_id)
+
+    logger.info("Stored session: key=%s, ttl=%s", key, session_ttl)
+    return key
+
+
+async def load_session(keyvalue_adapter, user_id, device_id: str) -> Optional[UserToken]:
+    raw = await keyvalue_adapter.get_token(session_key(user_id, device_id))
+    return decode_session(raw, device_id)
+
+
+async def resolve_access_token(keyvalue_adapter, access_token: str) -> Optional[Tuple[str, str]]:
+    """Return (user_id, device_id) for an access token without scanning the keyspace."""
+    raw = await keyvalue_adapter.get_token(access_key(access_token))
+    return decode_pointer(raw)
+
+
+async def resolve_refresh_token(keyvalue_adapter, refresh_token: str) -> Optional[Tuple[str, str]]:
+    raw = await keyvalue_adapter.get_token(refresh_key(refresh_token))
+    return decode_pointer(raw)
+
+
+async def delete_session(
+    keyvalue_adapter,
+    user_id,
+    device_id: str,
+    token: Optional[UserToken] = None,
+    revoke_ttl: Optional[int] = None
+) -> None:
+    """Remove a session record and, when known, the pointers that lead to it.
+
+    With revoke_ttl set (signed access tokens), the session id is also deny-listed
+    so tokens already handed out stop verifying once the filter is republished.
+    """
+    if token is None:
+        token = await load_session(keyvalue_adapter, user_id, device_id)
+
+    await keyvalue_adapter.delete_token(session_key(user_id, device_id))
+    await keyvalue_adapter.remove_from_index(session_index_key(user_id), device_id)
+    if token is not None:
+        if token.access_token:
+            await keyvalue_adapter.delete_token(access_key(token.access_token))
+        if token.refresh_token:
+            await keyvalue_adapter.delete_token(refresh_key(token.refresh_token))
+        if revoke_ttl:
+            await revoke_session_ids(keyvalue_adapter, [token.session_id], revoke_ttl)
+    await invalidate_sessions(keyvalue_adapter, user_id, device_id)
+
+
+async def list_sessions(keyvalue_adapter, user_id) -> List[UserToken]:
+    """Return the live sessions of a user, pruning index members whose session expired."""
+    device_ids = await keyvalue_adapter.get_index(session_index_key(user_id), min_score=int(time.time()))
+
+    records = await keyvalue_adapter.mget([session_key(user_id, device_id) for device_id in device_ids])
+
+    sessions = []
+    stale = []
+    for device_id, raw in zip(device_ids, records):
+        token = decode_session(raw, device_id)
+        if token is None:
+            stale.append(device_id)
+        else:
+            sessions.append(token)
+
+    if stale:
+        await keyvalue_adapter.remove_from_index(session_index_key(user_id), *stale)
+    return sessions
+
+
+async def delete_all_sessions(keyvalue_adapter, user_id, revoke_ttl: Optional[int] = None) -> int:
+    """Remove every session of a user. Returns the number of sessions removed."""
+    sessions = await list_sessions(keyvalue_adapter, user_id)
+    for token in sessions:
+        await delete_session(keyvalue_adapter, user_id, token.device_id, token=token, revoke_ttl=revoke_ttl)
+    await keyvalue_adapter.delete_token(session_index_key(user_id))
+    return len(sessions)
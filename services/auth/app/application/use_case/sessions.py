@@ -0,0 +1,82 @@
+import logging
+from typing import Optional
+
+from app.common.config import Config
+from app.application.use_case.access_token import revocation_ttl
+from app.application.use_case.session_store import (
+    list_sessions as list_stored_sessions,
+    load_session,
+    delete_session,
+    delete_all_sessions,
+    resolve_access_token,
+    resolve_refresh_token,
+)
+from app.interfaces.keyvalue.session_record import access_key, refresh_key
+
+logger = logging.getLogger(__name__)
+
+
+async def list_sessions(user_id, current_device_id: str, keyvalue_adapter):
+    sessions = await list_stored_sessions(keyvalue_adapter, user_id)
+    logger.info("Listing %d session(s) for user ID: %s", len(sessions), user_id)
+
+    return [
+        {
+            "device_id": token.device_id,
+            "issued_at": token.issued_at,
+            "expires_at": token.expires_at,
+            "ip_address": token.ip_address,
+            "user_agent": token.user_agent,
+            "current": token.device_id == current_device_id
+        }
+        for token in sorted(sessions, key=lambda t: t.issued_at, reverse=True)
+    ]
+
+
+async def revoke_session(user_id, device_id: str, keyvalue_adapter, config: Config) -> bool:
+    token = await load_session(keyvalue_adapter, user_id, device_id)
+    if token is None:
+        logger.warning("No session for user ID %s on device %s", user_id, device_id)
+        return False
+
+    await delete_session(keyvalue_adapter, user_id, device_id, token=token, revoke_ttl=revocation_ttl(config))
+    logger.info("Revoked session for user ID %s on device %s", user_id, device_id)
+    return True
+
+
+async def revoke_all_sessions(user_id, keyvalue_adapter, config: Config) -> int:
+    revoked = await delete_all_sessions(keyvalue_adapter, user_id, revoke_ttl=revocation_ttl(config))
+    logger.info("Revoked %d session(s) for user ID: %s", revoked, user_id)
+    return revoked
+
+
+async def logout(access_token: Optional[str], refresh_token: Optional[str], keyvalue_adapter, config: Config) -> bool:
+    """Remove the session behind the presented tokens. Returns False if none was found."""
+    pointer = None
+    if refresh_token:
+        pointer = await resolve_refresh_token(keyvalue_adapter, refresh_token)
+    if pointer is None and access_token:
+        pointer = await resolve_access_token(keyvalue_adapter, access_token)
+
+    if pointer is None:
+        logger.info("Logout: no session found for the presented tokens")
+        return False
+
+    user_id, device_id = pointer
+    stored = await load_session(keyvalue_adapter, user_id, device_id)
+    presented_refresh = bool(refresh_token) and stored is not None and stored.refresh_token == refresh_token
+    presented_access = bool(access_token) and stored is not None and stored.access_token == access_token
+    if not (presented_refresh or presented_access):
+        # The device's session has since been replaced (e.g. a second login on
+        # "web_browser"); only the stale token's own pointers go, not the live session
+        if refresh_token:
+            await keyvalue_adapter.delete_token(refresh_key(refresh_token))
+        if access_token:
+            await keyvalue_adapter.delete_token(access_key(access_token))
+        logger.info("Logout: presented tokens no longer hold the session of user ID %s on device %s", user_id, device_id)
+        return False
+
+    await delete_session(keyvalue_adapter, user_id, device_id, token=stored, revoke_ttl=revocation_ttl(config))
+    logger.info("Logged out user ID %s on device %s", user_id, device_id)
+    return True
+
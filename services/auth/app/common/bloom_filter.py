@@ -0,0 +1,110 @@
+import os
+import math
+import mmap
+import struct
+import hashlib
+from typing import Iterable, Optional, Tuple, Union
+
+# Serialized layout: 4-byte big-endian bit count, 1-byte hash count, then the bit
+# array. Positions use double hashing over a 128-bit BLAKE2b digest, so any
+# implementation reading the same bytes agrees on membership.
+#
+# Filters stored on disk use FILE_HEADER instead (magic, 8-byte bit count, hash
+# count) so they can exceed 2^32 bits, and are read through mmap: lookups touch
+# only the pages they need and every process mapping the file shares them.
+
+HEADER = struct.Struct(">IB")
+FILE_MAGIC = b"BLOOMF1\n"
+FILE_HEADER = struct.Struct(">8sQB")
+
+
+def optimal_parameters(capacity: int, error_rate: float) -> Tuple[int, int]:
+    """(size_bits, num_hashes) for capacity items at the given false-positive rate."""
+    capacity = max(capacity, 1)
+    size_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+    num_hashes = max(1, round(size_bits / capacity * math.log(2)))
+    return size_bits, num_hashes
+
+
+class BloomFilter:
+    def __init__(self, size_bits: int, num_hashes: int, bits: Optional[Union[bytearray, memoryview]] = None):
+        if size_bits <= 0 or num_hashes <= 0:
+            raise ValueError("Bloom filter needs a positive size and hash count")
+        self.size_bits = size_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((size_bits + 7) // 8)
+        self._mmap = None
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = 0.001) -> "BloomFilter":
+        return cls(*optimal_parameters(capacity, error_rate))
+
+    @classmethod
+    def from_items(cls, items: Iterable[str], error_rate: float = 0.001) -> "BloomFilter":
+        items = list(items)
+        bloom = cls.for_capacity(len(items), error_rate)
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        size_bits, num_hashes = HEADER.unpack_from(data)
+        bits = bytearray(data[HEADER.size:])
+        if len(bits) != (size_bits + 7) // 8:
+            raise ValueError("Bloom filter payload does not match its header")
+        return cls(size_bits, num_hashes, bits)
+
+    def to_bytes(self) -> bytes:
+        return HEADER.pack(self.size_bits, self.num_hashes) + bytes(self.bits)
+
+    @classmethod
+    def create_file(cls, path: str, size_bits: int, num_hashes: int) -> "BloomFilter":
+        """Create an empty filter file and map it writable; close() flushes it."""
+        with open(path, "wb") as f:
+            f.write(FILE_HEADER.pack(FILE_MAGIC, size_bits, num_hashes))
+            f.truncate(FILE_HEADER.size + (size_bits + 7) // 8)
+        return cls._map(path, writable=True)
+
+    @classmethod
+    def open_file(cls, path: str) -> "BloomFilter":
+        """Map a filter file read-only without reading it into memory."""
+        return cls._map(path, writable=False)
+
+    @classmethod
+    def _map(cls, path: str, writable: bool) -> "BloomFilter":
+        fd = os.open(path, os.O_RDWR if writable else os.O_RDONLY)
+        try:
+            mapped = mmap.mmap(fd, 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        magic, size_bits, num_hashes = FILE_HEADER.unpack_from(mapped)
+        if magic != FILE_MAGIC or len(mapped) != FILE_HEADER.size + (size_bits + 7) // 8:
+            mapped.close()
+            raise ValueError(f"{path} is not a Bloom filter file")
+        bloom = cls(size_bits, num_hashes, memoryview(mapped)[FILE_HEADER.size:])
+        bloom._mmap = mapped
+        return bloom
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            writable = not self.bits.readonly
+            self.bits.release()
+            if writable:
+                self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
@@ -0,0 +1,90 @@
+import os
+import ipaddress
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from starlette.requests import Request
+
+# Client address behind the web BFF.
+#
+# Browser traffic reaches auth through the BFF, so the TCP peer is the BFF for
+# every user. The BFF sends the real client address in X-Forwarded-For; that
+# header is only believed when the peer is listed in TRUSTED_PROXIES
+# (comma-separated addresses or CIDRs, e.g. the BFF's Docker network).
+# Addresses are read right to left and trusted proxies are skipped, so a value
+# the client put in the header itself is never used.
+#
+# TRUSTED_PROXIES is read from app/.env, else from the process environment
+# (docker-compose.yml sets it for the Docker networks). While it is empty every
+# BFF request looks internal and the per-IP windows never apply, so startup
+# logs a warning (warn_if_no_trusted_proxies).
+#
+# A trusted peer that forwards no client is an internal caller, and so is an
+# untrusted peer with a private or loopback address: resolve_client_ip()
+# returns None for both, and per-client limits are skipped rather than shared.
+
+FORWARDED_FOR = "x-forwarded-for"
+
+Networks = Tuple[ipaddress._BaseNetwork, ...]
+
+
+@lru_cache(maxsize=8)
+def parse_trusted_proxies(value: str) -> Networks:
+    return tuple(
+        ipaddress.ip_network(part.strip(), strict=False)
+        for part in (value or "").split(",")
+        if part.strip()
+    )
+
+
+def _address(value: str):
+    try:
+        return ipaddress.ip_address(value.strip())
+    except ValueError:
+        return None
+
+
+def _trusted(address, trusted: Networks) -> bool:
+    return any(address in network for network in trusted)
+
+
+def resolve_client_ip(peer: Optional[str], forwarded_for: Optional[str], trusted: Networks) -> Optional[str]:
+    """The originating client's address, or None for internal callers."""
+    peer_address = _address(peer) if peer else None
+    if peer_address is None:
+        return None
+    if not _trusted(peer_address, trusted):
+        if peer_address.is_private or peer_address.is_loopback:
+            return None
+        return str(peer_address)
+
+    hops = [hop for hop in (forwarded_for or "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        address = _address(hop)
+        if address is None:
+            return None
+        if not _trusted(address, trusted):
+            return str(address)
+    return None
+
+
+def trusted_proxies(config) -> Networks:
+    return parse_trusted_proxies(config.get("TRUSTED_PROXIES", None) or os.getenv("TRUSTED_PROXIES", ""))
+
+
+def warn_if_no_trusted_proxies(config, logger) -> bool:
+    """Log a warning when rate limiting is on but no proxy is trusted. Returns True if it warned."""
+    if config.get("RATE_LIMIT_ENABLED", "true").lower() != "true" or trusted_proxies(config):
+        return False
+    logger.warning(
+        "TRUSTED_PROXIES is empty: requests through the web BFF carry no client IP, "
+        "so per-IP rate limits do not apply"
+    )
+    return True
+
+
+def client_ip(request: Request, config) -> Optional[str]:
+    """resolve_client_ip() for a request, with TRUSTED_PROXIES from config."""
+    trusted = trusted_proxies(config)
+    peer = request.client.host if request.client else None
+    return resolve_client_ip(peer, request.headers.get(FORWARDED_FOR), trusted)
@@ -1,6 +1,8 @@
 import os
 from dotenv import dotenv_values, load_dotenv
 
+_MISSING = object()
+
 class Config:
     _instance = None
 
@@ -22,8 +24,10 @@ class Config:
         self._env_vars = dotenv_values(dotenv_path=self.env_path)
         self._initialized = True
 
-    def get(self, key: str) -> str:
+    def get(self, key: str, default=_MISSING) -> str:
         value = self._env_vars.get(key)
         if value is None:
+            if default is not _MISSING:
+                return default
             raise KeyError(f"Environment variable '{key}' not found in {self.env_path}")
         return value
@@ -0,0 +1,168 @@
+import json
+import math
+import time
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event, Engine
+
+logger = logging.getLogger(__name__)
+
+# End-to-end request deadlines, as set by the web BFF.
+#
+# X-Request-Timeout-Ms carries the caller's remaining budget in milliseconds
+# (relative, so hosts need not agree on the clock). DeadlineMiddleware gives
+# each request that budget, capped by the service default, and runs the
+# handler as a task that is cancelled when the budget runs out (answered 504 if
+# nothing has been sent) or when the client disconnects.
+#
+# Database work is bounded by the same deadline: install_statement_timeout()
+# sets Postgres statement_timeout to the time left before each statement, so a
+# query for an abandoned request is killed by the server instead of running to
+# completion. The value is rounded up to whole seconds and only re-sent when it
+# changes, so most statements cost no extra round trip. A statement issued after
+# the deadline fails at once with DeadlineExceeded.
+
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+STATEMENT_TIMEOUT_STEP_MS = 1000
+
+# Long-running by design (profiling), so not bound by the request deadline
+EXEMPT_PATH_PREFIXES = ("/debug/",)
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline, or None outside a request."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def _requested_budget(scope) -> Optional[float]:
+    name = DEADLINE_HEADER.lower().encode("latin-1")
+    for key, value in scope.get("headers", []):
+        if key == name:
+            try:
+                return max(float(value) / 1000, 0.0)
+            except ValueError:
+                return None
+    return None
+
+
+def install_statement_timeout(engine: Engine, ceiling_ms: Optional[int] = None) -> None:
+    """Bound every statement run during a request by the request's remaining budget.
+
+    `ceiling_ms` is the connection's own statement_timeout, if it sets one; the
+    deadline only ever tightens it.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _apply_deadline(conn, cursor, statement, parameters, context, executemany):
+        left = remaining()
+        if left is None:
+            timeout_ms = None
+        elif left <= 0:
+            raise DeadlineExceeded("Request deadline exceeded before the statement was sent")
+        else:
+            timeout_ms = math.ceil(left * 1000 / STATEMENT_TIMEOUT_STEP_MS) * STATEMENT_TIMEOUT_STEP_MS
+            if ceiling_ms and timeout_ms >= ceiling_ms:
+                timeout_ms = None
+        if conn.info.get("statement_timeout_ms") == timeout_ms:
+            return
+        if timeout_ms is None:
+            cursor.execute("SET statement_timeout TO DEFAULT")
+        else:
+            cursor.execute(f"SET statement_timeout = {int(timeout_ms)}")
+        conn.info["statement_timeout_ms"] = timeout_ms
+
+    @event.listens_for(engine, "rollback")
+    def _forget_timeout(conn):
+        # A rollback also undoes a SET made inside the transaction
+        conn.info.pop("statement_timeout_ms", None)
+
+
+class DeadlineMiddleware:
+    def __init__(self, app, default_timeout_ms: float = 10000):
+        self.app = app
+        self.default_timeout = default_timeout_ms / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path", "").startswith(EXEMPT_PATH_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        budget = self.default_timeout
+        requested = _requested_budget(scope)
+        if requested is not None:
+            budget = min(budget, requested)
+        token = _deadline.set(time.monotonic() + budget)
+
+        # Read the client's messages ourselves so a disconnect is seen while the
+        # handler is busy, and hand them on in order when it asks
+        messages: asyncio.Queue = asyncio.Queue()
+        disconnected = asyncio.Event()
+        response_started = False
+
+        async def pump():
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    return
+
+        async def queued_receive():
+            return await messages.get()
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        handler = asyncio.ensure_future(self.app(scope, queued_receive, tracked_send))
+        reader = asyncio.ensure_future(pump())
+        watcher = asyncio.ensure_future(disconnected.wait())
+        try:
+            timed_out = False
+            while not handler.done():
+                left = None if response_started else remaining()
+                if left is not None and left <= 0:
+                    timed_out = True
+                    break
+                await asyncio.wait({handler, watcher}, timeout=left, return_when=asyncio.FIRST_COMPLETED)
+                if watcher.done() and not handler.done():
+                    break
+
+            if handler.done():
+                handler.result()
+                return
+
+            handler.cancel()
+            try:
+                await handler
+            except asyncio.CancelledError:
+                pass
+            if timed_out:
+                logger.warning("%s %s exceeded its %.0f ms deadline", scope.get("method"), scope.get("path"), budget * 1000)
+                if not response_started:
+                    await send({
+                        "type": "http.response.start",
+                        "status": 504,
+                        "headers": [(b"content-type", b"application/json")],
+                    })
+                    await send({"type": "http.response.body", "body": json.dumps({"detail": "Request deadline exceeded"}).encode()})
+            else:
+                logger.info("Client disconnected, cancelled %s %s", scope.get("method"), scope.get("path"))
+        finally:
+            for task in (reader, watcher, handler):
+                task.cancel()
+            _deadline.reset(token)
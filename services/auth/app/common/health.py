@@ -0,0 +1,99 @@
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.common.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Background dependency health checks.
+#
+# Each registered check runs every `interval` seconds on the event loop and the
+# latest result is kept in memory, so /status answers without touching Redis or
+# the database and a burst of health probes cannot pile onto the pools. A result
+# older than `stale_after` is reported as an error: it means the prober itself
+# has stopped, which is just as unhealthy as a failing dependency.
+
+probe_seconds = Histogram(
+    "auth_dependency_probe_seconds",
+    "Latency of background dependency health probes",
+    ("dependency",)
+)
+probe_failures = Counter(
+    "auth_dependency_probe_failures_total",
+    "Background dependency health probes that failed or timed out",
+    ("dependency",)
+)
+
+Check = Callable[[], Awaitable[None]]
+
+
+class HealthProber:
+    def __init__(self, interval: float = 5.0, timeout: float = 2.0, stale_after: Optional[float] = None):
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after if stale_after is not None else interval * 3 + timeout
+        self._checks: Dict[str, Check] = {}
+        self._results: Dict[str, dict] = {}
+
+    def register(self, name: str, check: Check) -> None:
+        """Add a dependency; `check` should raise (or return falsy) when it is unhealthy."""
+        self._checks[name] = check
+        self._results[name] = {"status": "error", "detail": "not checked yet", "latency_ms": None, "checked_at": None, "_ts": None}
+
+    async def probe(self, name: str) -> dict:
+        started = time.perf_counter()
+        try:
+            ok = await asyncio.wait_for(self._checks[name](), timeout=self.timeout)
+            detail = None if ok is None or ok else f"unexpected_response: {ok}"
+        except asyncio.TimeoutError:
+            detail = f"timed out after {self.timeout}s"
+        except Exception as e:
+            detail = str(e) or type(e).__name__
+        elapsed = time.perf_counter() - started
+
+        probe_seconds.observe(elapsed, dependency=name)
+        if detail is not None:
+            probe_failures.inc(dependency=name)
+            if self._results[name]["status"] == "ok":
+                logger.warning("Health probe for %s failing: %s", name, detail)
+        elif self._results[name]["status"] != "ok" and self._results[name]["_ts"] is not None:
+            logger.info("Health probe for %s recovered", name)
+
+        result = {
+            "status": "ok" if detail is None else "error",
+            "detail": detail,
+            "latency_ms": round(elapsed * 1000, 2),
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "_ts": time.monotonic(),
+        }
+        self._results[name] = result
+        return result
+
+    async def probe_all(self) -> None:
+        await asyncio.gather(*(self.probe(name) for name in self._checks))
+
+    async def run(self) -> None:
+        while True:
+            await self.probe_all()
+            await asyncio.sleep(self.interval)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Latest result per dependency, with the p95 probe latency; never performs I/O."""
+        now = time.monotonic()
+        snapshot = {}
+        for name, result in self._results.items():
+            component = {k: v for k, v in result.items() if k != "_ts"}
+            if result["_ts"] is not None and now - result["_ts"] > self.stale_after:
+                component["status"] = "error"
+                component["detail"] = f"stale: last checked {int(now - result['_ts'])}s ago"
+            p95 = probe_seconds.quantile(0.95, dependency=name)
+            component["p95_latency_ms"] = None if p95 is None else round(p95 * 1000, 2)
+            snapshot[name] = component
+        return snapshot
+
+    def healthy(self, snapshot: Optional[Dict[str, dict]] = None) -> bool:
+        snapshot = snapshot if snapshot is not None else self.snapshot()
+        return all(component["status"] == "ok" for component in snapshot.values())
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from typing import Optional
+
+from app.common.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Event-loop lag monitor and blocking-call detector (opt-in, LOOP_MONITOR=true;
+# main.py reads the settings).
+#
+# A task on the loop sleeps LOOP_MONITOR_INTERVAL_MS at a time and records how
+# late each wake-up was in auth_event_loop_lag_seconds. Every request shares
+# that lag, so it is the cost of synchronous work done inside async handlers.
+#
+# A watchdog thread watches the task's heartbeat. When the loop has not come
+# back for LOOP_BLOCK_THRESHOLD_MS, it captures the loop thread's stack while
+# the blocking call is still running and logs it with the app frame
+# responsible, once per stall. auth_event_loop_blocked_total counts stalls by
+# that frame, and auth_event_loop_blocked_seconds records their length. Cost is
+# one short timer on the loop and one sleeping thread; enable it in staging to
+# catch blocking regressions before production.
+
+STACK_FRAMES = 12
+
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Frames under this directory are this service's own code
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+loop_lag = Histogram("auth_event_loop_lag_seconds", "How late event-loop timers fire", buckets=LAG_BUCKETS)
+loop_blocked = Counter("auth_event_loop_blocked_total", "Event-loop stalls over LOOP_BLOCK_THRESHOLD_MS, by app frame", ("where",))
+loop_blocked_seconds = Histogram("auth_event_loop_blocked_seconds", "Length of event-loop stalls over LOOP_BLOCK_THRESHOLD_MS", buckets=LAG_BUCKETS)
+
+
+def _culprit(frame) -> str:
+    """The innermost frame in this service's code, else the innermost frame."""
+    innermost = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        location = f"{os.path.relpath(filename, os.path.dirname(APP_ROOT))}:{frame.f_lineno} {frame.f_code.co_name}"
+        if innermost is None:
+            innermost = f"{os.path.basename(filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+        if filename.startswith(APP_ROOT) and filename != __file__:
+            return location
+        frame = frame.f_back
+    return innermost or "unknown"
+
+
+class LoopMonitor:
+    def __init__(self, interval: float = 0.05, block_threshold: float = 0.1):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self._heartbeat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._stalled_at: Optional[str] = None
+        self._stopped = threading.Event()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        watchdog.start()
+        logger.info("Event-loop monitor on (interval %.0f ms, block threshold %.0f ms)",
+                    self.interval * 1000, self.block_threshold * 1000)
+        try:
+            while True:
+                expected = loop.time() + self.interval
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, loop.time() - expected)
+                self._heartbeat = time.monotonic()
+                loop_lag.observe(lag)
+                if lag >= self.block_threshold:
+                    loop_blocked_seconds.observe(lag)
+                    logger.warning("Event loop was blocked for %.0f ms at %s", lag * 1000, self._stalled_at or "unknown")
+                self._stalled_at = None
+        finally:
+            self._stopped.set()
+
+    def _watch(self) -> None:
+        reported = False
+        while not self._stopped.wait(self.block_threshold / 2):
+            stalled = time.monotonic() - self._heartbeat - self.interval
+            if stalled < self.block_threshold:
+                reported = False
+                continue
+            if reported:
+                continue
+            reported = True
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            where = _culprit(frame)
+            self._stalled_at = where
+            loop_blocked.inc(where=where)
+            stack = "".join(traceback.format_stack(frame, limit=STACK_FRAMES))
+            logger.warning("Event loop blocked for %.0f ms so far at %s\n%s", stalled * 1000, where, stack)
+
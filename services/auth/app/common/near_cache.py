@@ -0,0 +1,76 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+
+class NearCache:
+    """Bounded in-process LRU cache whose entries expire and can be dropped by tag.
+
+    Every invalidation bumps a generation counter. Callers snapshot it before a
+    slow lookup and pass it to put(), which refuses to store a value that an
+    invalidation may have made stale while the lookup was in flight.
+    """
+
+    def __init__(self, max_entries: int, max_ttl: float):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[str, Tuple[Any, float, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any, ttl: float, tags: Iterable[str] = (), generation: Optional[int] = None) -> bool:
+        ttl = min(ttl, self.max_ttl)
+        if ttl <= 0:
+            return False
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            tags = tuple(tags)
+            self._entries[key] = (value, time.monotonic() + ttl, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            return True
+
+    def invalidate_tag(self, tag: str) -> int:
+        with self._lock:
+            self.generation += 1
+            keys = self._tags.pop(tag, set())
+            for key in list(keys):
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._tags.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
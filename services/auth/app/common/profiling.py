@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+import threading
+import tracemalloc
+from collections import Counter
+from typing import Dict, Optional
+
+# Samplers behind the /debug/profile endpoints (app/infrastructure/routers/debug.py).
+#
+# SamplingProfiler samples every other thread's Python stack each interval for
+# the requested time and returns collapsed stacks ("thread;outer;...;inner"
+# -> samples), the input format of flamegraph.pl, speedscope and inferno.
+# Threads waiting in select/wait/queue get are skipped unless asked for, so
+# the graph shows where CPU goes. It runs only while a profile is being taken.
+#
+# HeapTracker wraps tracemalloc: start() turns tracing on and takes a baseline,
+# diff() returns the top allocation sites and their growth since the previous
+# snapshot or the baseline, stop() turns tracing off again (it slows every
+# allocation while on).
+
+IDLE_FILES = ("selectors.py", "threading.py", "queue.py")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    parts = code.co_filename.replace("\\", "/").rsplit("/", 2)
+    return f"{code.co_name} ({'/'.join(parts[-2:])}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the Python stacks of all other threads at a fixed interval."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def sample(self, seconds: float, interval: float, include_idle: bool = False) -> Dict[str, int]:
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A CPU profile is already running")
+        try:
+            own = threading.get_ident()
+            counts: Counter = Counter()
+            names = {}
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own:
+                        continue
+                    if not include_idle and os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_label(frame))
+                        frame = frame.f_back
+                    if thread_id not in names:
+                        names = {t.ident: t.name for t in threading.enumerate()}
+                    stack.append(names.get(thread_id, str(thread_id)).replace(";", ":"))
+                    counts[";".join(reversed(stack))] += 1
+                time.sleep(interval)
+            return dict(counts)
+        finally:
+            self._lock.release()
+
+
+class HeapTracker:
+    def __init__(self):
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.previous: Optional[tracemalloc.Snapshot] = None
+
+    @staticmethod
+    def _take() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+
+    def start(self, frames: int) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.baseline = self.previous = self._take()
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self.baseline = self.previous = None
+
+    def diff(self, compare_to: str, group_by: str, limit: int) -> dict:
+        if not tracemalloc.is_tracing() or self.baseline is None:
+            raise RuntimeError("Heap tracing is off; POST /debug/profile/heap/start first")
+        snapshot = self._take()
+        reference = self.baseline if compare_to == "baseline" else self.previous
+        stats = snapshot.compare_to(reference, group_by)
+        self.previous = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "compared_to": compare_to,
+            "top": [
+                {
+                    "where": [str(frame) for frame in stat.traceback],
+                    "size_bytes": stat.size,
+                    "size_diff_bytes": stat.size_diff,
+                    "count": stat.count,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in stats[:limit]
+            ],
+        }
+
+
+cpu_profiler = SamplingProfiler()
+heap_tracker = HeapTracker()
@@ -0,0 +1,74 @@
+import hmac
+import time
+import base64
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+
+# Signed access tokens are verifiable without a round trip to auth:
+#
+#   st1.{base64url(user_id|session_id|device_id|issued_at|expires_at)}.{base64url(hmac_sha256)}
+#
+# The MAC covers everything before the last dot, prefix included. Revocation is
+# not part of the token; verifiers check the session id against the deny-list
+# published by app/application/use_case/revocation.py.
+
+TOKEN_PREFIX = "st1"
+FIELD_SEPARATOR = "|"
+
+
+@dataclass(frozen=True)
+class SignedClaims:
+    user_id: str
+    session_id: str
+    device_id: str
+    issued_at: int
+    expires_at: int
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _mac(secret: str, message: str) -> bytes:
+    return hmac.new(secret.encode(), message.encode("ascii"), hashlib.sha256).digest()
+
+
+def is_signed_token(token: Optional[str]) -> bool:
+    return bool(token) and token.startswith(TOKEN_PREFIX + ".")
+
+
+def sign_access_token(secret: str, claims: SignedClaims) -> str:
+    payload = FIELD_SEPARATOR.join([
+        str(claims.user_id),
+        claims.session_id,
+        claims.device_id,
+        str(int(claims.issued_at)),
+        str(int(claims.expires_at)),
+    ])
+    message = f"{TOKEN_PREFIX}.{_b64encode(payload.encode())}"
+    return f"{message}.{_b64encode(_mac(secret, message))}"
+
+
+def verify_access_token(secret: str, token: str, now: Optional[int] = None) -> Optional[SignedClaims]:
+    """Return the claims of a well-formed, correctly signed and unexpired token, else None."""
+    if not is_signed_token(token):
+        return None
+
+    message, _, signature = token.rpartition(".")
+    try:
+        if not hmac.compare_digest(_b64decode(signature), _mac(secret, message)):
+            return None
+        fields = _b64decode(message[len(TOKEN_PREFIX) + 1:]).decode().split(FIELD_SEPARATOR)
+        user_id, session_id, device_id, issued_at, expires_at = fields
+        claims = SignedClaims(user_id, session_id, device_id, int(issued_at), int(expires_at))
+    except ValueError:
+        return None
+
+    if claims.expires_at <= (now if now is not None else int(time.time())):
+        return None
+    return claims
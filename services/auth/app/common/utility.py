@@ -1,10 +1,15 @@
 import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
 import secrets
 import base64
 
+from app.common.metrics import Histogram
+
 
 # Load environment variables from .env
 load_dotenv()
@@ -23,6 +28,56 @@ def verify_password(password: str, hashed: str) -> bool:
     except VerifyMismatchError:
         return False
 
+# Argon2 is deliberately slow and releases the GIL, so request handlers hash on a
+# small dedicated pool instead of stalling the event loop. Requests beyond
+# PASSWORD_HASH_WORKERS wait in the pool's queue; that wait is what
+# auth_password_hash_queue_seconds measures.
+_hash_executor = None
+
+password_hash_queue_seconds = Histogram(
+    "auth_password_hash_queue_seconds",
+    "Time password hashing jobs waited for a worker",
+    ("operation",)
+)
+password_hash_seconds = Histogram(
+    "auth_password_hash_seconds",
+    "Time spent hashing or verifying a password",
+    ("operation",)
+)
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        workers = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+        _hash_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+    return _hash_executor
+
+
+async def _run_on_hash_pool(operation: str, fn, *args):
+    submitted = time.perf_counter()
+
+    def job():
+        started = time.perf_counter()
+        password_hash_queue_seconds.observe(started - submitted, operation=operation)
+        try:
+            return fn(*args)
+        finally:
+            password_hash_seconds.observe(time.perf_counter() - started, operation=operation)
+
+    return await asyncio.get_running_loop().run_in_executor(_get_hash_executor(), job)
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password() on the hashing pool, for use inside request handlers."""
+    return await _run_on_hash_pool("hash", hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """verify_password() on the hashing pool, for use inside request handlers."""
+    return await _run_on_hash_pool("verify", verify_password, password, hashed)
+
+
 def generate_token(byte_length: int = 32) -> str:
     """Generate a secure URL-safe token with exact byte entropy."""
     token = secrets.token_bytes(byte_length)
@@ -0,0 +1,400 @@
+# app/dev/benchmark.py
+#
+# Drives register -> login -> validate -> refresh -> logout through the auth
+# router in-process and reports throughput, per-endpoint latency percentiles,
+# event loop lag and Argon2 pool queue time.
+#
+#   python -m app.dev.benchmark                           # in-memory KV and users
+#   python -m app.dev.benchmark --users 100 --iterations 20
+#   python -m app.dev.benchmark --kv redis --db postgres  # real stores from app/.env
+#   python -m app.dev.benchmark --set SESSION_NEAR_CACHE=true --json after.json
+#   python -m app.dev.benchmark --compare main HEAD --rounds 3
+#
+# Each virtual user registers once and then loops login, validate, refresh and
+# logout with its own cookie jar. Requests go straight to the ASGI app, so the
+# numbers exclude network and uvicorn overhead but include everything the
+# handlers do. Rate limiting is off unless --set RATE_LIMIT_ENABLED=true.
+#
+# --compare checks out both revisions into temporary git worktrees and runs this
+# file (from the working tree) against each, interleaving --rounds runs so both
+# see the same machine conditions. Both revisions must support the chosen --kv
+# and --db backends.
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import asyncio
+import logging
+import argparse
+import tempfile
+import platform
+import statistics
+import subprocess
+from typing import Dict, List, Optional
+
+from dotenv import dotenv_values
+
+ENV_PATH = os.path.join(os.path.dirname(__file__), "../.env")
+ENDPOINTS = ("register", "login", "validate", "refresh", "logout")
+LAG_INTERVAL = 0.01
+PASSWORD = "Bench-Password-1"
+
+BENCH_DEFAULTS = {
+    "ENVIRONMENT": "benchmark",
+    "ACCESS_TOKEN_TTL": "3600",
+    "REFRESH_TOKEN_TTL": "604800",
+    "RATE_LIMIT_ENABLED": "false",
+}
+
+
+def percentile(samples: List[float], q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered) + 0.5)) - 1))]
+
+
+def summarize_ms(samples: List[float]) -> dict:
+    return {
+        "p50": _ms(percentile(samples, 0.50)),
+        "p95": _ms(percentile(samples, 0.95)),
+        "p99": _ms(percentile(samples, 0.99)),
+        "max": _ms(max(samples) if samples else None),
+    }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def build_config(args):
+    """Write the effective settings to a throwaway .env and load Config from it."""
+    values = {}
+    if args.kv == "redis" or args.db == "postgres":
+        if not os.path.isfile(args.env_file):
+            raise SystemExit(f"--kv redis / --db postgres need {args.env_file}")
+        values.update({k: v for k, v in dotenv_values(args.env_file).items() if v is not None})
+    values.update(BENCH_DEFAULTS)
+    for item in args.set:
+        key, _, value = item.partition("=")
+        values[key] = value
+
+    handle, path = tempfile.mkstemp(prefix="auth-bench-", suffix=".env")
+    with os.fdopen(handle, "w") as f:
+        for key, value in values.items():
+            f.write(f"{key}={value}\n")
+    # Read by the hashing pool through os.getenv, so it must be set before first use
+    if "PASSWORD_HASH_WORKERS" in values:
+        os.environ["PASSWORD_HASH_WORKERS"] = values["PASSWORD_HASH_WORKERS"]
+
+    from app.common.config import Config
+    return Config(path), path
+
+
+def build_adapters(args, config):
+    if args.kv == "redis":
+        from app.interfaces.keyvalue.redis_adapter import RedisAdapter
+        keyvalue_adapter = RedisAdapter(config)
+    else:
+        from app.interfaces.keyvalue.memory_adapter import InMemoryKeyValueAdapter
+        keyvalue_adapter = InMemoryKeyValueAdapter()
+
+    if args.db == "postgres":
+        from app.interfaces.relationaldb.postgres_adapter import PostgresUserAdapter
+        database_adapter = PostgresUserAdapter(config)
+    else:
+        from app.interfaces.relationaldb.memory_adapter import InMemoryUserAdapter
+        database_adapter = InMemoryUserAdapter()
+    return database_adapter, keyvalue_adapter
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {name: [] for name in ENDPOINTS}
+        self.errors: Dict[str, int] = {name: 0 for name in ENDPOINTS}
+        self.first_error: Dict[str, str] = {}
+
+    async def call(self, name: str, request) -> bool:
+        started = time.perf_counter()
+        try:
+            response = await request
+            ok = response.status_code < 400
+            detail = f"HTTP {response.status_code}: {response.text[:200]}"
+        except Exception as e:
+            ok = False
+            detail = repr(e)
+        self.latencies[name].append(time.perf_counter() - started)
+        if not ok:
+            self.errors[name] += 1
+            self.first_error.setdefault(name, detail)
+        return ok
+
+
+async def monitor_loop_lag(samples: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(max(0.0, time.perf_counter() - started - LAG_INTERVAL))
+
+
+async def virtual_user(client, recorder: Recorder, email: str, iterations: int) -> None:
+    form = {"email": email, "password": PASSWORD, "first_name": "Bench", "last_name": "User"}
+    if not await recorder.call("register", client.post("/register", data=form)):
+        return
+    await client.post("/logout")
+
+    credentials = {"email": email, "password": PASSWORD}
+    for _ in range(iterations):
+        if not await recorder.call("login", client.post("/login", data=credentials)):
+            continue
+        await recorder.call("validate", client.get("/validate"))
+        await recorder.call("refresh", client.post("/refresh"))
+        await recorder.call("logout", client.post("/logout"))
+
+
+async def run_benchmark(args) -> dict:
+    import httpx
+    from fastapi import FastAPI
+    from app.infrastructure.routers.auth import get_router
+    from app.application.use_case.session_cache import configure_session_cache, run_invalidation_listener
+
+    config, env_path = build_config(args)
+    try:
+        database_adapter, keyvalue_adapter = build_adapters(args, config)
+        app = FastAPI()
+        app.include_router(get_router(database_adapter, keyvalue_adapter, config, None))
+
+        background = []
+        if configure_session_cache(config) is not None:
+            background.append(asyncio.create_task(run_invalidation_listener(keyvalue_adapter)))
+
+        recorder = Recorder()
+        lag_samples: List[float] = []
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(monitor_loop_lag(lag_samples, stop))
+
+        run_id = uuid.uuid4().hex[:8]
+        transport = httpx.ASGITransport(app=app)
+        clients = [httpx.AsyncClient(transport=transport, base_url="http://bench") for _ in range(args.users)]
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(
+                virtual_user(client, recorder, f"bench-{run_id}-{n}@example.com", args.iterations)
+                for n, client in enumerate(clients)
+            ))
+        finally:
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await lag_task
+            for client in clients:
+                await client.aclose()
+            for task in background:
+                task.cancel()
+            await asyncio.gather(*background, return_exceptions=True)
+            await keyvalue_adapter.close()
+    finally:
+        os.unlink(env_path)
+
+    endpoints = {}
+    for name in ENDPOINTS:
+        samples = recorder.latencies[name]
+        endpoints[name] = {
+            "count": len(samples),
+            "errors": recorder.errors[name],
+            "ops_per_sec": round(len(samples) / elapsed, 2),
+            "latency_ms": summarize_ms(samples),
+        }
+        if name in recorder.first_error:
+            endpoints[name]["first_error"] = recorder.first_error[name]
+
+    try:
+        from app.common.utility import password_hash_queue_seconds, password_hash_seconds
+    except ImportError:
+        # Revisions from before the hashing pool (--compare) hash on the event loop
+        password_hash_queue_seconds = password_hash_seconds = None
+
+    argon2 = {}
+    for operation in ("hash", "verify") if password_hash_queue_seconds else ():
+        count = password_hash_queue_seconds.count(operation=operation)
+        argon2[operation] = {
+            "count": count,
+            # Estimated from histogram buckets
+            "queue_ms": {q: _ms(password_hash_queue_seconds.quantile(v, operation=operation)) for q, v in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+            "mean_queue_ms": _ms(password_hash_queue_seconds.total(operation=operation) / count) if count else None,
+            "mean_hash_ms": _ms(password_hash_seconds.total(operation=operation) / count) if count else None,
+        }
+
+    total = sum(len(samples) for samples in recorder.latencies.values())
+    return {
+        "meta": {
+            "commit": git_describe(),
+            "users": args.users,
+            "iterations": args.iterations,
+            "kv": args.kv,
+            "db": args.db,
+            "settings": args.set,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "elapsed_sec": round(elapsed, 3),
+        "total": {
+            "requests": total,
+            "errors": sum(recorder.errors.values()),
+            "ops_per_sec": round(total / elapsed, 2),
+        },
+        "endpoints": endpoints,
+        "loop_lag_ms": summarize_ms(lag_samples),
+        "argon2": argon2,
+    }
+
+
+def git_describe() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _fmt(value) -> str:
+    return "-" if value is None else f"{value:g}"
+
+
+def print_report(result: dict) -> None:
+    meta = result["meta"]
+    print(f"commit {meta['commit']}  users={meta['users']} iterations={meta['iterations']} kv={meta['kv']} db={meta['db']} {' '.join(meta['settings'])}")
+    print(f"{result['total']['requests']} requests in {result['elapsed_sec']}s: {result['total']['ops_per_sec']} ops/s, {result['total']['errors']} errors")
+    print()
+    print(f"{'endpoint':<10} {'count':>7} {'errors':>6} {'ops/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in result["endpoints"].items():
+        latency = stats["latency_ms"]
+        print(f"{name:<10} {stats['count']:>7} {stats['errors']:>6} {stats['ops_per_sec']:>9} "
+              f"{_fmt(latency['p50']):>9} {_fmt(latency['p95']):>9} {_fmt(latency['p99']):>9}")
+    for name, stats in result["endpoints"].items():
+        if "first_error" in stats:
+            print(f"  first {name} error: {stats['first_error']}")
+    print()
+    lag = result["loop_lag_ms"]
+    print(f"event loop lag ms  p50={_fmt(lag['p50'])} p95={_fmt(lag['p95'])} p99={_fmt(lag['p99'])} max={_fmt(lag['max'])}")
+    for operation, stats in result["argon2"].items():
+        queue = stats["queue_ms"]
+        print(f"argon2 {operation:<6} n={stats['count']:<6} queue ms p50={_fmt(queue['p50'])} p95={_fmt(queue['p95'])} "
+              f"p99={_fmt(queue['p99'])} mean={_fmt(stats['mean_queue_ms'])}  hash mean ms={_fmt(stats['mean_hash_ms'])}")
+
+
+def comparable_metrics(result: dict) -> Dict[str, float]:
+    metrics = {"total ops/s": result["total"]["ops_per_sec"]}
+    for name, stats in result["endpoints"].items():
+        for q in ("p50", "p95", "p99"):
+            if stats["latency_ms"][q] is not None:
+                metrics[f"{name} {q} ms"] = stats["latency_ms"][q]
+    for q in ("p50", "p99", "max"):
+        if result["loop_lag_ms"][q] is not None:
+            metrics[f"loop lag {q} ms"] = result["loop_lag_ms"][q]
+    for operation, stats in result["argon2"].items():
+        if stats["mean_queue_ms"] is not None:
+            metrics[f"argon2 {operation} queue ms"] = stats["mean_queue_ms"]
+    return metrics
+
+
+def compare(args, passthrough: List[str]) -> None:
+    here = os.path.dirname(os.path.abspath(__file__))
+    top = subprocess.run(["git", "rev-parse", "--show-toplevel"], capture_output=True, text=True, check=True, cwd=here).stdout.strip()
+    prefix = subprocess.run(["git", "rev-parse", "--show-prefix"], capture_output=True, text=True, check=True, cwd=os.path.join(here, "../..")).stdout.strip()
+
+    workdir = tempfile.mkdtemp(prefix="auth-bench-compare-")
+    worktrees = []
+    results = [[], []]
+    try:
+        for side, rev in enumerate(args.compare):
+            tree = os.path.join(workdir, f"tree{side}")
+            subprocess.run(["git", "worktree", "add", "--detach", "--quiet", tree, rev], check=True, cwd=top)
+            worktrees.append(tree)
+            # Same driver for both sides so only the service code differs
+            shutil.copy(os.path.abspath(__file__), os.path.join(tree, prefix, "app/dev/benchmark.py"))
+
+        for round_number in range(args.rounds):
+            for side, rev in enumerate(args.compare):
+                out = os.path.join(workdir, f"{side}-{round_number}.json")
+                print(f"round {round_number + 1}/{args.rounds}: {rev}", file=sys.stderr)
+                subprocess.run(
+                    [sys.executable, "-m", "app.dev.benchmark", *passthrough,
+                     "--env-file", os.path.abspath(args.env_file), "--json", out, "--quiet"],
+                    check=True, cwd=os.path.join(worktrees[side], prefix)
+                )
+                with open(out) as f:
+                    results[side].append(json.load(f))
+    finally:
+        for tree in worktrees:
+            subprocess.run(["git", "worktree", "remove", "--force", tree], cwd=top)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    base, head = args.compare
+    base_metrics = [comparable_metrics(r) for r in results[0]]
+    head_metrics = [comparable_metrics(r) for r in results[1]]
+    print(f"median of {args.rounds} round(s)")
+    print(f"{'metric':<28} {base[:14]:>14} {head[:14]:>14} {'change':>9}")
+    for key in base_metrics[0]:
+        a = statistics.median(m[key] for m in base_metrics if key in m)
+        b_values = [m[key] for m in head_metrics if key in m]
+        if not b_values:
+            continue
+        b = statistics.median(b_values)
+        change = f"{(b - a) / a * 100:+.1f}%" if a else "-"
+        print(f"{key:<28} {a:>14g} {b:>14g} {change:>9}")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Auth service load test")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=10, help="login/validate/refresh/logout loops per user")
+    parser.add_argument("--kv", choices=("memory", "redis"), default="memory")
+    parser.add_argument("--db", choices=("memory", "postgres"), default="memory")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="override a config setting")
+    parser.add_argument("--env-file", default=ENV_PATH, help="settings for --kv redis / --db postgres")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), help="benchmark two git revisions")
+    parser.add_argument("--rounds", type=int, default=1, help="interleaved runs per revision with --compare")
+    parser.add_argument("--quiet", action="store_true", help="no report on stdout")
+    return parser.parse_known_args(argv)
+
+
+def passthrough_args(argv: List[str]) -> List[str]:
+    """Drop the --compare/--rounds/--json/--env-file options before re-invoking."""
+    skip = {"--compare": 2, "--rounds": 1, "--json": 1, "--env-file": 1}
+    out, i = [], 0
+    while i < len(argv):
+        if argv[i] in skip:
+            i += skip[argv[i]] + 1
+            continue
+        out.append(argv[i])
+        i += 1
+    return out
+
+
+def main(argv: List[str]) -> None:
+    args, unknown = parse_args(argv)
+    if unknown:
+        raise SystemExit(f"Unknown arguments: {' '.join(unknown)}")
+
+    if args.compare:
+        compare(args, passthrough_args(argv))
+        return
+
+    # Handler logging would dominate the measurement
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    result = asyncio.run(run_benchmark(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    if not args.quiet:
+        print_report(result)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
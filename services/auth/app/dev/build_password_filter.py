@@ -0,0 +1,99 @@
+# app/dev/build_password_filter.py
+#
+# Builds the breached-password Bloom filter read by register and reset_password
+# (BREACHED_PASSWORD_FILTER). The corpus is streamed line by line and bits are
+# set directly in the memory-mapped output file, so neither the corpus nor the
+# filter has to fit in Python memory.
+#
+#   python -m app.dev.build_password_filter passwords.txt breached.bloom
+#   python -m app.dev.build_password_filter pwned-passwords-sha1.txt.gz breached.bloom --format sha1 --min-count 10
+#
+# --format plain: one password per line (e.g. a wordlist).
+# --format sha1:  HIBP-style "SHA1HEX[:COUNT]" lines; --min-count drops rarer entries.
+#
+# Entries are stored as upper-case SHA-1 hex, the same key breached_password.py
+# looks up, so both formats produce interchangeable filters. Without --capacity
+# the corpus is read twice: once to count entries, once to insert them.
+import os
+import sys
+import gzip
+import time
+import hashlib
+import argparse
+from typing import Iterator, Optional
+
+from app.common.bloom_filter import BloomFilter, optimal_parameters
+
+
+def open_corpus(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def corpus_keys(path: str, corpus_format: str, min_count: int) -> Iterator[str]:
+    with open_corpus(path) as lines:
+        for line in lines:
+            line = line.rstrip("\r\n")
+            if not line:
+                continue
+            if corpus_format == "plain":
+                yield hashlib.sha1(line.encode("utf-8")).hexdigest().upper()
+                continue
+            digest, _, count = line.partition(":")
+            if len(digest) != 40:
+                continue
+            if min_count > 1 and count and int(count) < min_count:
+                continue
+            yield digest.upper()
+
+
+def build(path: str, output: str, corpus_format: str, error_rate: float, min_count: int, capacity: Optional[int]) -> dict:
+    started = time.monotonic()
+    if capacity is None:
+        capacity = sum(1 for _ in corpus_keys(path, corpus_format, min_count))
+
+    size_bits, num_hashes = optimal_parameters(capacity, error_rate)
+    tmp = f"{output}.tmp"
+    bloom = BloomFilter.create_file(tmp, size_bits, num_hashes)
+    added = 0
+    try:
+        for key in corpus_keys(path, corpus_format, min_count):
+            bloom.add(key)
+            added += 1
+            if added % 1_000_000 == 0:
+                print(f"  {added:,} entries", file=sys.stderr)
+    finally:
+        bloom.close()
+    # Readers map the file, so swap it in whole rather than rewriting it in place
+    os.replace(tmp, output)
+
+    return {
+        "entries": added,
+        "capacity": capacity,
+        "bits": size_bits,
+        "hashes": num_hashes,
+        "bytes": os.path.getsize(output),
+        "seconds": round(time.monotonic() - started, 1),
+    }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Build the breached-password Bloom filter")
+    parser.add_argument("corpus", help="password list or HIBP SHA-1 list (.gz accepted)")
+    parser.add_argument("output", help="filter file to write")
+    parser.add_argument("--format", choices=("plain", "sha1"), default="plain", dest="corpus_format")
+    parser.add_argument("--error-rate", type=float, default=0.001, help="false-positive rate (default 0.001)")
+    parser.add_argument("--min-count", type=int, default=1, help="sha1 format: skip entries seen fewer times")
+    parser.add_argument("--capacity", type=int, help="expected entries; skips the counting pass")
+    args = parser.parse_args(argv)
+
+    stats = build(args.corpus, args.output, args.corpus_format, args.error_rate, args.min_count, args.capacity)
+    if stats["entries"] > stats["capacity"]:
+        print(f"Warning: {stats['entries']:,} entries exceed --capacity {stats['capacity']:,}; "
+              f"the false-positive rate is above {args.error_rate}", file=sys.stderr)
+    print(f"Wrote {args.output}: {stats}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
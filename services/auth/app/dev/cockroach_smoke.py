@@ -0,0 +1,53 @@
+# app/dev/cockroach_smoke.py
+#
+# Exercises CockroachUserAdapter against a live cluster, e.g. the single-node
+# instance from docker-compose (profile "cockroach"):
+#
+#   docker compose --profile cockroach up -d auth_cockroach
+#   python -m app.dev.cockroach_smoke [--writers 8]
+#
+# Uses the COCKROACH_* settings from app/.env (COCKROACH_DB must exist; the
+# insecure single node has "defaultdb" and user "root"). Creates the users table
+# if needed, then checks create/read round trips, stale id lookups and
+# concurrent writes to one row, and prints the retry and stale-read counters.
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.common.config import Config
+from app.common.utility import hash_password
+from app.interfaces.relationaldb.cockroachdb import CockroachUserAdapter, transaction_retries, stale_reads
+
+
+def main(writers: int):
+    config = Config(os.path.join(os.path.dirname(__file__), "../.env"))
+    adapter = CockroachUserAdapter(config)
+    try:
+        adapter.ping()
+        adapter.create_tables()
+
+        email = f"smoke-{uuid.uuid4().hex[:8]}@example.com"
+        user = adapter.create_user(email, hash_password("smoke-password"), "Smoke", "Test")
+        assert adapter.get_user_by_email(email).id == user.id, "email lookup"
+        # Brand new row: a stale snapshot cannot contain it, so this exercises the fresh fallback
+        assert adapter.get_user_by_id(user.id).email == email, "id lookup"
+        print(f"created and read back {user.id}")
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=writers) as pool:
+            list(pool.map(lambda _: adapter.mark_email_verified(user.id), range(writers * 4)))
+        print(f"{writers * 4} concurrent writes to one row in {time.perf_counter() - started:.2f}s")
+        assert adapter.get_user_by_email(email).is_verified, "concurrent writes"
+
+        print(f"retries: {dict(transaction_retries._values) or 0}")
+        print(f"stale reads: {dict(stale_reads._values) or 'off'}")
+        print("OK")
+    finally:
+        adapter.close()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[args.index("--writers") + 1]) if "--writers" in args else 8)
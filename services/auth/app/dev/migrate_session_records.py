@@ -0,0 +1,103 @@
+# app/dev/migrate_session_records.py
+#
+# Rewrites legacy JSON session records (json.dumps(UserToken.__dict__)) into the
+# compact v2 format, shrinks their refresh pointers and backfills the
+# user:access:{token} pointers used by /validate and the user:sessions:{user_id}
+# index used by /sessions. Remaining TTLs are preserved.
+#
+#   python -m app.dev.migrate_session_records [--dry-run]
+#
+# Until this has run, legacy sessions only validate with SESSION_LEGACY_SCAN=true
+# (a scan of user:tokens:* per unknown token); remove that setting afterwards.
+import os
+import sys
+import time
+import asyncio
+import logging
+
+from app.common.config import Config
+from app.interfaces.keyvalue.redis_adapter import RedisAdapter
+from app.interfaces.keyvalue.session_record import (
+    SESSION_KEY_PREFIX,
+    session_index_key,
+    access_key,
+    refresh_key,
+    encode_session,
+    decode_session,
+    encode_pointer,
+    is_legacy_record,
+    split_session_key,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
+logger = logging.getLogger(__name__)
+
+SCAN_BATCH = 1000
+
+
+async def migrate(keyvalue_adapter, dry_run: bool = False) -> dict:
+    stats = {"scanned": 0, "migrated": 0, "skipped": 0, "failed": 0}
+    now = int(time.time())
+
+    async for key in keyvalue_adapter.iter_keys(f"{SESSION_KEY_PREFIX}*", batch_size=SCAN_BATCH):
+        stats["scanned"] += 1
+        raw = await keyvalue_adapter.get_token(key)
+        if not is_legacy_record(raw):
+            stats["skipped"] += 1
+            continue
+
+        try:
+            user_id, device_id = split_session_key(key)
+            token = decode_session(raw, device_id)
+        except Exception as e:
+            logger.warning("Cannot decode %s: %s", key, e)
+            stats["failed"] += 1
+            continue
+
+        ttl = await keyvalue_adapter.ttl(key)
+        if ttl is None:
+            # Expired between SCAN and GET
+            stats["skipped"] += 1
+            continue
+
+        if dry_run:
+            stats["migrated"] += 1
+            continue
+
+        # Only rewrite the record we read; a login in the meantime already wrote v2
+        if not await keyvalue_adapter.compare_and_swap(key, raw, encode_session(token)):
+            stats["skipped"] += 1
+            continue
+
+        pointer = encode_pointer(user_id, device_id)
+        if token.refresh_token:
+            # Only rewrite an existing refresh pointer, keeping its own TTL
+            old_pointer = await keyvalue_adapter.get_token(refresh_key(token.refresh_token))
+            if old_pointer is not None:
+                await keyvalue_adapter.compare_and_swap(refresh_key(token.refresh_token), old_pointer, pointer)
+        access_ttl = token.expires_at - now
+        if ttl > 0:
+            access_ttl = min(access_ttl, ttl)
+        if token.access_token and access_ttl > 0:
+            await keyvalue_adapter.set_token(access_key(token.access_token), pointer, ex=access_ttl)
+        if ttl > 0:
+            await keyvalue_adapter.add_to_index(session_index_key(user_id), device_id, score=now + ttl, ex=ttl)
+        stats["migrated"] += 1
+
+    return stats
+
+
+async def main(dry_run: bool):
+    config = Config(os.path.join(os.path.dirname(__file__), "../.env"))
+    keyvalue_adapter = RedisAdapter(config)
+    try:
+        stats = await migrate(keyvalue_adapter, dry_run=dry_run)
+    finally:
+        await keyvalue_adapter.close()
+
+    mode = "Dry run" if dry_run else "Migration"
+    print(f"{mode} complete: {stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(dry_run="--dry-run" in sys.argv[1:]))
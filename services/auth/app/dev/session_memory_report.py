@@ -0,0 +1,129 @@
+# app/dev/session_memory_report.py
+#
+# Reports the per-session footprint of the legacy JSON session layout versus the
+# compact v2 layout (see app/interfaces/keyvalue/session_record.py).
+#
+#   python -m app.dev.session_memory_report            # payload bytes only
+#   python -m app.dev.session_memory_report --live 1000
+#
+# With --live N, N synthetic sessions are written in each layout under a
+# throwaway prefix, measured with MEMORY USAGE and deleted again.
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+
+from app.common.config import Config
+from app.common.utility import generate_token
+from app.infrastructure.keyvalue.redis_driver import RedisDriver
+from app.interfaces.keyvalue.token_data_object import UserToken
+from app.interfaces.keyvalue.session_record import (
+    session_key,
+    access_key,
+    refresh_key,
+    encode_session,
+    encode_pointer,
+)
+
+REPORT_PREFIX = "memreport:"
+SAMPLE_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
+)
+
+
+def sample_session(device_id: str = "web_browser") -> tuple:
+    now = int(time.time())
+    token = UserToken(
+        access_token=generate_token(),
+        refresh_token=generate_token(),
+        issued_at=now,
+        expires_at=now + 3600,
+        ip_address="203.0.113.54",
+        user_agent=SAMPLE_USER_AGENT,
+        device_id=device_id,
+        session_id=generate_token(),
+    )
+    return str(uuid.uuid4()), token
+
+
+def legacy_entries(user_id: str, token: UserToken) -> dict:
+    key = session_key(user_id, token.device_id)
+    return {
+        key: json.dumps(token.__dict__),
+        refresh_key(token.refresh_token): json.dumps({
+            "user_id": user_id,
+            "device_id": token.device_id,
+            "redis_key": key,
+        }),
+    }
+
+
+def compact_entries(user_id: str, token: UserToken) -> dict:
+    pointer = encode_pointer(user_id, token.device_id)
+    return {
+        session_key(user_id, token.device_id): encode_session(token),
+        refresh_key(token.refresh_token): pointer,
+        access_key(token.access_token): pointer,
+    }
+
+
+def payload_bytes(entries: dict) -> int:
+    return sum(len(k.encode()) + len(v.encode()) for k, v in entries.items())
+
+
+async def measure_live(client, builder, count: int) -> float:
+    keys = []
+    pipe = client.pipeline(transaction=False)
+    for _ in range(count):
+        user_id, token = sample_session()
+        for key, value in builder(user_id, token).items():
+            key = REPORT_PREFIX + key
+            keys.append(key)
+            pipe.set(key, value, ex=600)
+    await pipe.execute()
+
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        pipe.memory_usage(key, samples=0)
+    usage = await pipe.execute()
+
+    for i in range(0, len(keys), 1000):
+        await client.delete(*keys[i:i + 1000])
+
+    return sum(u or 0 for u in usage) / count
+
+
+async def main(live_count: int):
+    user_id, token = sample_session()
+    legacy = legacy_entries(user_id, token)
+    compact = compact_entries(user_id, token)
+
+    print("Session layout           keys  payload bytes/session")
+    print(f"legacy (JSON)            {len(legacy):>4}  {payload_bytes(legacy):>8}")
+    print(f"compact (v2)             {len(compact):>4}  {payload_bytes(compact):>8}")
+
+    if live_count <= 0:
+        return
+
+    config = Config(os.path.join(os.path.dirname(__file__), "../.env"))
+    client = RedisDriver(config).get_client()
+    try:
+        legacy_usage = await measure_live(client, legacy_entries, live_count)
+        compact_usage = await measure_live(client, compact_entries, live_count)
+    finally:
+        await client.close()
+
+    print()
+    print(f"Redis MEMORY USAGE over {live_count} sessions (bytes/session)")
+    print(f"legacy (JSON)            {legacy_usage:>10.1f}")
+    print(f"compact (v2)             {compact_usage:>10.1f}")
+    print(f"sessions per GiB (v2)    {int((1 << 30) / compact_usage):>10}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    count = int(args[args.index("--live") + 1]) if "--live" in args else 0
+    asyncio.run(main(count))
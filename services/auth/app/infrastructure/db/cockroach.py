@@ -1,56 +1,74 @@
-# app/infrastructure/db/cockroach.py
-
-import os
-import sys
-from pathlib import Path
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
-
-# Resolve project root based on the main entry point
-main_module = sys.modules.get("__main__")
-main_file = getattr(main_module, "__file__", None)
-
-if main_file is None:
-    raise RuntimeError("Unable to determine project root from __main__.__file__")
-
-project_root = Path(main_file).resolve().parent
-load_dotenv(dotenv_path=project_root / ".env")
-
-# Required environment variables (must match .env exactly)
-required_vars = [
-    "COCKROACH_USER",
-    "COCKROACH_PASSWORD",
-    "COCKROACH_HOST",
-    "COCKROACH_PORT",
-    "COCKROACH_DB",
-    "COCKROACH_SSL",
-]
-
-missing = [var for var in required_vars if os.getenv(var) is None]
-if missing:
-    raise EnvironmentError(f"Missing required environment variables: {', '.join(missing)}")
-
-# Get values
-COCKROACH_USER = os.getenv("COCKROACH_USER")
-COCKROACH_PASSWORD = os.getenv("COCKROACH_PASSWORD", "")
-COCKROACH_HOST = os.getenv("COCKROACH_HOST")
-COCKROACH_PORT = os.getenv("COCKROACH_PORT")
-COCKROACH_DB = os.getenv("COCKROACH_DB")
-COCKROACH_SSL = os.getenv("COCKROACH_SSL")
-
-sslmode = "require" if COCKROACH_SSL == "true" else "disable"
-
-# Connection string
-DATABASE_URL = (
-    f"cockroachdb://{COCKROACH_USER}:{COCKROACH_PASSWORD}@"
-    f"{COCKROACH_HOST}:{COCKROACH_PORT}/{COCKROACH_DB}"
-    f"?sslmode={sslmode}"
-)
-
-def get_engine():
-    return create_engine(DATABASE_URL, echo=False, pool_pre_ping=True)
-
-def get_sessionmaker():
-    engine = get_engine()
-    return sessionmaker(bind=engine, autocommit=False, autoflush=False)
+from sqlalchemy import create_engine, Engine
+from sqlalchemy.orm import sessionmaker, Session
+from app.common.config import Config
+from app.common.deadline import install_statement_timeout
+from app.common.tracing import instrument_engine
+from app.common.db_cost import install_db_cost
+
+def cockroach_url(config: Config) -> str:
+    """SQLAlchemy URL for the COCKROACH_* settings; EnvironmentError names any that are missing."""
+    user = config.get("COCKROACH_USER", None)
+    password = config.get("COCKROACH_PASSWORD", "")
+    host = config.get("COCKROACH_HOST", None)
+    port = config.get("COCKROACH_PORT", None)
+    db = config.get("COCKROACH_DB", None)
+    ssl_raw = config.get("COCKROACH_SSL", None)
+
+    missing = [k for k, v in {
+        "COCKROACH_USER": user,
+        "COCKROACH_HOST": host,
+        "COCKROACH_PORT": port,
+        "COCKROACH_DB": db,
+        "COCKROACH_SSL": ssl_raw,
+    }.items() if v is None]
+
+    if missing:
+        raise EnvironmentError(f"Missing required environment variables: {', '.join(missing)}")
+
+    sslmode = "require" if ssl_raw.lower() == "true" else "disable"
+    credentials = f"{user}:{password}" if password else user
+    return f"cockroachdb+psycopg2://{credentials}@{host}:{port}/{db}?sslmode={sslmode}"
+
+
+class CockroachDriver:
+    """Engine and session factory for CockroachDB (cockroachdb+psycopg2 dialect).
+
+    Pool settings are tunable because a Cockroach cluster is scaled by adding
+    nodes: recycling connections lets a load balancer spread them onto new
+    nodes instead of pinning every worker to the ones that existed at boot.
+    """
+
+    def __init__(self, config: Config):
+        self._config = config
+        self._engine = self._create_engine()
+        self._SessionLocal = sessionmaker(bind=self._engine, autocommit=False, autoflush=False)
+
+    def _create_engine(self) -> Engine:
+        url = cockroach_url(self._config)
+
+        statement_timeout_ms = int(self._config.get("COCKROACH_STATEMENT_TIMEOUT_MS", 5000))
+        engine = create_engine(
+            url,
+            echo=False,
+            pool_pre_ping=True,
+            pool_size=int(self._config.get("COCKROACH_POOL_SIZE", 10)),
+            max_overflow=int(self._config.get("COCKROACH_MAX_OVERFLOW", 20)),
+            pool_recycle=int(self._config.get("COCKROACH_POOL_RECYCLE", 1800)),
+            connect_args={
+                "application_name": self._config.get("COCKROACH_APPLICATION_NAME", "auth"),
+                "options": f"-c statement_timeout={statement_timeout_ms}",
+            },
+        )
+        install_statement_timeout(engine, ceiling_ms=statement_timeout_ms)
+        instrument_engine(engine, system="cockroachdb")
+        install_db_cost(engine)
+        return engine
+
+    def get_engine(self) -> Engine:
+        return self._engine
+
+    def get_sessionmaker(self) -> sessionmaker:
+        return self._SessionLocal
+
+    def get_session(self) -> Session:
+        return self._SessionLocal()
@@ -1,6 +1,9 @@
 from sqlalchemy import create_engine, Engine
 from sqlalchemy.orm import sessionmaker, Session
 from app.common.config import Config
+from app.common.deadline import install_statement_timeout
+from app.common.tracing import instrument_engine
+from app.common.db_cost import install_db_cost
 
 class PostgresDriver:
     def __init__(self, config: Config):
@@ -30,7 +33,11 @@ class PostgresDriver:
 
         sslmode = "require" if ssl_raw.lower() == "true" else "disable"
         url = f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{db}?sslmode={sslmode}"
-        return create_engine(url, echo=False, pool_pre_ping=True)
+        engine = create_engine(url, echo=False, pool_pre_ping=True)
+        install_statement_timeout(engine)
+        instrument_engine(engine)
+        install_db_cost(engine)
+        return engine
 
     def get_session(self) -> Session:
         return self._SessionLocal()
@@ -1,5 +1,32 @@
 import redis.asyncio as redis
 from app.common.config import Config
+from app.common import tracing
+
+
+def _command_span(name: str):
+    return tracing.span(f"{name} redis", tracing.CLIENT, {"db.system": "redis", "db.operation": name})
+
+
+class TracedPipeline(redis.client.Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        if tracing.current_span() is None:
+            return await super().execute(raise_on_error)
+        with _command_span("PIPELINE") as pipeline_span:
+            pipeline_span.set_attribute("db.redis.commands", len(self.command_stack))
+            return await super().execute(raise_on_error)
+
+
+class TracedRedis(redis.Redis):
+    """Redis client that records each command, and each pipeline as a whole, as a span."""
+
+    async def execute_command(self, *args, **options):
+        if tracing.current_span() is None:
+            return await super().execute_command(*args, **options)
+        with _command_span(str(args[0]).upper()):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> TracedPipeline:
+        return TracedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
 
 class RedisDriver:
     _instance = None
@@ -32,7 +59,7 @@ class RedisDriver:
             raise EnvironmentError(f"Missing required environment variables: {', '.join(missing)}")
 
         ssl = ssl_raw.lower() == "true"
-        return redis.Redis(
+        return TracedRedis(
             host=host,
             port=int(port),
             db=int(db),
@@ -11,13 +11,12 @@ from app.common.config import Config # To be passed to the use cases for static
 
 
 from app.common.cookie_helper import set_auth_cookies, clear_auth_cookies # Making sure the cookies are consistent across the application
-
-from app.interfaces.keyvalue.token_data_object import UserToken
+from app.common.client_ip import client_ip # X-Forwarded-For from the BFF, honoured only from TRUSTED_PROXIES
 
 # Interfaces
 from app.interfaces.relationaldb.relationaldb_repo import RelationalRepository
 from app.interfaces.keyvalue.keyvalue_repo import KeyValueRepository
-from app.interfaces.user_notification.user_notification_repo import Notifier
+from app.interfaces.user_notification.notification_outbox_repo import NotificationOutbox
 
 # Use Cases
 from app.application.use_case.auth_response import AuthResponse
@@ -26,10 +25,12 @@ from app.application.use_case.refresh_token import refresh as refresh_use_case
 from app.application.use_case.get_user_from_token import get_user_from_token
 from app.application.use_case.forgot_password import forgot_password as forgot_password_use_case
 from app.application.use_case.reset_password import reset_password as reset_password_use_case
+from app.application.use_case import sessions as sessions_use_case
+from app.application.use_case.rate_limit import check_rate_limit
 
 
 
-def get_router(relational_db_adapter, key_value_adapter, config: Config, user_notification_adapter) -> APIRouter:
+def get_router(relational_db_adapter, key_value_adapter, config: Config, notification_outbox) -> APIRouter:
     def get_relational_adapter() -> RelationalRepository:
         logger.debug("Injecting relational_db_adapter: %s", relational_db_adapter)
         return relational_db_adapter
@@ -42,9 +43,20 @@ def get_router(relational_db_adapter, key_value_adapter, config: Config, user_no
         logger.debug("Injecting config: %s", config)
         return config
     
-    def get_notification_adapter() -> Notifier:
-        logger.debug("Injecting notification_adapter: %s", user_notification_adapter)
-        return user_notification_adapter
+    def get_notification_outbox() -> NotificationOutbox:
+        logger.debug("Injecting notification_outbox: %s", notification_outbox)
+        return notification_outbox
+
+    async def enforce_rate_limit(action: str, request: Request, email: str, kv, config):
+        # The BFF's address is shared by every user; limit per originating client
+        ip_address = client_ip(request, config)
+        result = await check_rate_limit(kv, config, action, ip_address, email)
+        if not result.allowed:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many attempts. Please try again later.",
+                headers={"Retry-After": str(result.retry_after)}
+            )
 
     @router.post("/register")
     async def register(
@@ -59,6 +71,7 @@ def get_router(relational_db_adapter, key_value_adapter, config: Config, user_no
         config: Config = Depends(get_config)
     ):
         logger.info("Register endpoint called with email: %s", email)
+        await enforce_rate_limit("register", request, email, kv, config)
 
         ip_address = request.client.host if request.client else "0.0.0.0"
         user_agent = request.headers.get("user-agent", "unknown")
@@ -104,6 +117,7 @@ def get_router(relational_db_adapter, key_value_adapter, config: Config, user_no
         config: Config = Depends(get_config)
     ):
         logger.info("Login endpoint called with email: %s", email)
+        await enforce_rate_limit("login", request, email, kv, config)
         logger.debug("Received dependencies - repo: %s, kv: %s, config: %s", repo, kv, config)
 
         ip_address = request.client.host if request.client else "0.0.0.0"
@@ -267,17 +281,18 @@ def get_router(relational_db_adapter, key_value_adapter, config: Config, user_no
         email: str = Form(...),
         repo: RelationalRepository = Depends(get_relational_adapter),
         kv: KeyValueRepository = Depends(get_keyvalue_adapter),
-        notifier: Notifier = Depends(get_notification_adapter),
+        outbox: NotificationOutbox = Depends(get_notification_outbox),
         config: Config = Depends(get_config)
     ):
         logger.info("Forgot password endpoint called for email: %s", email)
+        await enforce_rate_limit("forgot_password", request, email, kv, config)
 
         try:
             await forgot_password_use_case(
                 email=email,
                 database_adapter=repo,
                 keyvalue_adapter=kv,
-                notifier=notifier,
+                notification_outbox=outbox,
                 config=config
             )
         except Exception as e:
@@ -374,47 +389,115 @@ def get_router(relational_db_adapter, key_value_adapter, config: Config, user_no
 
     @router.post("/logout")
     async def logout(
-        request: Request,
         response: Response,
         kv: KeyValueRepository = Depends(get_keyvalue_adapter),
+        config: Config = Depends(get_config),
         access_token: str = Cookie(None),
         refresh_token: str = Cookie(None),
     ):
         """
-        Revoke tokens in KV store and clear cookies.
+        Revoke the session behind the presented tokens and clear cookies.
         """
-        ip_address = request.client.host if request.client else "0.0.0.0"
-        user_agent = request.headers.get("user-agent", "unknown")
-        device_id = request.headers.get("X-Device-ID", "web_browser")
-
         try:
-            if refresh_token:
-                key = UserToken.create(
-                    access_token="",
-                    refresh_token=refresh_token,
-                    ip_address=ip_address,
-                    user_agent=user_agent,
-                    device_id=device_id,
-                    session_id="logout",
-                    expires_in=0,
-                )
-                await kv.delete_token(key)
-
-            if access_token:
-                key = UserToken.create(
-                    access_token=access_token,
-                    refresh_token="",
-                    ip_address=ip_address,
-                    user_agent=user_agent,
-                    device_id=device_id,
-                    session_id="logout",
-                    expires_in=0,
-                )
-                await kv.delete_token(key)
+            await sessions_use_case.logout(
+                access_token=access_token,
+                refresh_token=refresh_token,
+                keyvalue_adapter=kv,
+                config=config
+            )
         except Exception as e:
             logger.warning("Failed to revoke tokens: %s", str(e))
 
         clear_auth_cookies(response)
         return {"detail": "Logged out"}
+
+    async def authenticate(request: Request, access_token, repo, kv, config):
+        """Validate the caller's access token (cookie or Bearer header) and return (user_id, device_id)."""
+        if not access_token:
+            auth_header = request.headers.get("Authorization")
+            if auth_header and auth_header.startswith("Bearer "):
+                access_token = auth_header.split(" ")[1]
+            else:
+                raise HTTPException(status_code=401, detail="Missing access token")
+
+        device_id = request.headers.get("X-Device-ID", "web_browser")
+        auth_response = await get_user_from_token(
+            access_token=access_token,
+            ip_address=request.client.host if request.client else "0.0.0.0",
+            user_agent=request.headers.get("user-agent", "unknown"),
+            device_id=device_id,
+            database_adapter=repo,
+            keyvalue_adapter=kv,
+            config=config
+        )
+
+        if auth_response.error or not auth_response.user:
+            raise HTTPException(status_code=auth_response.status_code, detail=auth_response.error or "User not found")
+
+        return auth_response.user["id"], device_id
+
+    @router.get("/sessions")
+    async def list_sessions(
+        request: Request,
+        access_token: str = Cookie(None),
+        repo: RelationalRepository = Depends(get_relational_adapter),
+        kv: KeyValueRepository = Depends(get_keyvalue_adapter),
+        config: Config = Depends(get_config)
+    ):
+        user_id, device_id = await authenticate(request, access_token, repo, kv, config)
+        sessions = await sessions_use_case.list_sessions(
+            user_id=user_id,
+            current_device_id=device_id,
+            keyvalue_adapter=kv
+        )
+        return {"sessions": sessions}
+
+    @router.delete("/sessions/{target_device_id}")
+    async def revoke_session(
+        target_device_id: str,
+        request: Request,
+        response: Response,
+        access_token: str = Cookie(None),
+        repo: RelationalRepository = Depends(get_relational_adapter),
+        kv: KeyValueRepository = Depends(get_keyvalue_adapter),
+        config: Config = Depends(get_config)
+    ):
+        user_id, device_id = await authenticate(request, access_token, repo, kv, config)
+
+        revoked = await sessions_use_case.revoke_session(
+            user_id=user_id,
+            device_id=target_device_id,
+            keyvalue_adapter=kv,
+            config=config
+        )
+        if not revoked:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        if target_device_id == device_id:
+            clear_auth_cookies(response)
+        return {"detail": "Session revoked"}
+
+    @router.delete("/sessions")
+    async def revoke_all_sessions(
+        request: Request,
+        response: Response,
+        access_token: str = Cookie(None),
+        repo: RelationalRepository = Depends(get_relational_adapter),
+        kv: KeyValueRepository = Depends(get_keyvalue_adapter),
+        config: Config = Depends(get_config)
+    ):
+        """
+        Log out everywhere: revoke every session of the caller, including this one.
+        """
+        user_id, _ = await authenticate(request, access_token, repo, kv, config)
+
+        revoked = await sessions_use_case.revoke_all_sessions(
+            user_id=user_id,
+            keyvalue_adapter=kv,
+            config=config
+        )
+
+        clear_auth_cookies(response)
+        return {"detail": "Logged out everywhere", "revoked": revoked}
     
     return router
\ No newline at end of file
@@ -0,0 +1,82 @@
+import hmac
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.common.config import Config
+from app.common.profiling import cpu_profiler, heap_tracker
+
+logger = logging.getLogger(__name__)
+
+# Guarded profiling of a live worker: disabled (404) unless DEBUG_PROFILE_TOKEN
+# is set, and callers must send it in X-Debug-Token. Profiles cover the worker
+# process that serves the call. See app/common/profiling.py.
+
+DEFAULT_PROFILE_MAX_SECONDS = 60
+
+
+def get_config() -> Config:
+    from app.main import config
+    return config
+
+
+def require_debug_token(x_debug_token: Optional[str] = Header(None), config: Config = Depends(get_config)):
+    expected = config.get("DEBUG_PROFILE_TOKEN", "")
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_debug_token or not hmac.compare_digest(x_debug_token, expected):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+
+
+debug_router = APIRouter(prefix="/debug/profile", tags=["Debug"], dependencies=[Depends(require_debug_token)], include_in_schema=False)
+
+
+@debug_router.get("/cpu", response_class=PlainTextResponse)
+async def cpu_profile(
+    seconds: float = Query(10, gt=0),
+    interval_ms: float = Query(10, ge=1, le=1000),
+    idle: bool = Query(False, description="Include threads that are only waiting"),
+    config: Config = Depends(get_config),
+):
+    """Sampled CPU profile of this worker in collapsed-stack (flame graph) format."""
+    max_seconds = float(config.get("PROFILE_MAX_SECONDS", DEFAULT_PROFILE_MAX_SECONDS))
+    if seconds > max_seconds:
+        raise HTTPException(status_code=422, detail=f"seconds must be at most {max_seconds:g}")
+    if cpu_profiler.busy:
+        raise HTTPException(status_code=409, detail="A CPU profile is already running")
+    logger.info("CPU profile started for %.1fs at %.0f ms", seconds, interval_ms)
+    try:
+        counts = await asyncio.to_thread(cpu_profiler.sample, seconds, interval_ms / 1000, idle)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(counts.items()))
+
+
+@debug_router.post("/heap/start")
+async def heap_start(frames: int = Query(10, ge=1, le=100)):
+    await asyncio.to_thread(heap_tracker.start, frames)
+    logger.info("Heap tracing started (%d frames)", frames)
+    return {"tracing": True, "frames": frames}
+
+
+@debug_router.get("/heap")
+async def heap_diff(
+    compare_to: str = Query("previous", pattern="^(previous|baseline)$"),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(25, ge=1, le=500),
+):
+    """Top allocation sites and their growth since the previous snapshot or the baseline."""
+    try:
+        return await asyncio.to_thread(heap_tracker.diff, compare_to, group_by, limit)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@debug_router.post("/heap/stop")
+async def heap_stop():
+    heap_tracker.stop()
+    logger.info("Heap tracing stopped")
+    return {"tracing": False}
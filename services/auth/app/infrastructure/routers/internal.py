@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, Request, HTTPException, Cookie
 from fastapi.responses import JSONResponse
 import logging
-from typing import Optional
+from typing import List, Optional, Union
+from pydantic import BaseModel
 
 from app.common.config import Config
 from app.application.use_case.get_user_from_token import get_user_from_token
+from app.application.use_case.access_token import access_token_ttl, signed_tokens_enabled
+from app.application.use_case.revocation import load_revocation_filter
+from app.application.use_case.introspect_tokens import introspect_tokens, max_batch_size
 from app.interfaces.relationaldb.relationaldb_repo import RelationalRepository
 from app.interfaces.keyvalue.keyvalue_repo import KeyValueRepository
 
@@ -24,6 +28,15 @@ def get_config() -> Config:
 
 internal_router = APIRouter(prefix="/api/internal", tags=["internal"])
 
+
+class IntrospectItem(BaseModel):
+    token: str
+    device_id: Optional[str] = None
+
+
+class IntrospectRequest(BaseModel):
+    tokens: List[Union[str, IntrospectItem]]
+
 @internal_router.get("/validate")
 async def validate(
     request: Request,
@@ -79,3 +92,59 @@ async def validate(
 
     logger.info(f"[internal.validate] validated user_id={auth_response.user['id']}")
     return {"user_id": auth_response.user["id"]}
+
+
+@internal_router.get("/revocation-filter")
+async def revocation_filter(
+    kv: KeyValueRepository = Depends(get_keyvalue_adapter),
+    config: Config = Depends(get_config),
+):
+    """Deny-list of revoked session ids for services that verify signed tokens locally
+    but have no Redis access of their own."""
+    if not signed_tokens_enabled(config):
+        return JSONResponse(status_code=404, content={"error": "Signed access tokens are disabled"})
+
+    published = await load_revocation_filter(kv)
+    if published is None:
+        return JSONResponse(status_code=503, content={"error": "Revocation filter not published yet"})
+
+    generated_at, encoded = published
+    return {
+        "generated_at": generated_at,
+        "filter": encoded,
+        "token_ttl": access_token_ttl(config)
+    }
+
+
+@internal_router.post("/introspect")
+async def introspect(
+    body: IntrospectRequest,
+    repo: RelationalRepository = Depends(get_relational_adapter),
+    kv: KeyValueRepository = Depends(get_keyvalue_adapter),
+    config: Config = Depends(get_config),
+):
+    """Validate a batch of access tokens. Plain strings skip the device check."""
+    limit = max_batch_size(config)
+    if len(body.tokens) > limit:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"At most {limit} tokens per request."}
+        )
+
+    tokens = [
+        (item, None) if isinstance(item, str) else (item.token, item.device_id)
+        for item in body.tokens
+    ]
+
+    try:
+        results = await introspect_tokens(
+            tokens=tokens,
+            database_adapter=repo,
+            keyvalue_adapter=kv,
+            config=config
+        )
+    except Exception as e:
+        logger.exception("[internal.introspect] failed: %s", str(e))
+        return JSONResponse(status_code=500, content={"error": "Internal server error"})
+
+    return {"results": results}
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import AsyncIterator, Dict, Optional, List, Tuple
 from app.interfaces.keyvalue.token_data_object import UserToken
 
 class KeyValueRepository(ABC):
@@ -7,10 +7,79 @@ class KeyValueRepository(ABC):
     async def get_token(self, key: UserToken) -> Optional[str]:
         pass
 
+    @abstractmethod
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """Fetch several keys in one round trip; missing keys come back as None."""
+        pass
+
     @abstractmethod
     async def set_token(self, key: UserToken, value: str, ex: Optional[int] = None) -> None:
         pass
 
+    @abstractmethod
+    async def mset(self, items: Dict[str, str], ex: Optional[int] = None) -> None:
+        """Store several keys in one round trip, all with the same TTL."""
+        pass
+
     @abstractmethod
     async def delete_token(self, key: UserToken) -> None:
         pass
+
+    @abstractmethod
+    async def ttl(self, key: str) -> Optional[int]:
+        """Seconds until key expires, -1 if it never does, None if it does not exist."""
+        pass
+
+    @abstractmethod
+    async def compare_and_swap(self, key: str, expected: Optional[str], value: Optional[str], ex: Optional[int] = None) -> bool:
+        """Atomically replace key with value only if it currently holds expected.
+
+        expected=None means the key must not exist; value=None deletes the key.
+        Without ex the key keeps whatever TTL it had. Returns whether the swap happened.
+        """
+        pass
+
+    @abstractmethod
+    def iter_keys(self, match: str, batch_size: int = 1000) -> AsyncIterator[str]:
+        """Yield keys matching a glob pattern, batch_size at a time, without blocking the store."""
+        pass
+
+    @abstractmethod
+    async def add_to_index(self, key: str, member: str, score: int, ex: Optional[int] = None) -> None:
+        """Add or update a member of a scored index (e.g. a user's sessions keyed by expiry)."""
+        pass
+
+    @abstractmethod
+    async def get_index(self, key: str, min_score: Optional[int] = None) -> List[str]:
+        """Return index members, first dropping those scored below min_score."""
+        pass
+
+    @abstractmethod
+    async def remove_from_index(self, key: str, *members: str) -> None:
+        pass
+
+    @abstractmethod
+    async def ping(self) -> bool:
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        pass
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str) -> None:
+        pass
+
+    @abstractmethod
+    def listen(self, channel: str) -> AsyncIterator[str]:
+        """Yield messages published on channel until the consumer stops iterating."""
+        pass
+
+    @abstractmethod
+    async def hit_sliding_windows(self, windows: List[Tuple[str, int, int]], member: str, now_ms: int) -> Tuple[int, int]:
+        """Atomically record one hit in every (key, limit, window_ms) sliding window.
+
+        Nothing is recorded if any window is full. Returns (0, 0) when the hit was
+        accepted, else (1-based index of the first full window, retry-after ms).
+        """
+        pass
@@ -0,0 +1,157 @@
+import math
+import time
+import asyncio
+import logging
+from fnmatch import fnmatchcase
+from typing import AsyncIterator, Dict, Optional, List, Set, Tuple
+
+from app.interfaces.keyvalue.keyvalue_repo import KeyValueRepository
+from app.interfaces.keyvalue.token_data_object import UserToken
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryKeyValueAdapter(KeyValueRepository):
+    """KeyValueRepository kept in plain dicts inside this process.
+
+    Meant for local benchmarks, load tests and development without a Redis
+    server (KEYVALUE_BACKEND=memory). Expiry is applied lazily on access and
+    pub/sub only reaches listeners in the same process, so every replica has
+    its own independent store.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, str] = {}
+        self._indexes: Dict[str, Dict[str, float]] = {}
+        self._expires: Dict[str, float] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        logger.info("InMemoryKeyValueAdapter initialized")
+
+    def _alive(self, key: str) -> bool:
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            self._delete(key)
+            return False
+        return key in self._values or key in self._indexes
+
+    def _delete(self, key: str) -> None:
+        self._values.pop(key, None)
+        self._indexes.pop(key, None)
+        self._expires.pop(key, None)
+
+    def _set(self, key: str, value: str, ex: Optional[int]) -> None:
+        self._indexes.pop(key, None)
+        self._values[key] = value
+        if ex:
+            self._expires[key] = time.time() + ex
+        else:
+            self._expires.pop(key, None)
+
+    def _index(self, key: str) -> Dict[str, float]:
+        self._alive(key)
+        return self._indexes.setdefault(key, {})
+
+    async def get_token(self, key: UserToken) -> Optional[str]:
+        key_str = str(key)
+        return self._values.get(key_str) if self._alive(key_str) else None
+
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        return [await self.get_token(key) for key in keys]
+
+    async def set_token(self, key: UserToken, value: str, ex: Optional[int] = None) -> None:
+        self._set(str(key), value, ex)
+
+    async def mset(self, items: Dict[str, str], ex: Optional[int] = None) -> None:
+        for key, value in items.items():
+            self._set(str(key), value, ex)
+
+    async def delete_token(self, key: UserToken) -> None:
+        self._delete(str(key))
+
+    async def ttl(self, key: str) -> Optional[int]:
+        key = str(key)
+        if not self._alive(key):
+            return None
+        expires_at = self._expires.get(key)
+        return -1 if expires_at is None else math.ceil(expires_at - time.time())
+
+    async def compare_and_swap(self, key: str, expected: Optional[str], value: Optional[str], ex: Optional[int] = None) -> bool:
+        key = str(key)
+        current = self._values.get(key) if self._alive(key) else None
+        if current != expected:
+            return False
+        if value is None:
+            self._delete(key)
+        elif ex:
+            self._set(key, value, ex)
+        else:
+            self._indexes.pop(key, None)
+            self._values[key] = value
+        return True
+
+    async def iter_keys(self, match: str, batch_size: int = 1000) -> AsyncIterator[str]:
+        keys = [key for key in list(self._values) + list(self._indexes) if fnmatchcase(key, match)]
+        for i, key in enumerate(keys):
+            if self._alive(key):
+                yield key
+            if (i + 1) % batch_size == 0:
+                # Let other tasks run between batches, as SCAN would
+                await asyncio.sleep(0)
+
+    async def add_to_index(self, key: str, member: str, score: int, ex: Optional[int] = None) -> None:
+        self._values.pop(key, None)
+        self._index(key)[member] = score
+        if ex:
+            expires_at = time.time() + ex
+            if expires_at > self._expires.get(key, 0):
+                self._expires[key] = expires_at
+
+    async def get_index(self, key: str, min_score: Optional[int] = None) -> List[str]:
+        if not self._alive(key) or key not in self._indexes:
+            return []
+        index = self._indexes[key]
+        if min_score is not None:
+            for member in [m for m, score in index.items() if score < min_score]:
+                del index[member]
+        return [member for member, _ in sorted(index.items(), key=lambda item: (item[1], item[0]))]
+
+    async def remove_from_index(self, key: str, *members: str) -> None:
+        if not self._alive(key) or key not in self._indexes:
+            return
+        index = self._indexes[key]
+        for member in members:
+            index.pop(member, None)
+        if not index:
+            self._delete(key)
+
+    async def ping(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        pass
+
+    async def publish(self, channel: str, message: str) -> None:
+        for queue in self._subscribers.get(channel, ()):
+            queue.put_nowait(message)
+
+    async def listen(self, channel: str) -> AsyncIterator[str]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(channel, set()).add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers[channel].discard(queue)
+
+    async def hit_sliding_windows(self, windows: List[Tuple[str, int, int]], member: str, now_ms: int) -> Tuple[int, int]:
+        # Same check-all-then-record order as SLIDING_WINDOW_SCRIPT
+        for i, (key, limit, window_ms) in enumerate(windows, start=1):
+            index = self._index(key)
+            for old in [m for m, score in index.items() if score <= now_ms - window_ms]:
+                del index[old]
+            if len(index) >= limit:
+                return i, int(min(index.values()) + window_ms - now_ms)
+        for key, _, window_ms in windows:
+            self._index(key)[member] = now_ms
+            self._expires[key] = time.time() + window_ms / 1000
+        return 0, 0
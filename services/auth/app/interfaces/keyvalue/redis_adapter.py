@@ -1,5 +1,5 @@
 import logging
-from typing import Optional
+from typing import AsyncIterator, Dict, Optional, List, Tuple
 
 from app.infrastructure.keyvalue.redis_driver import RedisDriver
 from app.interfaces.keyvalue.keyvalue_repo import KeyValueRepository
@@ -8,10 +8,56 @@ from app.common.config import Config
 
 logger = logging.getLogger(__name__)
 
+# KEYS: sliding-window sorted sets. ARGV: now_ms, member, then limit and window_ms
+# for each key. All windows are pruned and checked before any hit is recorded so
+# a rejection by one limiter does not consume quota in the others.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[1 + 2 * i])
+    local window = tonumber(ARGV[2 + 2 * i])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        local retry = window
+        if oldest[2] then
+            retry = tonumber(oldest[2]) + window - now
+        end
+        return {i, retry}
+    end
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[2])
+    redis.call('PEXPIRE', key, tonumber(ARGV[2 + 2 * i]))
+end
+return {0, 0}
+"""
+
+# KEYS: key. ARGV: expected value ('' with ARGV[2]='0' means absent), expect flag,
+# new value ('' with ARGV[4]='0' means delete), value flag, ttl seconds (0 keeps it).
+COMPARE_AND_SWAP_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if ARGV[2] == '0' then
+    if current then return 0 end
+elseif current ~= ARGV[1] then
+    return 0
+end
+if ARGV[4] == '0' then
+    redis.call('DEL', KEYS[1])
+elseif tonumber(ARGV[5]) > 0 then
+    redis.call('SET', KEYS[1], ARGV[3], 'EX', ARGV[5])
+else
+    redis.call('SET', KEYS[1], ARGV[3], 'KEEPTTL')
+end
+return 1
+"""
+
 class RedisAdapter(KeyValueRepository):
     def __init__(self, config: Config):
         driver = RedisDriver(config)
         self._client = driver.get_client()
+        self._sliding_window = self._client.register_script(SLIDING_WINDOW_SCRIPT)
+        self._compare_and_swap = self._client.register_script(COMPARE_AND_SWAP_SCRIPT)
         logger.info("RedisAdapter initialized")
 
     async def get_token(self, key: UserToken) -> Optional[str]:
@@ -21,12 +67,103 @@ class RedisAdapter(KeyValueRepository):
         logger.debug("-> %s", value)
         return value
 
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        if not keys:
+            return []
+        logger.debug("MGET %d keys", len(keys))
+        return await self._client.mget([str(k) for k in keys])
+
     async def set_token(self, key: UserToken, value: str, ex: Optional[int] = None) -> None:
         key_str = str(key)
         logger.debug("SET %s = %s (ex=%s)", key_str, value, ex)
         await self._client.set(key_str, value, ex=ex)
 
+    async def mset(self, items: Dict[str, str], ex: Optional[int] = None) -> None:
+        if not items:
+            return
+        logger.debug("MSET %d keys (ex=%s)", len(items), ex)
+        if not ex:
+            await self._client.mset({str(k): v for k, v in items.items()})
+            return
+        # MSET cannot set a TTL, so pipeline the SETs into one round trip
+        pipe = self._client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(str(key), value, ex=ex)
+        await pipe.execute()
+
     async def delete_token(self, key: UserToken) -> None:
         key_str = str(key)
         logger.debug("DEL %s", key_str)
         await self._client.delete(key_str)
+
+    async def ttl(self, key: str) -> Optional[int]:
+        remaining = await self._client.ttl(str(key))
+        return None if remaining == -2 else remaining
+
+    async def compare_and_swap(self, key: str, expected: Optional[str], value: Optional[str], ex: Optional[int] = None) -> bool:
+        logger.debug("CAS %s (ex=%s)", key, ex)
+        args = [
+            expected or "", 0 if expected is None else 1,
+            value or "", 0 if value is None else 1,
+            ex or 0,
+        ]
+        return bool(await self._compare_and_swap(keys=[str(key)], args=args))
+
+    async def iter_keys(self, match: str, batch_size: int = 1000) -> AsyncIterator[str]:
+        logger.debug("SCAN %s (count=%s)", match, batch_size)
+        async for key in self._client.scan_iter(match=match, count=batch_size):
+            yield key
+
+    async def add_to_index(self, key: str, member: str, score: int, ex: Optional[int] = None) -> None:
+        logger.debug("ZADD %s %s %s (ex=%s)", key, score, member, ex)
+        pipe = self._client.pipeline(transaction=False)
+        pipe.zadd(key, {member: score})
+        if ex:
+            # Only ever extend the index TTL so it outlives its longest member
+            pipe.expire(key, ex, nx=True)
+            pipe.expire(key, ex, gt=True)
+        await pipe.execute()
+
+    async def get_index(self, key: str, min_score: Optional[int] = None) -> List[str]:
+        logger.debug("ZRANGE %s (min_score=%s)", key, min_score)
+        if min_score is None:
+            return await self._client.zrange(key, 0, -1)
+        pipe = self._client.pipeline(transaction=False)
+        pipe.zremrangebyscore(key, "-inf", f"({min_score}")
+        pipe.zrange(key, 0, -1)
+        _, members = await pipe.execute()
+        return members
+
+    async def remove_from_index(self, key: str, *members: str) -> None:
+        if not members:
+            return
+        logger.debug("ZREM %s %s", key, members)
+        await self._client.zrem(key, *members)
+
+    async def ping(self) -> bool:
+        return await self._client.ping() is True
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    async def publish(self, channel: str, message: str) -> None:
+        logger.debug("PUBLISH %s %s", channel, message)
+        await self._client.publish(channel, message)
+
+    async def listen(self, channel: str) -> AsyncIterator[str]:
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    yield message["data"]
+        finally:
+            await pubsub.aclose()
+
+    async def hit_sliding_windows(self, windows: List[Tuple[str, int, int]], member: str, now_ms: int) -> Tuple[int, int]:
+        keys = [key for key, _, _ in windows]
+        args = [now_ms, member]
+        for _, limit, window_ms in windows:
+            args.extend([limit, window_ms])
+        index, retry_after_ms = await self._sliding_window(keys=keys, args=args)
+        return int(index), int(retry_after_ms)
@@ -0,0 +1,136 @@
+import json
+from typing import Optional, Tuple
+
+from app.interfaces.keyvalue.token_data_object import UserToken
+
+# Session storage layout in the key-value store:
+#
+#   user:tokens:{user_id}:{device_id}  -> session record (see encode_session)
+#   user:access:{access_token}         -> pointer "{user_id}:{device_id}"
+#   {refresh_token}                    -> pointer "{user_id}:{device_id}"
+#   user:sessions:{user_id}            -> sorted set of device ids scored by
+#                                         session expiry (per-user index)
+#   auth:revoked_sessions              -> sorted set of revoked session ids scored
+#                                         by when their signed tokens expire
+#   auth:revocation_filter             -> "{generated_at}|{base64 Bloom filter}"
+#
+# Records written before v2 were json.dumps(UserToken.__dict__) and the refresh
+# pointer was a JSON object repeating the user id, device id and session key.
+# Both formats are still accepted on read so existing sessions keep working
+# until they expire or are rewritten by app/dev/migrate_session_records.py.
+
+RECORD_VERSION = "2"
+FIELD_SEPARATOR = "|"
+MAX_USER_AGENT_LENGTH = 256
+
+SESSION_KEY_PREFIX = "user:tokens:"
+ACCESS_KEY_PREFIX = "user:access:"
+SESSION_INDEX_PREFIX = "user:sessions:"
+REVOKED_SESSIONS_KEY = "auth:revoked_sessions"
+REVOCATION_FILTER_KEY = "auth:revocation_filter"
+REVOCATION_CHANNEL = "auth:revocation_filter"
+SESSION_INVALIDATION_CHANNEL = "auth:session_invalidation"
+
+
+def session_key(user_id, device_id: str) -> str:
+    return f"{SESSION_KEY_PREFIX}{user_id}:{device_id}"
+
+
+def access_key(access_token: str) -> str:
+    return f"{ACCESS_KEY_PREFIX}{access_token}"
+
+
+def refresh_key(refresh_token: str) -> str:
+    # Refresh pointers have always been stored under the bare token.
+    return refresh_token
+
+
+def session_index_key(user_id) -> str:
+    return f"{SESSION_INDEX_PREFIX}{user_id}"
+
+
+def split_session_key(key: str) -> Tuple[str, str]:
+    """Return (user_id, device_id) for a user:tokens:{user_id}:{device_id} key."""
+    if not key.startswith(SESSION_KEY_PREFIX):
+        raise ValueError(f"Not a session key: {key}")
+    user_id, _, device_id = key[len(SESSION_KEY_PREFIX):].partition(":")
+    if not user_id or not device_id:
+        raise ValueError(f"Malformed session key: {key}")
+    return user_id, device_id
+
+
+def encode_session(token: UserToken) -> str:
+    """Encode a session as a versioned, positional record.
+
+    The device id is omitted because it is already part of the key, and the user
+    agent goes last so it may contain the separator without escaping.
+    """
+    user_agent = (token.user_agent or "")[:MAX_USER_AGENT_LENGTH]
+    return FIELD_SEPARATOR.join([
+        RECORD_VERSION,
+        str(int(token.issued_at)),
+        str(int(token.expires_at)),
+        token.access_token,
+        token.refresh_token,
+        token.session_id,
+        token.ip_address or "",
+        user_agent,
+    ])
+
+
+def decode_session(raw: Optional[str], device_id: str) -> Optional[UserToken]:
+    """Decode a session record in either the v2 or the legacy JSON format."""
+    if not raw:
+        return None
+
+    if raw.startswith("{"):
+        data = json.loads(raw)
+        return UserToken(
+            access_token=data.get("access_token", ""),
+            refresh_token=data.get("refresh_token", ""),
+            issued_at=int(data.get("issued_at", 0)),
+            expires_at=int(data.get("expires_at", 0)),
+            ip_address=data.get("ip_address", ""),
+            user_agent=data.get("user_agent", ""),
+            device_id=data.get("device_id", device_id),
+            session_id=data.get("session_id", ""),
+        )
+
+    parts = raw.split(FIELD_SEPARATOR, 7)
+    if len(parts) != 8 or parts[0] != RECORD_VERSION:
+        raise ValueError(f"Unsupported session record version: {parts[0]!r}")
+
+    _, issued_at, expires_at, access_token, refresh_token, session_id, ip_address, user_agent = parts
+    return UserToken(
+        access_token=access_token,
+        refresh_token=refresh_token,
+        issued_at=int(issued_at),
+        expires_at=int(expires_at),
+        ip_address=ip_address,
+        user_agent=user_agent,
+        device_id=device_id,
+        session_id=session_id,
+    )
+
+
+def is_legacy_record(raw: Optional[str]) -> bool:
+    return bool(raw) and raw.startswith("{")
+
+
+def encode_pointer(user_id, device_id: str) -> str:
+    return f"{user_id}:{device_id}"
+
+
+def decode_pointer(raw: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Return (user_id, device_id) from an access/refresh pointer, or None."""
+    if not raw:
+        return None
+
+    if raw.startswith("{"):
+        data = json.loads(raw)
+        return str(data["user_id"]), data["device_id"]
+
+    user_id, _, device_id = raw.partition(":")
+    if not user_id or not device_id:
+        raise ValueError(f"Malformed session pointer: {raw}")
+    return user_id, device_id
@@ -1,37 +1,159 @@
-from sqlalchemy import select, insert, update
+import re
+import logging
+from sqlalchemy import select, insert, update, text
 from sqlalchemy.orm import Session
-from typing import Optional
-from uuid import UUID
+from sqlalchemy_cockroachdb import run_transaction
+from typing import Callable, Dict, List, Optional, TypeVar
+from uuid import UUID, uuid4
+
 from app.domain.user import User
 from app.interfaces.relationaldb.relationaldb_repo import RelationalRepository
+from app.infrastructure.db.metadata import metadata
 from app.infrastructure.db.schema.user_table import users
+from app.infrastructure.db.cockroach import CockroachDriver
 from app.common.utility import hash_password, verify_password
+from app.common.metrics import Counter
+from app.common.config import Config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+transaction_retries = Counter(
+    "auth_db_transaction_retries_total",
+    "Transactions re-run after a serialization failure (SQLSTATE 40001)",
+    ("operation",)
+)
+stale_reads = Counter(
+    "auth_db_stale_reads_total",
+    "AS OF SYSTEM TIME lookups by outcome",
+    ("outcome",)
+)
+
+_INTERVAL = re.compile(r"^-\d+(us|ms|s|m)$")
+
+
+def stale_read_timestamp(setting: str) -> Optional[str]:
+    """Translate COCKROACH_STALE_READS into an AS OF SYSTEM TIME expression.
+
+    "off" disables stale reads, "follower" uses follower_read_timestamp() so any
+    replica can answer, and a negative interval such as "-10s" reads that far back.
+    """
+    setting = setting.strip().lower()
+    if setting in ("", "off", "false"):
+        return None
+    if setting == "follower":
+        return "follower_read_timestamp()"
+    if _INTERVAL.match(setting):
+        return f"'{setting}'"
+    raise ValueError(f"Invalid COCKROACH_STALE_READS value: {setting!r}")
+
 
-class CockroachUserRepository(RelationalRepository):
-    def __init__(self, session: Session):
-        self.session = session
+class CockroachUserAdapter(RelationalRepository):
+    """RelationalRepository on CockroachDB.
+
+    Writes run through run_transaction(), which re-runs the whole transaction
+    when Cockroach aborts it with a retryable serialization error. Lookups by
+    id, which only feed token validation and introspection, can be served from
+    a slightly stale snapshot (COCKROACH_STALE_READS) so the nearest replica
+    answers without a leaseholder round trip. Users are never deleted, so a
+    stale miss only means the user is newer than the snapshot and is re-read
+    fresh. Lookups by email stay strongly consistent: login and registration
+    must see the latest password and the latest signups.
+    """
+
+    def __init__(self, config: Config):
+        self._config = config
+        driver = CockroachDriver(config)
+        self._engine = driver.get_engine()
+        self._sessionmaker = driver.get_sessionmaker()
+        self._max_retries = int(config.get("COCKROACH_MAX_RETRIES", 5))
+        self._stale_read_at = stale_read_timestamp(config.get("COCKROACH_STALE_READS", "off"))
+        logger.info("CockroachUserAdapter initialized (stale reads: %s)", self._stale_read_at or "off")
+
+    def _transaction(self, operation: str, callback: Callable[[Session], T]) -> T:
+        attempts = 0
+
+        def attempt(session: Session) -> T:
+            nonlocal attempts
+            attempts += 1
+            if attempts > 1:
+                transaction_retries.inc(operation=operation)
+                logger.info("Retrying %s after serialization failure (attempt %d)", operation, attempts)
+            return callback(session)
+
+        return run_transaction(self._sessionmaker, attempt, max_retries=self._max_retries)
+
+    def _stale_read(self, callback: Callable[[Session], T]) -> Optional[T]:
+        """Run a read-only callback AS OF SYSTEM TIME; None if stale reads are off or failed."""
+        if self._stale_read_at is None:
+            return None
+        try:
+            with self._sessionmaker() as session, session.begin():
+                session.execute(text(f"SET TRANSACTION AS OF SYSTEM TIME {self._stale_read_at}"))
+                return callback(session)
+        except Exception as e:
+            # e.g. the table is younger than the snapshot right after a migration
+            stale_reads.inc(outcome="error")
+            logger.debug("Stale read failed, reading fresh: %s", str(e))
+            return None
 
     def get_user_by_email(self, email: str) -> Optional[User]:
+        logger.debug("Fetching user by email: %s", email)
         stmt = select(users).where(users.c.email == email).limit(1)
-        result = self.session.execute(stmt).first()
-        if result is None:
-            return None
-        return User.from_row(result)
+
+        def lookup(session: Session) -> Optional[User]:
+            result = session.execute(stmt).first()
+            return None if result is None else User.from_row(result)
+
+        return self._transaction("get_user_by_email", lookup)
 
     def get_user_by_id(self, user_id: UUID) -> Optional[User]:
-        stmt = select(users).where(users.c.id == user_id).limit(1)
-        result = self.session.execute(stmt).first()
-        if result is None:
-            return None
-        return User.from_row(result)
+        logger.debug("Fetching user by ID: %s", user_id)
+        return self.get_users_by_ids([user_id]).get(str(user_id))
+
+    def get_users_by_ids(self, user_ids: List[UUID]) -> Dict[str, User]:
+        logger.debug("Fetching %d users by ID", len(user_ids))
+        if not user_ids:
+            return {}
+
+        def lookup(ids) -> Callable[[Session], Dict[str, User]]:
+            stmt = select(users).where(users.c.id.in_(list(ids)))
+            return lambda session: {str(row._mapping["id"]): User.from_row(row) for row in session.execute(stmt).all()}
+
+        found = self._stale_read(lookup(user_ids))
+        if found is None:
+            return self._transaction("get_users_by_ids", lookup(user_ids))
+
+        missing = [i for i in user_ids if str(i) not in found]
+        stale_reads.inc(outcome="hit" if not missing else "partial")
+        if missing:
+            found.update(self._transaction("get_users_by_ids", lookup(missing)))
+        return found
+
+    def create_user(
+        self,
+        email: str,
+        password_hash: str,
+        first_name: str,
+        last_name: str,
+        user_id: Optional[UUID] = None
+    ) -> User:
+        logger.info("Creating user with email: %s", email)
+
+        if user_id is None:
+            user_id = uuid4()
+        elif not isinstance(user_id, UUID):
+            raise TypeError("user_id must be a UUID")
 
-    def create_user(self, email: str, password: str) -> User:
-        hashed_pw = hash_password(password)
         stmt = (
             insert(users)
             .values(
+                id=user_id,
                 email=email,
-                password_hash=hashed_pw,
+                password_hash=password_hash,
+                first_name=first_name,
+                last_name=last_name,
                 email_verified=False,
                 is_active=True
             )
@@ -39,41 +161,63 @@ class CockroachUserRepository(RelationalRepository):
                 users.c.id,
                 users.c.email,
                 users.c.password_hash,
+                users.c.first_name,
+                users.c.last_name,
                 users.c.email_verified,
                 users.c.is_active
             )
         )
-        result = self.session.execute(stmt).first()
-        self.session.commit()
-        return User.from_row(result)
-
+        user = self._transaction("create_user", lambda session: User.from_row(session.execute(stmt).first()))
+        logger.info("User created: %s", user.id)
+        return user
 
     def verify_user_credentials(self, email: str, password: str) -> Optional[User]:
-        stmt = select(users).where(users.c.email == email).limit(1)
-        result = self.session.execute(stmt).first()
-        if result is None:
+        logger.info("Verifying credentials for: %s", email)
+        user = self.get_user_by_email(email)
+        if user is None:
             return None
-        row = result._mapping
-        if not verify_password(password, row["password_hash"]):
+        if not verify_password(password, user.hashed_password):
+            logger.warning("Password verification failed for user: %s", email)
             return None
-        return User.from_row(result)
-
+        return user
 
     def update_user_password(self, user_id: UUID, new_password: str) -> None:
-        hashed_pw = hash_password(new_password)
+        logger.info("Updating password for user ID: %s", user_id)
+        # Hash once, outside the transaction, so retries do not re-run Argon2
         stmt = (
             update(users)
             .where(users.c.id == user_id)
-            .values(password_hash=hashed_pw)
+            .values(password_hash=hash_password(new_password))
         )
-        self.session.execute(stmt)
-        self.session.commit()
+        self._transaction("update_user_password", lambda session: session.execute(stmt))
+        logger.info("Password updated for user ID: %s", user_id)
 
     def mark_email_verified(self, user_id: UUID) -> None:
+        logger.info("Marking email verified for user ID: %s", user_id)
         stmt = (
             update(users)
             .where(users.c.id == user_id)
             .values(email_verified=True)
         )
-        self.session.execute(stmt)
-        self.session.commit()
+        self._transaction("mark_email_verified", lambda session: session.execute(stmt))
+
+    def reset_database(self) -> None:
+        environment = self._config.get("ENVIRONMENT")
+        logger.warning("Database reset requested. Current environment: %s", environment)
+        if environment != "development":
+            logger.warning("Skipping database reset in production environment")
+            return
+        logger.critical("Resetting database: dropping and recreating all tables")
+        metadata.drop_all(bind=self._engine)
+        metadata.create_all(bind=self._engine)
+        logger.info("All tables recreated")
+
+    def create_tables(self) -> None:
+        metadata.create_all(bind=self._engine)
+
+    def ping(self) -> None:
+        with self._engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    def close(self) -> None:
+        self._engine.dispose()
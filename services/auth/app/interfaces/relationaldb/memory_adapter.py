@@ -0,0 +1,92 @@
+import logging
+import threading
+from dataclasses import replace
+from typing import Dict, List, Optional
+from uuid import UUID, uuid4
+
+from app.domain.user import User
+from app.interfaces.relationaldb.relationaldb_repo import RelationalRepository
+from app.common.utility import hash_password, verify_password
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryUserAdapter(RelationalRepository):
+    """RelationalRepository kept in a dict, for local benchmarks and load tests.
+
+    Behaves like the Postgres adapter for the calls the auth flows make,
+    including rejecting a duplicate email, but nothing is persisted.
+    """
+
+    def __init__(self):
+        self._users: Dict[str, User] = {}
+        self._by_email: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        logger.info("InMemoryUserAdapter initialized")
+
+    def get_user_by_email(self, email: str) -> Optional[User]:
+        user_id = self._by_email.get(email)
+        return self._users.get(user_id) if user_id else None
+
+    def get_user_by_id(self, user_id: UUID) -> Optional[User]:
+        return self._users.get(str(user_id))
+
+    def get_users_by_ids(self, user_ids: List[UUID]) -> Dict[str, User]:
+        return {str(i): self._users[str(i)] for i in user_ids if str(i) in self._users}
+
+    def create_user(
+        self,
+        email: str,
+        password_hash: str,
+        first_name: str,
+        last_name: str,
+        user_id: Optional[UUID] = None
+    ) -> User:
+        if user_id is None:
+            user_id = uuid4()
+        elif not isinstance(user_id, UUID):
+            raise TypeError("user_id must be a UUID")
+
+        user = User(
+            id=user_id,
+            email=email,
+            hashed_password=password_hash,
+            is_verified=False,
+            is_active=True,
+            first_name=first_name,
+            last_name=last_name
+        )
+        with self._lock:
+            if email in self._by_email:
+                raise ValueError(f"Duplicate email: {email}")
+            self._users[str(user_id)] = user
+            self._by_email[email] = str(user_id)
+        return user
+
+    def verify_user_credentials(self, email: str, password: str) -> Optional[User]:
+        user = self.get_user_by_email(email)
+        if user is None or not verify_password(password, user.hashed_password):
+            return None
+        return user
+
+    def update_user_password(self, user_id: UUID, new_password: str) -> None:
+        user = self._users[str(user_id)]
+        self._users[str(user_id)] = replace(user, hashed_password=hash_password(new_password))
+
+    def mark_email_verified(self, user_id: UUID) -> None:
+        user = self._users[str(user_id)]
+        self._users[str(user_id)] = replace(user, is_verified=True)
+
+    def reset_database(self) -> None:
+        with self._lock:
+            self._users.clear()
+            self._by_email.clear()
+
+    def create_tables(self) -> None:
+        pass
+
+    def ping(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
@@ -1,7 +1,7 @@
 import logging
-from sqlalchemy import select, insert, update
+from sqlalchemy import select, insert, update, text
 from app.infrastructure.db.metadata import metadata
-from typing import Optional
+from typing import Dict, List, Optional
 from uuid import UUID, uuid4
 
 from app.domain.user import User
@@ -49,6 +49,14 @@ class PostgresUserAdapter(RelationalRepository):
             return None
         return User.from_row(result)
 
+    def get_users_by_ids(self, user_ids: List[UUID]) -> Dict[str, User]:
+        logger.debug("Fetching %d users by ID", len(user_ids))
+        if not user_ids:
+            return {}
+        stmt = select(users).where(users.c.id.in_(list(user_ids)))
+        rows = self.session.execute(stmt).all()
+        return {str(row._mapping["id"]): User.from_row(row) for row in rows}
+
     def create_user(
         self,
         email: str,
@@ -140,4 +148,14 @@ class PostgresUserAdapter(RelationalRepository):
         metadata.drop_all(bind=bind)
         logger.info("All tables dropped")
         metadata.create_all(bind=bind)
-        logger.info("All tables recreated")
\ No newline at end of file
+        logger.info("All tables recreated")
+
+    def create_tables(self) -> None:
+        metadata.create_all(bind=self.session.get_bind())
+
+    def ping(self) -> None:
+        with self.session.begin():
+            self.session.execute(text("SELECT 1"))
+
+    def close(self) -> None:
+        self.session.close()
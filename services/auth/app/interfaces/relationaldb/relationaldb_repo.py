@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Dict, List, Optional
 from uuid import UUID
 from app.domain.user import User
 
@@ -15,6 +15,11 @@ class RelationalRepository(ABC):
         """Fetch a user by their unique identifier."""
         pass
 
+    @abstractmethod
+    def get_users_by_ids(self, user_ids: List[UUID]) -> Dict[str, User]:
+        """Fetch several users in one query, keyed by str(user.id). Missing ids are omitted."""
+        pass
+
 
     @abstractmethod
     def create_user(
@@ -46,4 +51,18 @@ class RelationalRepository(ABC):
     @abstractmethod
     def reset_database(self) -> None:
         """Drop and recreate all tables."""
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def create_tables(self) -> None:
+        """Create any missing tables."""
+        pass
+
+    @abstractmethod
+    def ping(self) -> None:
+        """Run a trivial query; raises if the database is unreachable."""
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
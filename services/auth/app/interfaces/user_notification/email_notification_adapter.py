@@ -3,11 +3,13 @@ from app.interfaces.user_notification.user_notification_repo import Notifier  #
 from app.infrastructure.apis.email_api import NotificationAPIDriver
 from app.common.config import Config
 
-import requests
+import httpx
 
 logger = logging.getLogger(__name__)
 
 class EmailNotifierAdapter(Notifier):
+    """Sends through one pooled async client; meant to live as long as the worker."""
+
     def __init__(self, config: Config):
         logger.info("Initializing EmailNotifierAdapter")
         driver = NotificationAPIDriver(config)
@@ -16,19 +18,29 @@ class EmailNotifierAdapter(Notifier):
         self.sender_id = params["sender_id"]
         self.api_key = params["api_key"]
         self.base_url = params["base_url"]
-        self.session = None
-
-    def connect(self):
-        logger.debug("Establishing session for EmailNotifierAdapter")
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        })
-
-    def notify(self, recipient_id: str, subject: str, message: str):
-        if not self.session:
-            raise RuntimeError("Session not initialized. Call connect() first.")
+        self.send_enabled = config.get("NOTIFY_SEND_ENABLED", "false").lower() == "true"
+        self.timeout = float(config.get("NOTIFY_TIMEOUT", 10))
+        self.max_connections = int(config.get("NOTIFY_MAX_CONNECTIONS", 20))
+        self.client = None
+
+    async def connect(self):
+        logger.debug("Opening pooled client for EmailNotifierAdapter")
+        self.client = httpx.AsyncClient(
+            base_url=f"https://{self.base_url}",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections
+            )
+        )
+
+    async def notify(self, recipient_id: str, subject: str, message: str):
+        if not self.client:
+            raise RuntimeError("Client not initialized. Call connect() first.")
         
         payload = {
             "sender": self.sender_id,
@@ -37,20 +49,18 @@ class EmailNotifierAdapter(Notifier):
             "message": message
         }
 
-        logger.info("FAKE: Simulating notification to %s", recipient_id)
-        logger.debug("FAKE PAYLOAD: %s", payload)
-
-        # Real notification logic — to be re-enabled when service is ready
-        # try:
-        #     response = self.session.post(f"https://{self.base_url}/send", json=payload)
-        #     response.raise_for_status()
-        #     logger.debug("Notification sent successfully: %s", response.status_code)
-        # except requests.RequestException as e:
-        #     logger.error("Failed to send notification: %s", e)
-        #     raise
-
-    def disconnect(self):
-        if self.session:
-            logger.debug("Closing session for EmailNotifierAdapter")
-            self.session.close()
-            self.session = None
+        if not self.send_enabled:
+            logger.info("FAKE: Simulating notification to %s", recipient_id)
+            logger.debug("FAKE PAYLOAD: %s", payload)
+            return
+
+        # Errors propagate so the worker can retry or dead-letter the message
+        response = await self.client.post("/send", json=payload)
+        response.raise_for_status()
+        logger.debug("Notification sent successfully: %s", response.status_code)
+
+    async def disconnect(self):
+        if self.client:
+            logger.debug("Closing pooled client for EmailNotifierAdapter")
+            await self.client.aclose()
+            self.client = None
@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass
+class OutboxMessage:
+    message_id: str
+    fields: Dict[str, str]
+    previous_attempts: int = 0
+
+
+class NotificationOutbox(ABC):
+    @abstractmethod
+    async def enqueue(self, recipient_id: str, subject: str, message: str, kind: str) -> str:
+        """Durably queue a notification for the worker. Returns the message id."""
+        pass
+
+    @abstractmethod
+    async def read_new(self, consumer: str, count: int, block_ms: Optional[int]) -> List[OutboxMessage]:
+        """Claim up to count messages never delivered to any consumer, waiting up to
+        block_ms for the first one (None returns immediately)."""
+        pass
+
+    @abstractmethod
+    async def claim_stale(self, consumer: str, min_idle_ms: int, count: int) -> List[OutboxMessage]:
+        """Claim delivered but unacknowledged messages idle for at least min_idle_ms (retries)."""
+        pass
+
+    @abstractmethod
+    async def ack(self, message_ids: List[str]) -> None:
+        pass
+
+    @abstractmethod
+    async def dead_letter(self, message: OutboxMessage, reason: str) -> None:
+        """Move a message that will not be retried out of the outbox."""
+        pass
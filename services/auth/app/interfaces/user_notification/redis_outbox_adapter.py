@@ -0,0 +1,100 @@
+import time
+import logging
+from typing import List, Optional
+
+import redis.asyncio as redis
+
+from app.common.config import Config
+from app.infrastructure.keyvalue.redis_driver import RedisDriver
+from app.interfaces.user_notification.notification_outbox_repo import NotificationOutbox, OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+CONSUMER_GROUP = "notifier"
+
+
+class RedisNotificationOutbox(NotificationOutbox):
+    """Outbox on a Redis stream read through a consumer group.
+
+    Unacknowledged entries stay in the group's pending list, so a message is
+    retried after a send failure or a worker crash until it is acked or
+    dead-lettered.
+    """
+
+    def __init__(self, config: Config):
+        self._client = RedisDriver(config).get_client()
+        self.stream = config.get("NOTIFY_OUTBOX_STREAM", "auth:notifications")
+        self.dead_letter_stream = f"{self.stream}:dead"
+        self.max_length = int(config.get("NOTIFY_OUTBOX_MAXLEN", 100000))
+        self._group_ready = False
+        logger.info("RedisNotificationOutbox initialized on stream %s", self.stream)
+
+    async def _ensure_group(self):
+        if self._group_ready:
+            return
+        try:
+            await self._client.xgroup_create(self.stream, CONSUMER_GROUP, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def enqueue(self, recipient_id: str, subject: str, message: str, kind: str) -> str:
+        fields = {
+            "kind": kind,
+            "recipient": recipient_id,
+            "subject": subject,
+            "message": message,
+            "enqueued_at": str(int(time.time())),
+        }
+        message_id = await self._client.xadd(self.stream, fields, maxlen=self.max_length, approximate=True)
+        logger.debug("XADD %s %s (%s)", self.stream, message_id, kind)
+        return message_id
+
+    async def read_new(self, consumer: str, count: int, block_ms: Optional[int]) -> List[OutboxMessage]:
+        await self._ensure_group()
+        response = await self._client.xreadgroup(
+            CONSUMER_GROUP, consumer, {self.stream: ">"}, count=count, block=block_ms
+        )
+        if not response:
+            return []
+        _, entries = response[0]
+        return [OutboxMessage(message_id, fields) for message_id, fields in entries]
+
+    async def claim_stale(self, consumer: str, min_idle_ms: int, count: int) -> List[OutboxMessage]:
+        await self._ensure_group()
+        pending = await self._client.xpending_range(
+            self.stream, CONSUMER_GROUP, min="-", max="+", count=count, idle=min_idle_ms
+        )
+        if not pending:
+            return []
+
+        deliveries = {p["message_id"]: p["times_delivered"] for p in pending}
+        claimed = await self._client.xclaim(
+            self.stream, CONSUMER_GROUP, consumer, min_idle_time=min_idle_ms, message_ids=list(deliveries)
+        )
+        messages = []
+        for message_id, fields in claimed:
+            if fields is None:
+                # Trimmed from the stream while pending; nothing left to send
+                await self.ack([message_id])
+                continue
+            messages.append(OutboxMessage(message_id, fields, previous_attempts=deliveries.get(message_id, 0)))
+        return messages
+
+    async def ack(self, message_ids: List[str]) -> None:
+        if message_ids:
+            await self._client.xack(self.stream, CONSUMER_GROUP, *message_ids)
+
+    async def dead_letter(self, message: OutboxMessage, reason: str) -> None:
+        fields = dict(message.fields)
+        fields.update({
+            "source_id": message.message_id,
+            "attempts": str(message.previous_attempts),
+            "reason": reason[:500],
+        })
+        pipe = self._client.pipeline(transaction=True)
+        pipe.xadd(self.dead_letter_stream, fields, maxlen=self.max_length, approximate=True)
+        pipe.xack(self.stream, CONSUMER_GROUP, message.message_id)
+        await pipe.execute()
+        logger.warning("Dead-lettered notification %s after %d attempt(s): %s", message.message_id, message.previous_attempts, reason)
@@ -6,16 +6,16 @@ class Notifier(ABC):
         self.api_key = api_key
 
     @abstractmethod
-    def connect(self):
+    async def connect(self):
         """Authenticate or prepare the connection to the external notification API."""
         pass
 
     @abstractmethod
-    def notify(self, recipient_id: str, subject: str, message: str):
+    async def notify(self, recipient_id: str, subject: str, message: str):
         """Send a notification via the external API."""
         pass
 
     @abstractmethod
-    def disconnect(self):
+    async def disconnect(self):
         """Clean up any persistent connections or sessions."""
         pass
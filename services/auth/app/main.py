@@ -6,17 +6,29 @@ import asyncio
 from contextlib import asynccontextmanager
 import traceback
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import Literal
-from sqlalchemy import text
+from typing import Literal, Optional
 
 from app.common import config as config_module
+from app.common.metrics import render_metrics
+from app.common.health import HealthProber
+from app.common.loop_monitor import LoopMonitor
+from app.common.deadline import DeadlineMiddleware, DeadlineExceeded
+from app.common.tracing import TraceMiddleware, configure_tracing, run_exporter
+from app.common.db_cost import DbCostMiddleware
+from app.common.client_ip import warn_if_no_trusted_proxies
 from app.infrastructure.routers.auth import get_router as get_auth_router
 from app.infrastructure.routers.internal import internal_router
+from app.infrastructure.routers.debug import debug_router
 from app.interfaces.relationaldb.postgres_adapter import PostgresUserAdapter
 from app.interfaces.keyvalue.redis_adapter import RedisAdapter
-from app.interfaces.user_notification.email_notification_adapter import EmailNotifierAdapter
+from app.interfaces.keyvalue.memory_adapter import InMemoryKeyValueAdapter
+from app.interfaces.user_notification.redis_outbox_adapter import RedisNotificationOutbox
+from app.application.use_case.access_token import signed_tokens_enabled
+from app.application.use_case.revocation import run_revocation_publisher
+from app.application.use_case.session_cache import configure_session_cache, run_invalidation_listener
+from app.application.use_case.breached_password import configure_breached_password_filter
 
 import time
 from datetime import datetime, timezone
@@ -24,26 +36,52 @@ from datetime import datetime, timezone
 # Load config from .env
 env_path = os.path.join(os.path.dirname(__file__), ".env")
 config = config_module.Config(env_path)
+configure_tracing(config)
 
 
 
 # Instantiate adapters
-relational_db_adapter = PostgresUserAdapter(config)
-keyvalue_adapter = RedisAdapter(config)
-user_notification_adapter = EmailNotifierAdapter(config)
+# RELATIONAL_BACKEND=cockroach stores users in CockroachDB (COCKROACH_* settings)
+if config.get("RELATIONAL_BACKEND", "postgres").lower() == "cockroach":
+    from app.interfaces.relationaldb.cockroachdb import CockroachUserAdapter
+    relational_db_adapter = CockroachUserAdapter(config)
+else:
+    relational_db_adapter = PostgresUserAdapter(config)
+# KEYVALUE_BACKEND=memory keeps sessions in this process (local benchmarks only)
+if config.get("KEYVALUE_BACKEND", "redis").lower() == "memory":
+    keyvalue_adapter = InMemoryKeyValueAdapter()
+else:
+    keyvalue_adapter = RedisAdapter(config)
+notification_outbox = RedisNotificationOutbox(config)
 
 # Record when this service process started so /status can report uptime
 SERVICE_START_TS = time.time()
 SERVICE_STARTED_AT = datetime.now(timezone.utc).isoformat()
 
+# Dependency checks run in the background; /status only reads the latest results
+health_prober = HealthProber(
+    interval=float(config.get("HEALTH_PROBE_INTERVAL", 5)),
+    timeout=float(config.get("HEALTH_PROBE_TIMEOUT", 2))
+)
+health_prober.register("redis", keyvalue_adapter.ping)
+# ping() is blocking, keep it off the event loop
+health_prober.register("postgres", lambda: asyncio.to_thread(relational_db_adapter.ping))
+
+# Opt-in: reports event-loop lag and logs the stack of any call blocking the loop
+loop_monitor = None
+if config.get("LOOP_MONITOR", "false").lower() == "true":
+    loop_monitor = LoopMonitor(
+        interval=float(config.get("LOOP_MONITOR_INTERVAL_MS", 50)) / 1000,
+        block_threshold=float(config.get("LOOP_BLOCK_THRESHOLD_MS", 100)) / 1000
+    )
+
 MAX_RETRIES = 5
 RETRY_DELAY = 1  # seconds
 
 async def retry_redis_check():
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            pong = await keyvalue_adapter._client.ping()
-            if pong is True:
+            if await keyvalue_adapter.ping():
                 logger.info("🟥 Redis is live and spicy")
                 return
             raise Exception("Unexpected Redis ping response")
@@ -58,8 +96,7 @@ async def retry_redis_check():
 async def retry_postgres_check():
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            with relational_db_adapter.session.begin():
-                relational_db_adapter.session.execute(text("SELECT 1"))
+            relational_db_adapter.ping()
             logger.info("🐘 Postgres is standing strong and majestic")
             return
         except Exception as e:
@@ -84,27 +121,54 @@ async def lifespan(app: FastAPI):
     
     # Initialize database tables if needed
     try:
-        from app.infrastructure.db.metadata import metadata
-        bind = relational_db_adapter.session.get_bind()
-        metadata.create_all(bind=bind)
+        relational_db_adapter.create_tables()
         logger.info("🗄️ Database tables initialized")
     except Exception as e:
         logger.error("Failed to initialize database tables: %s", str(e))
         
     logger.info (config.get("ENVIRONMENT"))
+
+    warn_if_no_trusted_proxies(config, logger)
+
+    if configure_breached_password_filter(config) is not None:
+        logger.info("🔐 Breached-password screening enabled")
+
+    invalidation_task = None
+    if configure_session_cache(config) is not None:
+        invalidation_task = asyncio.create_task(run_invalidation_listener(keyvalue_adapter))
+        logger.info("🧠 Session near cache enabled")
+
+    revocation_task = None
+    if signed_tokens_enabled(config):
+        config.get("SIGNED_TOKEN_SECRET")  # fail at boot rather than on the first login
+        revocation_task = asyncio.create_task(run_revocation_publisher(keyvalue_adapter, config))
+        logger.info("🔏 Signed access tokens enabled, publishing revocation filter")
     
+    await health_prober.probe_all()
+    health_task = asyncio.create_task(health_prober.run())
+    trace_task = asyncio.create_task(run_exporter())
+    loop_monitor_task = asyncio.create_task(loop_monitor.run()) if loop_monitor else None
+
     yield  # App is now ready
 
     logger.info("📦 Shutting down... cleaning up connections")
 
+    for task in (health_task, trace_task, loop_monitor_task, revocation_task, invalidation_task):
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
     try:
-        await keyvalue_adapter._client.close()
+        await keyvalue_adapter.close()
         logger.info("🟥 Redis connection tucked into bed")
     except Exception as e:
         logger.warning("⚠️ Failed to close Redis: %s", str(e))
 
     try:
-        relational_db_adapter.session.close()
+        relational_db_adapter.close()
         logger.info("🐘 Postgres session closed with honor")
     except Exception as e:
         logger.warning("⚠️ Failed to close Postgres session: %s", str(e))
@@ -114,88 +178,72 @@ async def lifespan(app: FastAPI):
 # Set the global prefix to /api
 app = FastAPI(lifespan=lifespan)
 
+# Per-request SQL statement count, time and rows; X-DB-* headers in development
+app.add_middleware(
+    DbCostMiddleware,
+    expose_headers=config.get("DB_COST_HEADERS", str(config.get("ENVIRONMENT", "") == "development")).lower() == "true",
+    repeat_threshold=int(config.get("DB_REPEAT_WARN_THRESHOLD", 5))
+)
+# Honor the caller's X-Request-Timeout-Ms; cancels abandoned requests and bounds their queries
+app.add_middleware(DeadlineMiddleware, default_timeout_ms=float(config.get("REQUEST_TIMEOUT_MS", 10000)))
+# Outermost, so the server span also covers deadline 504s
+app.add_middleware(TraceMiddleware)
+
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request, exc: DeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+
 # Mount public-facing auth router
 app.include_router(
-    get_auth_router(relational_db_adapter, keyvalue_adapter, config, user_notification_adapter)
+    get_auth_router(relational_db_adapter, keyvalue_adapter, config, notification_outbox)
 )
 
 # Mount internal router (e.g., for /internal/validate)
 app.include_router(internal_router)
 
+# Profiling endpoints, disabled unless DEBUG_PROFILE_TOKEN is set
+app.include_router(debug_router)
 
-@app.get("/status", response_model=dict)
-async def status_check():
-    """Service status endpoint. Checks Redis and Postgres connectivity and returns a summary.
 
-    Returns 200 when both Redis and Postgres are responsive, otherwise 503.
-    """
-    results = {}
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of this worker's in-process metrics."""
+    return render_metrics()
 
-    # Check Redis
-    try:
-        pong = None
-        try:
-            pong = await keyvalue_adapter._client.ping()
-        except Exception:
-            # Some redis clients expose sync ping; try getattr fallback
-            client = getattr(keyvalue_adapter, '_client', None)
-            if client is not None and hasattr(client, 'ping'):
-                pong = await client.ping()
-        results['redis'] = 'ok' if pong is True else f'unexpected_response: {pong}'
-    except Exception as e:
-        results['redis'] = f'error: {str(e)}'
 
-    # Check Postgres
-    try:
-        with relational_db_adapter.session.begin():
-            relational_db_adapter.session.execute(text("SELECT 1"))
-        results['postgres'] = 'ok'
-    except Exception as e:
-        results['postgres'] = f'error: {str(e)}'
+class StatusComponent(BaseModel):
+    status: Literal['ok', 'error']
+    detail: Optional[str] = None
+    latency_ms: Optional[float] = None
+    p95_latency_ms: Optional[float] = None
+    checked_at: Optional[str] = None
 
-    results['environment'] = config.get('ENVIRONMENT')
 
-    # Service component: uptime and start time for the running auth service
-    try:
-        uptime_seconds = int(time.time() - SERVICE_START_TS)
-        service_component = {
+class StatusResponse(BaseModel):
+    redis: StatusComponent
+    postgres: StatusComponent
+    service: dict
+    environment: Optional[str] = None
+
+
+@app.get("/status", response_model=StatusResponse)
+async def status_check():
+    """Service status endpoint. Serves the health prober's latest Redis and Postgres results.
+
+    Returns 200 when both Redis and Postgres are responsive, otherwise 503.
+    No dependency is contacted here; results are at most HEALTH_PROBE_INTERVAL old.
+    """
+    components = health_prober.snapshot()
+    body = StatusResponse(
+        redis=components['redis'],
+        postgres=components['postgres'],
+        service={
             'status': 'ok',
-            'uptime_seconds': uptime_seconds,
+            'uptime_seconds': int(time.time() - SERVICE_START_TS),
             'started_at': SERVICE_STARTED_AT,
-        }
-    except Exception as e:
-        service_component = {'status': 'error', 'detail': str(e)}
-
-    overall_ok = results.get('redis') == 'ok' and results.get('postgres') == 'ok'
-    status_code = 200 if overall_ok else 503
-
-    # Build structured response
-    class StatusComponent(BaseModel):
-        status: Literal['ok', 'error']
-        detail: str | None = None
-
-    class StatusResponse(BaseModel):
-        redis: StatusComponent
-        postgres: StatusComponent
-        service: dict
-        environment: str | None = None
-
-    from typing import Optional
-
-    def make_component(value: Optional[str]):
-        v = value if value is not None else 'error: unknown'
-        if v == 'ok':
-            return {'status': 'ok', 'detail': None}
-        if isinstance(v, str) and v.startswith('error:'):
-            return {'status': 'error', 'detail': v[len('error: '):]}
-        return {'status': 'error', 'detail': str(v)}
-
-    body = {
-        'redis': make_component(results.get('redis')),
-        'postgres': make_component(results.get('postgres')),
-        'service': service_component,
-        'environment': results.get('environment')
-    }
-
-    validated = StatusResponse(**body)
-    return JSONResponse(status_code=status_code, content=validated.dict())
+        },
+        environment=config.get('ENVIRONMENT')
+    )
+    status_code = 200 if health_prober.healthy(components) else 503
+    return JSONResponse(status_code=status_code, content=body.model_dump())
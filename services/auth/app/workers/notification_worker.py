@@ -0,0 +1,54 @@
+# app/workers/notification_worker.py
+#
+# Drains the notification outbox written by the auth request path.
+#
+#   python -m app.workers.notification_worker
+#
+# Several workers can run side by side; each needs a distinct NOTIFY_CONSUMER
+# (defaults to the hostname) so the consumer group can tell their pending
+# messages apart.
+import os
+import socket
+import signal
+import asyncio
+import logging
+
+from app.common.config import Config
+from app.application.use_case.deliver_notifications import DeliverySettings, deliver_batch
+from app.interfaces.user_notification.email_notification_adapter import EmailNotifierAdapter
+from app.interfaces.user_notification.redis_outbox_adapter import RedisNotificationOutbox
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s:%(name)s:%(message)s")
+logger = logging.getLogger(__name__)
+
+
+async def run(config: Config):
+    outbox = RedisNotificationOutbox(config)
+    notifier = EmailNotifierAdapter(config)
+    settings = DeliverySettings.from_config(config)
+    consumer = config.get("NOTIFY_CONSUMER", socket.gethostname())
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await notifier.connect()
+    logger.info("Notification worker %s started on %s", consumer, outbox.stream)
+    try:
+        while not stop.is_set():
+            try:
+                stats = await deliver_batch(outbox, notifier, consumer, settings)
+                if any(stats.values()):
+                    logger.info("Delivered batch: %s", stats)
+            except Exception as e:
+                logger.exception("Notification batch failed: %s", str(e))
+                await asyncio.sleep(1)
+    finally:
+        await notifier.disconnect()
+        logger.info("Notification worker %s stopped", consumer)
+
+
+if __name__ == "__main__":
+    config = Config(os.path.join(os.path.dirname(__file__), "../.env"))
+    asyncio.run(run(config))
@@ -0,0 +1,115 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.application.use_case import session_cache, sessions
+from app.application.use_case.get_user_from_token import get_user_from_token
+from app.application.use_case.session_store import save_session
+from app.common.near_cache import NearCache
+from app.interfaces.keyvalue.memory_adapter import InMemoryKeyValueAdapter
+from app.interfaces.keyvalue.token_data_object import UserToken
+
+USER_ID = "42"
+DEVICE = "web_browser"
+
+
+class Users:
+    def __init__(self, during_lookup=None):
+        self.during_lookup = during_lookup
+
+    def get_user_by_id(self, user_id):
+        if self.during_lookup:
+            self.during_lookup()
+        return SimpleNamespace(id=user_id, email="user@example.com")
+
+
+@pytest.fixture
+def near_cache():
+    cache = session_cache.configure_session_cache({"SESSION_NEAR_CACHE": "true", "SESSION_NEAR_CACHE_TTL": "30"})
+    yield cache
+    session_cache.configure_session_cache({})
+
+
+async def logged_in(kv) -> UserToken:
+    token = UserToken.create("access-1", "refresh-1", "198.51.100.1", "pytest", DEVICE, "session-1")
+    await save_session(kv, USER_ID, token, session_ttl=600, access_token_ttl=60)
+    return token
+
+
+async def validate(kv, access_token, users=None):
+    return await get_user_from_token(access_token, "198.51.100.1", "pytest", DEVICE, users or Users(), kv, {})
+
+
+def test_put_refuses_a_value_from_before_an_invalidation():
+    cache = NearCache(max_entries=10, max_ttl=30)
+    before = cache.generation
+
+    cache.invalidate_tag("user:42")
+
+    assert not cache.put("token", "stale", ttl=10, tags=("user:42",), generation=before)
+    assert cache.get("token") is None
+    assert cache.put("token", "fresh", ttl=10, tags=("user:42",), generation=cache.generation)
+    assert cache.get("token") == "fresh"
+
+
+def test_invalidate_tag_drops_only_tagged_entries():
+    cache = NearCache(max_entries=10, max_ttl=30)
+    cache.put("a", 1, ttl=10, tags=("user:1", "session:1:web"))
+    cache.put("b", 2, ttl=10, tags=("user:1", "session:1:ios"))
+    cache.put("c", 3, ttl=10, tags=("user:2",))
+
+    assert cache.invalidate_tag("session:1:web") == 1
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (None, 2, 3)
+
+    assert cache.invalidate_tag("user:1") == 1
+    assert (cache.get("b"), cache.get("c")) == (None, 3)
+
+
+def test_entries_expire_and_the_ttl_is_capped(monkeypatch):
+    cache = NearCache(max_entries=10, max_ttl=5)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.put("token", "value", ttl=3600)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 5)
+
+    assert cache.get("token") is None
+    assert not cache.put("token", "value", ttl=0)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = NearCache(max_entries=2, max_ttl=30)
+    cache.put("a", 1, ttl=10, tags=("t",))
+    cache.put("b", 2, ttl=10)
+    cache.get("a")
+
+    cache.put("c", 3, ttl=10)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    assert cache.invalidate_tag("t") == 1
+
+
+@pytest.mark.asyncio
+async def test_logout_stops_a_cached_token_from_validating(near_cache):
+    kv = InMemoryKeyValueAdapter()
+    token = await logged_in(kv)
+    assert (await validate(kv, token.access_token)).status_code == 200
+    assert len(near_cache) == 1
+
+    await sessions.logout(token.access_token, token.refresh_token, kv, {})
+
+    assert (await validate(kv, token.access_token)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_validation_racing_an_invalidation_is_not_cached(near_cache):
+    kv = InMemoryKeyValueAdapter()
+    token = await logged_in(kv)
+    # Another replica revokes the user's sessions while this lookup is in flight
+    users = Users(during_lookup=lambda: session_cache._apply(USER_ID))
+
+    assert (await validate(kv, token.access_token, users)).status_code == 200
+
+    assert session_cache.lookup(token.access_token, DEVICE) is None
+    assert len(near_cache) == 0
@@ -0,0 +1,95 @@
+import logging
+
+import pytest
+from starlette.requests import Request
+
+from app.application.use_case.rate_limit import check_rate_limit
+from app.common.client_ip import client_ip, parse_trusted_proxies, resolve_client_ip, trusted_proxies, warn_if_no_trusted_proxies
+from app.interfaces.keyvalue.memory_adapter import InMemoryKeyValueAdapter
+
+BFF = "172.18.0.5"
+TRUSTED = parse_trusted_proxies("172.18.0.0/16")
+
+# Only the per-IP window, 2 logins a minute; a plain dict stands in for Config
+CONFIG = {
+    "TRUSTED_PROXIES": "172.18.0.0/16",
+    "RATE_LIMIT_LOGIN_IP": "2/60",
+    "RATE_LIMIT_LOGIN_EMAIL": "off",
+    "RATE_LIMIT_LOGIN_GLOBAL": "off",
+}
+
+
+def bff_request(forwarded_for=None, peer=BFF) -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "method": "POST", "path": "/login", "headers": headers, "client": (peer, 40000)})
+
+
+async def login_attempt(kv, request: Request) -> bool:
+    result = await check_rate_limit(kv, CONFIG, "login", client_ip(request, CONFIG), "user@example.com")
+    return result.allowed
+
+
+@pytest.mark.asyncio
+async def test_clients_behind_the_bff_get_separate_windows():
+    kv = InMemoryKeyValueAdapter()
+    alice, bob = bff_request("198.51.100.1"), bff_request("198.51.100.2")
+
+    assert await login_attempt(kv, alice)
+    assert await login_attempt(kv, alice)
+    assert not await login_attempt(kv, alice)
+
+    assert await login_attempt(kv, bob)
+    assert await login_attempt(kv, bob)
+
+
+@pytest.mark.asyncio
+async def test_rejection_reports_scope_and_retry_after():
+    kv = InMemoryKeyValueAdapter()
+    for _ in range(2):
+        await check_rate_limit(kv, CONFIG, "login", "198.51.100.1")
+    result = await check_rate_limit(kv, CONFIG, "login", "198.51.100.1")
+    assert not result.allowed
+    assert result.scope == "ip"
+    assert 1 <= result.retry_after <= 60
+
+
+@pytest.mark.asyncio
+async def test_internal_callers_skip_the_ip_window():
+    kv = InMemoryKeyValueAdapter()
+    for _ in range(5):
+        assert await login_attempt(kv, bff_request())
+
+
+def test_forwarded_for_is_ignored_from_untrusted_peers():
+    assert resolve_client_ip("8.8.4.4", "198.51.100.1", TRUSTED) == "8.8.4.4"
+
+
+def test_client_supplied_forwarded_for_entries_are_skipped():
+    # The client prepended a fake address; the BFF appended the one it saw
+    assert resolve_client_ip(BFF, "10.0.0.1, 198.51.100.7", TRUSTED) == "198.51.100.7"
+    assert resolve_client_ip(BFF, "198.51.100.7, 172.18.0.9", TRUSTED) == "198.51.100.7"
+
+
+def test_unresolvable_callers_have_no_client_ip():
+    assert resolve_client_ip(BFF, None, TRUSTED) is None
+    assert resolve_client_ip(BFF, "not-an-ip", TRUSTED) is None
+    assert resolve_client_ip("10.1.2.3", "198.51.100.1", TRUSTED) is None
+
+
+def test_trusted_proxies_fall_back_to_the_environment(monkeypatch):
+    monkeypatch.setenv("TRUSTED_PROXIES", "10.0.0.0/8")
+
+    assert trusted_proxies({}) == parse_trusted_proxies("10.0.0.0/8")
+    assert trusted_proxies(CONFIG) == TRUSTED
+
+
+def test_startup_warns_when_per_ip_limits_cannot_apply(monkeypatch, caplog):
+    monkeypatch.delenv("TRUSTED_PROXIES", raising=False)
+    logger = logging.getLogger("test.client_ip")
+
+    with caplog.at_level(logging.WARNING, logger="test.client_ip"):
+        assert warn_if_no_trusted_proxies({}, logger)
+    assert "TRUSTED_PROXIES is empty" in caplog.text
+
+    assert not warn_if_no_trusted_proxies(CONFIG, logger)
+    assert not warn_if_no_trusted_proxies({"RATE_LIMIT_ENABLED": "false"}, logger)
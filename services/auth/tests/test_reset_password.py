@@ -0,0 +1,77 @@
+import json
+import time
+
+import pytest
+
+from app.application.use_case.reset_password import reset_password
+from app.application.use_case.session_store import load_session, save_session
+from app.interfaces.keyvalue.memory_adapter import InMemoryKeyValueAdapter
+from app.interfaces.keyvalue.token_data_object import UserToken
+
+USER_ID = "42"
+RESET_KEY = f"user:password_reset:{USER_ID}:0b5c"
+
+
+class Users:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.passwords = {}
+
+    def update_user_password(self, user_id, password):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.passwords[user_id] = password
+
+
+async def requested_reset(kv, ttl=900) -> str:
+    now = int(time.time())
+    await kv.set_token(RESET_KEY, json.dumps({"reset_token": "reset-1", "issued_at": now, "expires_at": now + ttl}), ex=ttl)
+    return "reset-1"
+
+
+async def logged_in(kv) -> UserToken:
+    token = UserToken.create("access-1", "refresh-1", "198.51.100.1", "pytest", "web_browser", "session-1")
+    await save_session(kv, USER_ID, token, session_ttl=600, access_token_ttl=60)
+    return token
+
+
+@pytest.mark.asyncio
+async def test_reset_changes_the_password_and_ends_sessions():
+    kv, users = InMemoryKeyValueAdapter(), Users()
+    await logged_in(kv)
+
+    result = await reset_password(await requested_reset(kv), "new password", {}, users, kv)
+
+    assert result["status_code"] == 200
+    assert users.passwords == {USER_ID: "new password"}
+    assert await load_session(kv, USER_ID, "web_browser") is None
+    assert (await reset_password("reset-1", "again", {}, users, kv))["status_code"] == 400
+
+
+@pytest.mark.asyncio
+async def test_failed_session_revocation_still_reports_success(monkeypatch):
+    kv, users = InMemoryKeyValueAdapter(), Users()
+    token = await requested_reset(kv)
+
+    async def redis_down(*args, **kwargs):
+        raise ConnectionError("redis unavailable")
+
+    monkeypatch.setattr("app.application.use_case.reset_password.delete_all_sessions", redis_down)
+
+    result = await reset_password(token, "new password", {}, users, kv)
+
+    assert result["status_code"] == 200
+    assert users.passwords == {USER_ID: "new password"}
+
+
+@pytest.mark.asyncio
+async def test_failed_update_leaves_the_token_usable():
+    kv = InMemoryKeyValueAdapter()
+    token = await requested_reset(kv)
+
+    assert (await reset_password(token, "new password", {}, Users(fail=True), kv))["status_code"] == 500
+    assert 0 < await kv.ttl(RESET_KEY) <= 900
+
+    users = Users()
+    assert (await reset_password(token, "new password", {}, users, kv))["status_code"] == 200
+    assert users.passwords == {USER_ID: "new password"}
@@ -0,0 +1,99 @@
+import base64
+import time
+
+import pytest
+
+from app.application.use_case import sessions
+from app.application.use_case.revocation import (
+    load_revocation_filter,
+    publish_revocation_filter,
+    revoke_session_ids,
+)
+from app.application.use_case.session_store import save_session
+from app.common.bloom_filter import BloomFilter, optimal_parameters
+from app.interfaces.keyvalue.memory_adapter import InMemoryKeyValueAdapter
+from app.interfaces.keyvalue.session_record import REVOKED_SESSIONS_KEY
+from app.interfaces.keyvalue.token_data_object import UserToken
+
+SIGNED = {"ACCESS_TOKEN_FORMAT": "signed", "SIGNED_TOKEN_SECRET": "test-secret", "SIGNED_ACCESS_TOKEN_TTL": "60"}
+
+
+def published_filter(loaded) -> BloomFilter:
+    _, encoded = loaded
+    return BloomFilter.from_bytes(base64.b64decode(encoded))
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    members = [f"session-{i}" for i in range(1000)]
+    bloom = BloomFilter.from_items(members, error_rate=0.01)
+
+    assert all(member in bloom for member in members)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_bloom_filter_bytes_round_trip():
+    bloom = BloomFilter.from_items(["a", "b"])
+    copy = BloomFilter.from_bytes(bloom.to_bytes())
+
+    assert (copy.size_bits, copy.num_hashes) == (bloom.size_bits, bloom.num_hashes)
+    assert "a" in copy and "b" in copy
+
+    with pytest.raises(ValueError):
+        BloomFilter.from_bytes(bloom.to_bytes()[:-1])
+
+
+def test_bloom_filter_file_round_trip(tmp_path):
+    path = str(tmp_path / "filter.bin")
+    bloom = BloomFilter.create_file(path, *optimal_parameters(10, 0.001))
+    bloom.add("hunter2")
+    bloom.close()
+
+    mapped = BloomFilter.open_file(path)
+    try:
+        assert "hunter2" in mapped
+        assert "correct horse" not in mapped
+    finally:
+        mapped.close()
+
+    (tmp_path / "junk.bin").write_bytes(b"not a filter at all")
+    with pytest.raises(ValueError):
+        BloomFilter.open_file(str(tmp_path / "junk.bin"))
+
+
+@pytest.mark.asyncio
+async def test_published_filter_holds_live_revocations_only():
+    kv = InMemoryKeyValueAdapter()
+    await revoke_session_ids(kv, ["session-1", "", "session-2"], ttl=60)
+    await kv.add_to_index(REVOKED_SESSIONS_KEY, "session-expired", score=int(time.time()) - 1)
+
+    assert await publish_revocation_filter(kv, error_rate=0.001, ttl=60) == 2
+
+    bloom = published_filter(await load_revocation_filter(kv))
+    assert "session-1" in bloom and "session-2" in bloom
+    assert "session-expired" not in bloom
+
+
+@pytest.mark.asyncio
+async def test_logout_in_signed_mode_revokes_the_session_id():
+    kv = InMemoryKeyValueAdapter()
+    token = UserToken.create("access-1", "refresh-1", "198.51.100.1", "pytest", "web_browser", "session-1")
+    await save_session(kv, "42", token, session_ttl=600, access_token_ttl=60)
+
+    assert await sessions.logout(token.access_token, token.refresh_token, kv, SIGNED)
+    await publish_revocation_filter(kv, error_rate=0.001, ttl=60)
+
+    assert "session-1" in published_filter(await load_revocation_filter(kv))
+
+
+@pytest.mark.asyncio
+async def test_logout_with_stale_tokens_does_not_revoke_the_current_session():
+    kv = InMemoryKeyValueAdapter()
+    old = UserToken.create("access-1", "refresh-1", "198.51.100.1", "pytest", "web_browser", "session-1")
+    current = UserToken.create("access-2", "refresh-2", "198.51.100.1", "pytest", "web_browser", "session-2")
+    await save_session(kv, "42", old, session_ttl=600, access_token_ttl=60)
+    await save_session(kv, "42", current, session_ttl=600, access_token_ttl=60)
+
+    await sessions.logout(old.access_token, old.refresh_token, kv, SIGNED)
+
+    assert "session-2" not in await kv.get_index(REVOKED_SESSIONS_KEY)
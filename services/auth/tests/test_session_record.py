@@ -0,0 +1,86 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.application.use_case.get_user_from_token import get_user_from_token, legacy_scans
+from app.interfaces.keyvalue.memory_adapter import InMemoryKeyValueAdapter
+from app.interfaces.keyvalue.session_record import (
+    decode_pointer,
+    decode_session,
+    encode_pointer,
+    encode_session,
+    session_key,
+    split_session_key,
+)
+from app.interfaces.keyvalue.token_data_object import UserToken
+
+TOKEN = UserToken(
+    access_token="access",
+    refresh_token="refresh",
+    issued_at=1700000000,
+    expires_at=4102444800,
+    ip_address="198.51.100.1",
+    user_agent="Mozilla/5.0 (X11; Linux) | with a separator",
+    device_id="web_browser",
+    session_id="session",
+)
+
+
+class Users:
+    def get_user_by_id(self, user_id):
+        return SimpleNamespace(id=user_id, email="user@example.com")
+
+
+def test_record_round_trips_including_separator_in_user_agent():
+    assert decode_session(encode_session(TOKEN), "web_browser") == TOKEN
+
+
+def test_legacy_json_records_still_decode():
+    assert decode_session(json.dumps(TOKEN.__dict__), "web_browser") == TOKEN
+
+
+def test_unknown_record_versions_are_rejected():
+    with pytest.raises(ValueError):
+        decode_session("9|1|2|a|r|s|ip|ua", "web_browser")
+
+
+def test_pointer_and_key_helpers():
+    assert decode_pointer(encode_pointer(42, "web_browser")) == ("42", "web_browser")
+    assert decode_pointer(None) is None
+    assert split_session_key(session_key(42, "web_browser")) == ("42", "web_browser")
+
+
+async def validate(kv, config, access_token):
+    return await get_user_from_token(access_token, "198.51.100.1", "pytest", "web_browser", Users(), kv, config)
+
+
+@pytest.mark.asyncio
+async def test_unknown_tokens_do_not_scan_by_default():
+    kv = InMemoryKeyValueAdapter()
+    await kv.set_token(session_key(42, "web_browser"), json.dumps(TOKEN.__dict__))
+    before = legacy_scans.value(result="missed") + legacy_scans.value(result="found")
+
+    response = await validate(kv, {}, "garbage")
+    assert response.status_code == 401
+    assert response.error == "Invalid access token"
+    # Even a token only findable by scanning stays unknown with the scan off
+    assert (await validate(kv, {}, TOKEN.access_token)).status_code == 401
+
+    assert legacy_scans.value(result="missed") + legacy_scans.value(result="found") == before
+
+
+@pytest.mark.asyncio
+async def test_legacy_scan_fallback_is_counted_when_enabled():
+    kv = InMemoryKeyValueAdapter()
+    await kv.set_token(session_key(42, "web_browser"), json.dumps(TOKEN.__dict__))
+    config = {"SESSION_LEGACY_SCAN": "true"}
+    found, missed = legacy_scans.value(result="found"), legacy_scans.value(result="missed")
+
+    response = await validate(kv, config, TOKEN.access_token)
+    assert response.status_code == 200
+    assert response.user["id"] == "42"
+    assert (await validate(kv, config, "garbage")).status_code == 401
+
+    assert legacy_scans.value(result="found") == found + 1
+    assert legacy_scans.value(result="missed") == missed + 1
@@ -0,0 +1,69 @@
+import pytest
+
+from app.application.use_case import sessions
+from app.application.use_case.session_store import (
+    load_session,
+    resolve_access_token,
+    resolve_refresh_token,
+    save_session,
+)
+from app.interfaces.keyvalue.memory_adapter import InMemoryKeyValueAdapter
+from app.interfaces.keyvalue.session_record import encode_pointer, refresh_key
+from app.interfaces.keyvalue.token_data_object import UserToken
+
+CONFIG = {}
+USER_ID = "42"
+DEVICE = "web_browser"
+
+
+async def login(kv, n: int) -> UserToken:
+    token = UserToken.create(f"access-{n}", f"refresh-{n}", "198.51.100.1", "pytest", DEVICE, f"session-{n}")
+    await save_session(kv, USER_ID, token, session_ttl=600, access_token_ttl=60)
+    return token
+
+
+@pytest.mark.asyncio
+async def test_logout_removes_the_presented_session():
+    kv = InMemoryKeyValueAdapter()
+    token = await login(kv, 1)
+
+    assert await sessions.logout(token.access_token, token.refresh_token, kv, CONFIG)
+
+    assert await load_session(kv, USER_ID, DEVICE) is None
+    assert await resolve_access_token(kv, token.access_token) is None
+    assert await resolve_refresh_token(kv, token.refresh_token) is None
+
+
+@pytest.mark.asyncio
+async def test_second_login_drops_the_replaced_sessions_pointers():
+    kv = InMemoryKeyValueAdapter()
+    first = await login(kv, 1)
+    second = await login(kv, 2)
+
+    assert await resolve_refresh_token(kv, first.refresh_token) is None
+    assert await resolve_access_token(kv, first.access_token) is None
+    assert await resolve_refresh_token(kv, second.refresh_token) == (USER_ID, DEVICE)
+
+
+@pytest.mark.asyncio
+async def test_logout_with_a_replaced_token_keeps_the_current_session():
+    kv = InMemoryKeyValueAdapter()
+    first = await login(kv, 1)
+    second = await login(kv, 2)
+    # A pointer left behind for the replaced session, as before pointers were cleaned up
+    await kv.set_token(refresh_key(first.refresh_token), encode_pointer(USER_ID, DEVICE), ex=600)
+
+    assert not await sessions.logout(None, first.refresh_token, kv, CONFIG)
+
+    current = await load_session(kv, USER_ID, DEVICE)
+    assert current is not None and current.refresh_token == second.refresh_token
+    assert await resolve_refresh_token(kv, first.refresh_token) is None
+    assert await resolve_refresh_token(kv, second.refresh_token) == (USER_ID, DEVICE)
+
+
+@pytest.mark.asyncio
+async def test_logout_with_unknown_tokens_finds_nothing():
+    kv = InMemoryKeyValueAdapter()
+    await login(kv, 1)
+    assert not await sessions.logout("nope", "nope", kv, CONFIG)
+    assert await load_session(kv, USER_ID, DEVICE) is not None
@@ -0,0 +1,65 @@
+from app.application.use_case.access_token import issue_access_token
+from app.common.signed_token import (
+    SignedClaims,
+    _b64decode,
+    _b64encode,
+    _mac,
+    is_signed_token,
+    sign_access_token,
+    verify_access_token,
+)
+
+SECRET = "test-secret"
+NOW = 1_700_000_000
+CLAIMS = SignedClaims("42", "session-1", "web_browser", NOW, NOW + 300)
+
+
+def test_round_trip():
+    token = sign_access_token(SECRET, CLAIMS)
+
+    assert is_signed_token(token)
+    assert verify_access_token(SECRET, token, now=NOW) == CLAIMS
+
+
+def test_wrong_secret_is_rejected():
+    assert verify_access_token("other-secret", sign_access_token(SECRET, CLAIMS), now=NOW) is None
+
+
+def test_edited_payload_is_rejected():
+    prefix, payload, signature = sign_access_token(SECRET, CLAIMS).split(".")
+    forged = _b64decode(payload).decode().replace("42|", "1|", 1)
+
+    assert verify_access_token(SECRET, f"{prefix}.{_b64encode(forged.encode())}.{signature}", now=NOW) is None
+
+
+def test_edited_signature_is_rejected():
+    token = sign_access_token(SECRET, CLAIMS)
+    flipped = token[:-1] + ("A" if token[-1] != "A" else "B")
+
+    assert verify_access_token(SECRET, flipped, now=NOW) is None
+
+
+def test_expiry_is_exclusive():
+    token = sign_access_token(SECRET, CLAIMS)
+
+    assert verify_access_token(SECRET, token, now=CLAIMS.expires_at - 1) == CLAIMS
+    assert verify_access_token(SECRET, token, now=CLAIMS.expires_at) is None
+
+
+def test_malformed_tokens_are_rejected_without_raising():
+    for token in ["", "opaque-token", "st1.", "st1..", "st1.!!!.!!!", "st1.e30.e30", "st1.\u00e9.x"]:
+        assert verify_access_token(SECRET, token, now=NOW) is None
+
+    # Correctly signed, but not the five expected fields
+    message = f"st1.{_b64encode(b'42|session-1')}"
+    assert verify_access_token(SECRET, f"{message}.{_b64encode(_mac(SECRET, message))}", now=NOW) is None
+
+
+def test_issue_access_token_follows_the_configured_format():
+    signed = {"ACCESS_TOKEN_FORMAT": "signed", "SIGNED_TOKEN_SECRET": SECRET, "SIGNED_ACCESS_TOKEN_TTL": "60"}
+
+    token = issue_access_token(signed, 42, "session-1", "web_browser", issued_at=NOW)
+    claims = verify_access_token(SECRET, token, now=NOW)
+
+    assert claims == SignedClaims("42", "session-1", "web_browser", NOW, NOW + 60)
+    assert not is_signed_token(issue_access_token({}, 42, "session-1", "web_browser", issued_at=NOW))
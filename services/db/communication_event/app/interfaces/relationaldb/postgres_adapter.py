@@ -8,6 +8,7 @@ import logging
 from app.interfaces.relationaldb.relationaldb_repo import RelationalDBRepo
 from app.models.communication_event import Communication_event
 from app.infrastructure.database.postgres import SessionLocal
+from app.utils.deadline import DeadlineExceeded
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +25,8 @@ class PostGresAdapter(RelationalDBRepo):
             results = self.db.query(Communication_event).all()
             logger.info("Fetched %d communication_event records", len(results))
             return results
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error("Error fetching all communication_event records: %s", e, exc_info=True)
             return []
@@ -37,10 +40,23 @@ class PostGresAdapter(RelationalDBRepo):
             else:
                 logger.warning("No communication_event found with id: %s", item_id)
             return result
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error("Error fetching communication_event by id %s: %s", item_id, e, exc_info=True)
             return None
 
+    def get_by_ids(self, item_ids: List[UUID]) -> List[Communication_event]:
+        logger.info("Fetching %d communication_event records by id", len(item_ids))
+        if not item_ids:
+            return []
+        try:
+            return self.db.query(Communication_event).filter(Communication_event.id.in_(item_ids)).all()
+        except Exception as e:
+            # Not an empty result: callers would report every id as not found
+            logger.error("Error fetching communication_event records by ids: %s", e, exc_info=True)
+            raise
+
     def create(self, data: dict) -> Communication_event:
         logger.info("Creating new communication_event with data: %s", data)
         instance = Communication_event(**data)
@@ -121,6 +137,8 @@ class PostGresAdapter(RelationalDBRepo):
             results = query.all()
             logger.info("Search returned %d result(s)", len(results))
             return results
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error("Error during search: %s", e, exc_info=True)
             return []
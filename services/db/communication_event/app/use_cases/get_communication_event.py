@@ -1,3 +1,4 @@
+from typing import List
 from uuid import UUID
 from app.schemas.communication_event import Communication_eventResponse
 
@@ -10,3 +11,6 @@ class GetCommunication_event:
         if item is None:
             return None
         return Communication_eventResponse.from_orm(item)
+
+    def execute_many(self, item_ids: List[UUID]) -> List[Communication_eventResponse]:
+        return [Communication_eventResponse.from_orm(item) for item in self.relational_db.get_by_ids(item_ids)]
@@ -0,0 +1,182 @@
+import os
+import time
+import queue
+import logging
+import threading
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import event, Engine
+
+from app.utils.db_cost import statement_shape
+from app.utils.metrics import Counter
+from app.utils.profiling import require_debug_token
+
+logger = logging.getLogger(__name__)
+
+# Slow-query log with EXPLAIN capture.
+#
+# install_slow_query_log() times every statement on the engine, which covers
+# the PostGresAdapter methods and the SearchCommunication_event query
+# alike. A statement that takes SLOW_QUERY_MS or longer is logged with its
+# shape (parameters and literals collapsed, see db_cost.statement_shape), the
+# names and types of its bound parameters and its duration. Parameter values
+# are never logged.
+#
+# The first time a shape is slow, and then at most once per
+# SLOW_QUERY_EXPLAIN_INTERVAL seconds, a worker thread runs
+# EXPLAIN (ANALYZE off) for it with the same parameters on a separate pooled
+# connection. That shows the planner's estimates without running the statement
+# again, and the request does not wait for it. At most EXPLAIN_QUEUE_SIZE plans
+# wait at a time; more are skipped.
+#
+# Slow statements are aggregated per shape (count, total, max, latest plan),
+# for at most SLOW_QUERY_MAX_SHAPES shapes. GET /debug/slow-queries returns the
+# top ones. Like /debug/profile it is disabled unless DEBUG_PROFILE_TOKEN is set.
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "300"))
+SLOW_QUERY_MAX_SHAPES = int(os.getenv("SLOW_QUERY_MAX_SHAPES", "200"))
+EXPLAIN_QUEUE_SIZE = 16
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+slow_queries = Counter("communication_event_db_slow_queries_total", "Statements that took SLOW_QUERY_MS or longer")
+
+
+def parameter_shape(parameters) -> str:
+    """Names and types of bound parameters, without their values."""
+    if isinstance(parameters, dict):
+        return ", ".join(f"{name}: {type(value).__name__}" for name, value in parameters.items())
+    if isinstance(parameters, (list, tuple)):
+        return ", ".join(type(value).__name__ for value in parameters)
+    return ""
+
+
+class SlowQueryLog:
+    def __init__(self, engine: Engine, threshold: float):
+        self.engine = engine
+        self.threshold = threshold
+        self._stats: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._plans: queue.Queue = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+        self._worker: Optional[threading.Thread] = None
+
+    def record(self, statement: str, parameters, duration: float, executemany: bool = False) -> None:
+        shape = statement_shape(statement)
+        if executemany:
+            parameters = parameters[0] if parameters else None
+        params = parameter_shape(parameters)
+        slow_queries.inc()
+        logger.warning("Slow query %.0f ms [%s]: %s", duration * 1000, params, shape[:2000])
+        now = time.time()
+        with self._lock:
+            stats = self._stats.get(shape)
+            if stats is None:
+                if len(self._stats) >= SLOW_QUERY_MAX_SHAPES:
+                    # Make room by forgetting the shape that has cost the least
+                    del self._stats[min(self._stats, key=lambda s: self._stats[s]["total_ms"])]
+                stats = self._stats[shape] = {
+                    "statement": shape, "parameters": params, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "last_seen": now, "plan": None, "plan_captured_at": None, "explain_requested_at": 0.0,
+                }
+            stats["count"] += 1
+            stats["total_ms"] += duration * 1000
+            stats["max_ms"] = max(stats["max_ms"], duration * 1000)
+            stats["last_seen"] = now
+            stats["parameters"] = params
+            explain = (
+                SLOW_QUERY_EXPLAIN
+                and statement.lstrip()[:6].upper().startswith(EXPLAINABLE)
+                and now - stats["explain_requested_at"] >= SLOW_QUERY_EXPLAIN_INTERVAL
+            )
+            if explain:
+                stats["explain_requested_at"] = now
+        if explain:
+            self._request_plan(shape, statement, parameters)
+
+    def _request_plan(self, shape: str, statement: str, parameters) -> None:
+        try:
+            self._plans.put_nowait((shape, statement, parameters))
+        except queue.Full:
+            return
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._explain_plans, name="slow-query-explain", daemon=True)
+            self._worker.start()
+
+    def _explain_plans(self) -> None:
+        while True:
+            shape, statement, parameters = self._plans.get()
+            try:
+                with self.engine.connect() as conn:
+                    rows = conn.exec_driver_sql(f"EXPLAIN (ANALYZE off) {statement}", parameters or {}).all()
+                plan = "\n".join(row[0] for row in rows)
+            except Exception as e:
+                # The driver's own error, without SQLAlchemy's echo of the parameter values
+                logger.warning("EXPLAIN failed for slow query %s: %s", shape[:500], getattr(e, "orig", None) or e)
+                continue
+            with self._lock:
+                stats = self._stats.get(shape)
+                if stats is not None:
+                    stats["plan"] = plan
+                    stats["plan_captured_at"] = time.time()
+            logger.warning("Plan for slow query %s\n%s", shape[:2000], plan)
+
+    def top(self, limit: int, order_by: str) -> list:
+        with self._lock:
+            entries = [dict(stats) for stats in self._stats.values()]
+        for entry in entries:
+            entry.pop("explain_requested_at")
+            entry["mean_ms"] = round(entry["total_ms"] / entry["count"], 3)
+            entry["total_ms"] = round(entry["total_ms"], 3)
+            entry["max_ms"] = round(entry["max_ms"], 3)
+        return sorted(entries, key=lambda entry: entry[order_by], reverse=True)[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+slow_query_log: Optional[SlowQueryLog] = None
+
+
+def install_slow_query_log(engine: Engine) -> None:
+    """Log statements on `engine` slower than SLOW_QUERY_MS and capture their plans."""
+    global slow_query_log
+    slow_query_log = SlowQueryLog(engine, SLOW_QUERY_MS / 1000)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._slow_query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _check(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_query_started", None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        if duration >= slow_query_log.threshold and not statement.lstrip().upper().startswith("EXPLAIN"):
+            slow_query_log.record(statement, parameters, duration, executemany)
+
+
+router = APIRouter(prefix="/debug/slow-queries", tags=["Debug"], dependencies=[Depends(require_debug_token)], include_in_schema=False)
+
+
+@router.get("")
+def top_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    order_by: str = Query("total_ms", pattern="^(total_ms|max_ms|mean_ms|count)$"),
+):
+    """Slowest statement shapes in this worker since start or the last reset."""
+    return {
+        "threshold_ms": SLOW_QUERY_MS,
+        "queries": slow_query_log.top(limit, order_by) if slow_query_log else [],
+    }
+
+
+@router.delete("")
+def reset_slow_queries():
+    if slow_query_log:
+        slow_query_log.reset()
+    return {"reset": True}
@@ -8,6 +8,7 @@ import logging
 from app.interfaces.relationaldb.relationaldb_repo import RelationalDBRepo
 from app.models.human import Human
 from app.infrastructure.database.postgres import SessionLocal
+from app.utils.deadline import DeadlineExceeded
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +25,8 @@ class PostGresAdapter(RelationalDBRepo):
             results = self.db.query(Human).all()
             logger.info("Fetched %d human records", len(results))
             return results
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error("Error fetching all human records: %s", e, exc_info=True)
             return []
@@ -37,10 +40,23 @@ class PostGresAdapter(RelationalDBRepo):
             else:
                 logger.warning("No human found with id: %s", item_id)
             return result
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error("Error fetching human by id %s: %s", item_id, e, exc_info=True)
             return None
 
+    def get_by_ids(self, item_ids: List[UUID]) -> List[Human]:
+        logger.info("Fetching %d human records by id", len(item_ids))
+        if not item_ids:
+            return []
+        try:
+            return self.db.query(Human).filter(Human.id.in_(item_ids)).all()
+        except Exception as e:
+            # Not an empty result: callers would report every id as not found
+            logger.error("Error fetching human records by ids: %s", e, exc_info=True)
+            raise
+
     def create(self, data: dict) -> Human:
         logger.info("Creating new human with data: %s", data)
         instance = Human(**data)
@@ -121,6 +137,8 @@ class PostGresAdapter(RelationalDBRepo):
             results = query.all()
             logger.info("Search returned %d result(s)", len(results))
             return results
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error("Error during search: %s", e, exc_info=True)
             return []
@@ -0,0 +1,126 @@
+import os
+import re
+import time
+import logging
+from collections import Counter as ShapeCounter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event, Engine
+
+from app.utils.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Per-request database cost accounting.
+#
+# install_db_cost() hooks an engine's cursor events; DbCostMiddleware gives
+# each request a DbCost that those hooks add to: statements run, time spent in
+# the driver, and rows returned or affected. At the end of the request the
+# totals go to the human_db_*_per_request histograms (GET /metrics),
+# labelled by route, and, when DB_COST_HEADERS is on (default with ENV=dev),
+# back to the caller as X-DB-Statements / X-DB-Time-Ms / X-DB-Rows plus a
+# Server-Timing entry that browser dev tools display.
+#
+# Statements are also grouped by shape (the SQL with parameters and IN-lists
+# collapsed). A shape run more than DB_REPEAT_WARN_THRESHOLD times in one
+# request is usually a loop issuing one query per item (N+1); it is logged
+# with the statement and counted in human_db_repeated_statements_total.
+
+_dev = os.getenv("ENV", "").lower() == "dev"
+DB_COST_HEADERS = os.getenv("DB_COST_HEADERS", str(_dev)).lower() == "true"
+DB_REPEAT_WARN_THRESHOLD = int(os.getenv("DB_REPEAT_WARN_THRESHOLD", "5"))
+
+STATEMENT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+ROW_BUCKETS = (1, 10, 100, 1000, 10000, 100000)
+
+_PARAMETER = re.compile(r"%\(\w+\)s|\?|\$\d+|:\w+|\b\d+\b|'(?:[^']|'')*'")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+db_statements = Histogram("human_db_statements_per_request", "SQL statements run per request", ("route",), buckets=STATEMENT_BUCKETS)
+db_seconds = Histogram("human_db_seconds_per_request", "Time spent executing SQL per request", ("route",))
+db_rows = Histogram("human_db_rows_per_request", "Rows returned or affected by SQL per request", ("route",), buckets=ROW_BUCKETS)
+db_repeated = Counter("human_db_repeated_statements_total", "Requests that ran one statement shape more than the repeat threshold", ("route",))
+
+
+def statement_shape(statement: str) -> str:
+    shape = _PARAMETER.sub("?", statement)
+    shape = _LIST.sub("(?)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+class DbCost:
+    __slots__ = ("statements", "seconds", "rows", "shapes")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.shapes = ShapeCounter()
+
+
+_cost: ContextVar[Optional[DbCost]] = ContextVar("db_cost", default=None)
+
+
+def install_db_cost(engine: Engine) -> None:
+    """Add every statement run on `engine` to the current request's DbCost."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and _cost.get() is not None:
+            context._db_cost_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        cost = _cost.get()
+        started = getattr(context, "_db_cost_started", None)
+        if cost is None or started is None:
+            return
+        cost.statements += 1
+        cost.seconds += time.perf_counter() - started
+        if cursor.rowcount is not None and cursor.rowcount > 0:
+            cost.rows += cursor.rowcount
+        cost.shapes[statement_shape(statement)] += 1
+
+
+class DbCostMiddleware:
+    def __init__(self, app, expose_headers: bool = DB_COST_HEADERS, repeat_threshold: int = DB_REPEAT_WARN_THRESHOLD):
+        self.app = app
+        self.expose_headers = expose_headers
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cost = DbCost()
+        token = _cost.set(cost)
+
+        async def send_with_cost(message):
+            if message["type"] == "http.response.start" and self.expose_headers:
+                headers = list(message.get("headers", []))
+                headers += [
+                    (b"x-db-statements", str(cost.statements).encode()),
+                    (b"x-db-time-ms", f"{cost.seconds * 1000:.1f}".encode()),
+                    (b"x-db-rows", str(cost.rows).encode()),
+                    (b"server-timing", f'db;dur={cost.seconds * 1000:.1f};desc="{cost.statements} statements"'.encode()),
+                ]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cost)
+        finally:
+            _cost.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            db_statements.observe(cost.statements, route=route)
+            db_seconds.observe(cost.seconds, route=route)
+            db_rows.observe(cost.rows, route=route)
+            repeated = [(shape, n) for shape, n in cost.shapes.items() if n > self.repeat_threshold]
+            if repeated:
+                db_repeated.inc(route=route)
+                for shape, n in repeated:
+                    logger.warning("Possible N+1: %s %s ran the same statement %d times: %s",
+                                   scope.get("method"), route, n, shape[:500])
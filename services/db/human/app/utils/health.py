@@ -0,0 +1,81 @@
+import time
+import bisect
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+import sqlalchemy
+
+logger = logging.getLogger(__name__)
+
+# Background database health check for GET /status.
+#
+# The probe runs every HEALTH_PROBE_INTERVAL seconds on its own pooled
+# connection (never the adapter's shared session) and GET /status serves the
+# last result from memory. A result older than three intervals counts as an
+# error, since it means the prober has stopped.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class DatabaseHealthProber:
+    def __init__(self, engine, interval: float = 5.0, timeout: float = 2.0):
+        self.engine = engine
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = interval * 3 + timeout
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.failures = 0
+        self.result = {"status": "error", "detail": "not checked yet", "latency_ms": None, "checked_at": None}
+        self._checked_ts = None
+
+    def _ping(self) -> None:
+        with self.engine.connect() as conn:
+            conn.execute(sqlalchemy.text("SELECT 1"))
+
+    async def probe(self) -> dict:
+        started = time.perf_counter()
+        detail = None
+        try:
+            await asyncio.wait_for(asyncio.to_thread(self._ping), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            detail = f"timed out after {self.timeout}s"
+        except Exception as e:
+            detail = str(e) or type(e).__name__
+        elapsed = time.perf_counter() - started
+
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+        if detail is not None:
+            self.failures += 1
+            if self.result["status"] == "ok":
+                logger.warning(f"Database health probe failing: {detail}")
+        self.result = {
+            "status": "ok" if detail is None else "error",
+            "detail": detail,
+            "latency_ms": round(elapsed * 1000, 2),
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self._checked_ts = time.monotonic()
+        return self.result
+
+    async def run(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval)
+
+    def histogram(self) -> dict:
+        """Cumulative probe counts per latency bucket (seconds), Prometheus style."""
+        cumulative, buckets = 0, {}
+        for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), self.bucket_counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return buckets
+
+    def snapshot(self) -> dict:
+        component = dict(self.result)
+        if self._checked_ts is not None and time.monotonic() - self._checked_ts > self.stale_after:
+            component["status"] = "error"
+            component["detail"] = f"stale: last checked {int(time.monotonic() - self._checked_ts)}s ago"
+        component["failures"] = self.failures
+        component["latency_buckets"] = self.histogram()
+        return component
@@ -0,0 +1,306 @@
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Iterator, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import event, Engine
+
+logger = logging.getLogger(__name__)
+
+# Distributed tracing with W3C trace context.
+#
+# TraceMiddleware opens a server span per request, continuing the web BFF's
+# trace from the `traceparent` header. SQL statements (instrument_engine) are
+# recorded as client spans beneath it.
+# Sampling follows the caller's trace flags; requests without a traceparent are
+# sampled at TRACE_SAMPLE_RATE.
+#
+# Finished spans are queued in memory and exported every TRACE_EXPORT_INTERVAL
+# seconds, off the request path:
+#   TRACE_EXPORTER=file  one JSON span per line in TRACE_FILE, picked up by the
+#                        Loki stack (services/logging, job "traces")
+#   TRACE_EXPORTER=otlp  OTLP/HTTP JSON to TRACE_OTLP_ENDPOINT (any collector)
+#   TRACE_EXPORTER=none  tracing headers only
+# The queue holds at most TRACE_MAX_QUEUE spans; the oldest are dropped first.
+
+SERVICE_NAME = "human"
+_dev = os.getenv("ENV", "").lower() == "dev"
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "file" if _dev else "none").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", f"/app/logs/traces_db_{SERVICE_NAME}.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://otel-collector:4318/v1/traces")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0" if _dev else "0.1"))
+TRACE_EXPORT_INTERVAL = float(os.getenv("TRACE_EXPORT_INTERVAL", "5"))
+TRACE_MAX_QUEUE = int(os.getenv("TRACE_MAX_QUEUE", "10000"))
+MAX_STATEMENT_LENGTH = 2000
+
+TRACEPARENT = "traceparent"
+# OTLP SpanKind values
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+_KIND_NAMES = {INTERNAL: "internal", SERVER: "server", CLIENT: "client"}
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_finished: Deque["Span"] = deque(maxlen=TRACE_MAX_QUEUE)
+
+
+class Span:
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "sampled", "attributes", "status", "status_message", "start_ns", "end_ns")
+
+    def __init__(self, name: str, kind: int, trace_id: str, parent_id: Optional[str], sampled: bool, attributes: Optional[dict] = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_UNSET
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    def end(self) -> None:
+        if self.end_ns:
+            return
+        self.end_ns = time.time_ns()
+        if self.sampled and TRACE_EXPORTER != "none":
+            _finished.append(self)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_record(self) -> dict:
+        return {
+            "ts": self.start_ns,
+            "service": SERVICE_NAME,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": _KIND_NAMES[self.kind],
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": "error" if self.status == STATUS_ERROR else "ok",
+            "attributes": self.attributes,
+        }
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status, "message": self.status_message},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, parent span id, sampled) from a traceparent header, or None if malformed."""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or parts[0] == "ff":
+        return None
+    try:
+        flags = int(parts[3][:2], 16)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current.get()
+    return span.trace_id if span is not None else None
+
+
+def start_span(name: str, kind: int = INTERNAL, attributes: Optional[dict] = None, remote_parent: Optional[Tuple[str, str, bool]] = None) -> Span:
+    """A new span under the current one (or `remote_parent`); the caller must end() it."""
+    parent = _current.get()
+    if remote_parent is not None:
+        trace_id, parent_id, sampled = remote_parent
+    elif parent is not None:
+        trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+    else:
+        trace_id, parent_id, sampled = os.urandom(16).hex(), None, random.random() < TRACE_SAMPLE_RATE
+    return Span(name, kind, trace_id, parent_id, sampled, attributes)
+
+
+@contextmanager
+def span(name: str, kind: int = INTERNAL, attributes: Optional[dict] = None) -> Iterator[Span]:
+    """Run the block in a child span of the current one."""
+    current = start_span(name, kind, attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set_error(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current.reset(token)
+        current.end()
+
+
+def inject(headers) -> None:
+    """Add the current span's traceparent to outgoing headers."""
+    current = _current.get()
+    if current is not None:
+        headers[TRACEPARENT] = current.traceparent
+
+
+class TraceMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        remote_parent = None
+        for key, value in scope.get("headers", []):
+            if key == b"traceparent":
+                remote_parent = parse_traceparent(value.decode("latin-1"))
+                break
+        method = scope.get("method", "")
+        server_span = start_span(method, SERVER, {
+            "http.request.method": method,
+            "url.path": scope.get("path", ""),
+        }, remote_parent=remote_parent)
+        token = _current.set(server_span)
+
+        async def traced_send(message):
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                server_span.set_attribute("http.response.status_code", status)
+                if status >= 500:
+                    server_span.set_error(f"HTTP {status}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, traced_send)
+        except BaseException as e:
+            server_span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            route = scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                server_span.name = f"{method} {route.path}"
+                server_span.set_attribute("http.route", route.path)
+            _current.reset(token)
+            server_span.end()
+
+
+def instrument_engine(engine: Engine, system: str = "postgresql") -> None:
+    """Record every SQL statement on `engine` as a client span of the current request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is None or context is None:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+        context._trace_span = start_span(f"{operation} {system}", CLIENT, {
+            "db.system": system,
+            "db.statement": statement[:MAX_STATEMENT_LENGTH],
+        })
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        statement_span = getattr(context, "_trace_span", None)
+        if statement_span is not None:
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                statement_span.set_attribute("db.rows", cursor.rowcount)
+            statement_span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        statement_span = getattr(exception_context.execution_context, "_trace_span", None)
+        if statement_span is not None:
+            statement_span.set_error(f"{type(exception_context.original_exception).__name__}: {exception_context.original_exception}")
+            statement_span.end()
+
+
+def _drain() -> List[Span]:
+    spans = []
+    while _finished:
+        spans.append(_finished.popleft())
+    return spans
+
+
+def _write_file(spans: List[Span]) -> None:
+    os.makedirs(os.path.dirname(TRACE_FILE) or ".", exist_ok=True)
+    with open(TRACE_FILE, "a", encoding="utf-8") as f:
+        for finished in spans:
+            f.write(json.dumps(finished.to_record(), default=str) + "\n")
+
+
+def _otlp_payload(spans: List[Span]) -> dict:
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": "ergolux.tracing"}, "spans": [s.to_otlp() for s in spans]}],
+        }]
+    }
+
+
+async def flush(client: Optional[httpx.AsyncClient] = None) -> None:
+    spans = _drain()
+    if not spans:
+        return
+    try:
+        if TRACE_EXPORTER == "file":
+            await asyncio.to_thread(_write_file, spans)
+        elif TRACE_EXPORTER == "otlp" and client is not None:
+            response = await client.post(TRACE_OTLP_ENDPOINT, json=_otlp_payload(spans))
+            response.raise_for_status()
+    except Exception as e:
+        logger.warning("Dropped %d spans, export failed: %s", len(spans), e)
+
+
+async def run_exporter() -> None:
+    """Export finished spans every TRACE_EXPORT_INTERVAL seconds; flushes once more when cancelled."""
+    if TRACE_EXPORTER == "none":
+        return
+    async with httpx.AsyncClient(timeout=5) as client:
+        try:
+            while True:
+                await asyncio.sleep(TRACE_EXPORT_INTERVAL)
+                await flush(client)
+        finally:
+            await flush(client)
@@ -3,6 +3,10 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from app.utils.config import Config
+from app.utils.deadline import install_statement_timeout
+from app.utils.tracing import instrument_engine
+from app.utils.db_cost import install_db_cost
+from app.utils.slow_query import install_slow_query_log
 
 config = Config()
 
@@ -13,4 +17,8 @@ DATABASE_URL = (
 )
 
 engine = create_engine(DATABASE_URL)
+install_statement_timeout(engine)
+instrument_engine(engine)
+install_db_cost(engine)
+install_slow_query_log(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
@@ -1,3 +1,4 @@
+from typing import List
 from uuid import UUID
 from app.schemas.location import LocationResponse
 
@@ -10,3 +11,6 @@ class GetLocation:
         if item is None:
             return None
         return LocationResponse.from_orm(item)
+
+    def execute_many(self, item_ids: List[UUID]) -> List[LocationResponse]:
+        return [LocationResponse.from_orm(item) for item in self.relational_db.get_by_ids(item_ids)]
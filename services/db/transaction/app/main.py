@@ -1,7 +1,9 @@
 import logging
 import os
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -12,6 +14,13 @@ from app.interfaces.relationaldb.postgres_adapter import PostGresAdapter
 from app.models.transaction import Transaction
 from app.models.base import Base
 from app.dev.dev_seed import seed_transaction
+from app.utils.health import DatabaseHealthProber
+from app.utils.deadline import DeadlineMiddleware, DeadlineExceeded
+from app.utils.tracing import TraceMiddleware, run_exporter
+from app.utils.profiling import router as profiling_router
+from app.utils.db_cost import DbCostMiddleware
+from app.utils.metrics import render_metrics
+from app.utils.slow_query import router as slow_query_router
 
 # ---- Logging ----
 logging.basicConfig(
@@ -60,12 +69,42 @@ init_transaction_table(relational_db)
 
 logger.info("Initialized PostGresAdapter for 'transaction'")
 
-app = FastAPI()
+health_prober = DatabaseHealthProber(
+    relational_db.db.get_bind(),
+    interval=float(os.getenv("HEALTH_PROBE_INTERVAL", "5")),
+    timeout=float(os.getenv("HEALTH_PROBE_TIMEOUT", "2")),
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await health_prober.probe()
+    health_task = asyncio.create_task(health_prober.run())
+    trace_task = asyncio.create_task(run_exporter())
+    yield
+    for task in (health_task, trace_task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+app = FastAPI(lifespan=lifespan)
 logger.info("FastAPI app instance created")
 
 # ---- Add SQLAlchemy rollback middleware ----
 app.add_middleware(SQLAlchemySessionRollbackMiddleware, db_adapter=relational_db)
 
+# ---- Per-request SQL statement count, time and rows (X-DB-* headers in dev) ----
+app.add_middleware(DbCostMiddleware)
+
+# ---- Honor the caller's X-Request-Timeout-Ms ----
+app.add_middleware(DeadlineMiddleware)
+
+# ---- Continue the caller's trace (outermost, so deadline 504s are traced too) ----
+app.add_middleware(TraceMiddleware)
+
 
 # ---- Exception Handlers ----
 
@@ -80,6 +119,11 @@ async def integrity_error_handler(request: Request, exc: IntegrityError):
     detail = str(exc.orig).split("DETAIL:")[-1].strip() if "DETAIL:" in str(exc.orig) else "Data integrity error occurred."
     return JSONResponse(status_code=400, content={"error": f"Data conflict: {detail}"})
 
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    logger.warning(f"Deadline exceeded | Path: {request.url.path}")
+    return JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     logger.warning(f"Validation error at {request.url.path}: {exc.errors()}")
@@ -94,6 +138,24 @@ async def unhandled_exception_handler(request: Request, exc: Exception):
     return JSONResponse(status_code=500, content={"error": "An unexpected error occurred. Please try again or contact support."})
 
 
+# ---- Status ----
+
+@app.get("/status")
+async def status_check():
+    """Latest background database probe; no query runs on this request."""
+    database = health_prober.snapshot()
+    return JSONResponse(
+        status_code=200 if database["status"] == "ok" else 503,
+        content={"service": "transaction", "database": database},
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text format; values are per worker process."""
+    return render_metrics()
+
+
 # ---- Router Mount ----
 
 app.include_router(
@@ -102,6 +164,10 @@ app.include_router(
 )
 logger.info("Router mounted with tag 'transaction' and no prefix")
 
+# Disabled unless DEBUG_PROFILE_TOKEN is set
+app.include_router(profiling_router)
+app.include_router(slow_query_router)
+
 
 # ---- Dev Init Hook ----
 
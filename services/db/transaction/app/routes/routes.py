@@ -15,6 +15,7 @@ from app.use_cases.update_transaction import UpdateTransaction
 from app.use_cases.get_transaction import GetTransaction
 from app.use_cases.delete_transaction import DeleteTransaction
 from app.use_cases.search_transaction import SearchTransaction
+from app.utils.deadline import DeadlineExceeded
 
 logger = logging.getLogger(__name__)
 
@@ -44,10 +45,26 @@ def get_transaction_router(relational_db):
                 "offset": offset,
                 "total": total
             }
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.exception(f"Exception during search for transactions: {e}")
             raise HTTPException(status_code=500, detail="Internal server error during search")
 
+    @router.get("/batch", response_model=List[TransactionResponse])
+    def get_transaction_batch(ids: str = Query(..., description="Comma-separated ids, at most 100")):
+        """
+        Fetch several transactions in one call. Unknown ids are left out of the result.
+        """
+        try:
+            item_ids = list(dict.fromkeys(UUID(i.strip()) for i in ids.split(",") if i.strip()))
+        except ValueError:
+            raise HTTPException(status_code=422, detail="ids must be a comma-separated list of UUIDs")
+        if len(item_ids) > 100:
+            raise HTTPException(status_code=422, detail="At most 100 ids per batch")
+        logger.info(f"Fetching {len(item_ids)} transactions by id")
+        return GetTransaction(relational_db).execute_many(item_ids)
+
     @router.get("/{item_id}", response_model=TransactionResponse)
     def get_transaction(item_id: UUID):
         logger.info(f"Fetching transaction with id={item_id}")
@@ -81,6 +98,8 @@ def get_transaction_router(relational_db):
                 raise HTTPException(status_code=400, detail=detail)
             logger.error(f"Integrity error during create: {str(e.orig)}")
             raise HTTPException(status_code=400, detail=str(e.orig).split("\n")[0])
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.exception(f"Exception during create for transaction: {e}")
             raise HTTPException(status_code=500, detail="Internal server error during create")
@@ -105,6 +124,8 @@ def get_transaction_router(relational_db):
                 raise HTTPException(status_code=400, detail=detail)
             logger.error(f"Integrity error during update: {str(e.orig)}")
             raise HTTPException(status_code=400, detail=str(e.orig).split("\n")[0])
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.exception(f"Exception during update for transaction with id={item_id}: {e}")
             raise HTTPException(status_code=500, detail="Internal server error during update")
@@ -123,6 +144,8 @@ def get_transaction_router(relational_db):
                 raise HTTPException(status_code=404, detail="Transaction not found")
             logger.info(f"Deleted transaction with id={item_id}")
             return {"detail": "Transaction deleted"}
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.exception(f"Exception during delete for transaction with id={item_id}: {e}")
             raise HTTPException(status_code=500, detail="Internal server error during delete")
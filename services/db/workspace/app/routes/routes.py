@@ -15,6 +15,7 @@ from app.use_cases.update_workspace import UpdateWorkspace
 from app.use_cases.get_workspace import GetWorkspace
 from app.use_cases.delete_workspace import DeleteWorkspace
 from app.use_cases.search_workspace import SearchWorkspace
+from app.utils.deadline import DeadlineExceeded
 
 logger = logging.getLogger(__name__)
 
@@ -44,10 +45,26 @@ def get_workspace_router(relational_db):
                 "offset": offset,
                 "total": total
             }
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.exception(f"Exception during search for workspaces: {e}")
             raise HTTPException(status_code=500, detail="Internal server error during search")
 
+    @router.get("/batch", response_model=List[WorkspaceResponse])
+    def get_workspace_batch(ids: str = Query(..., description="Comma-separated ids, at most 100")):
+        """
+        Fetch several workspaces in one call. Unknown ids are left out of the result.
+        """
+        try:
+            item_ids = list(dict.fromkeys(int(i) for i in ids.split(",") if i.strip()))
+        except ValueError:
+            raise HTTPException(status_code=422, detail="ids must be a comma-separated list of integers")
+        if len(item_ids) > 100:
+            raise HTTPException(status_code=422, detail="At most 100 ids per batch")
+        logger.info(f"Fetching {len(item_ids)} workspaces by id")
+        return GetWorkspace(relational_db).execute_many(item_ids)
+
     @router.get("/{item_id}", response_model=WorkspaceResponse)
     def get_workspace(item_id: int):
         logger.info(f"Fetching workspace with id={item_id}")
@@ -81,6 +98,8 @@ def get_workspace_router(relational_db):
                 raise HTTPException(status_code=400, detail=detail)
             logger.error(f"Integrity error during create: {str(e.orig)}")
             raise HTTPException(status_code=400, detail=str(e.orig).split("\n")[0])
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.exception(f"Exception during create for workspace: {e}")
             raise HTTPException(status_code=500, detail="Internal server error during create")
@@ -105,6 +124,8 @@ def get_workspace_router(relational_db):
                 raise HTTPException(status_code=400, detail=detail)
             logger.error(f"Integrity error during update: {str(e.orig)}")
             raise HTTPException(status_code=400, detail=str(e.orig).split("\n")[0])
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.exception(f"Exception during update for workspace with id={item_id}: {e}")
             raise HTTPException(status_code=500, detail="Internal server error during update")
@@ -123,6 +144,8 @@ def get_workspace_router(relational_db):
                 raise HTTPException(status_code=404, detail="Workspace not found")
             logger.info(f"Deleted workspace with id={item_id}")
             return {"detail": "Workspace deleted"}
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.exception(f"Exception during delete for workspace with id={item_id}: {e}")
             raise HTTPException(status_code=500, detail="Internal server error during delete")
@@ -0,0 +1,189 @@
+import os
+import sys
+import hmac
+import time
+import asyncio
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+logger = logging.getLogger(__name__)
+
+# On-demand profiling of a live worker (/debug/profile).
+#
+# CPU: a background thread samples every thread's Python stack each
+# interval_ms for the requested seconds. The result is returned in the
+# collapsed format ("thread;outer;...;inner count" per line), which
+# flamegraph.pl, speedscope and inferno read directly. Threads waiting in
+# select/wait/queue get are skipped unless idle=true, so the flame graph shows
+# where CPU goes. The sampler thread exists only while a profile is being
+# taken.
+#
+# Heap: POST /heap/start turns tracemalloc on and takes a baseline snapshot.
+# Each GET /heap takes a snapshot and returns the top allocation sites with
+# their growth since the previous snapshot (or the baseline). POST /heap/stop
+# turns tracemalloc off again, because tracing slows every allocation.
+#
+# Disabled (404) unless DEBUG_PROFILE_TOKEN is set; callers must send it in
+# X-Debug-Token. Profiles are per worker process: the one serving the call.
+
+DEBUG_PROFILE_TOKEN = os.getenv("DEBUG_PROFILE_TOKEN", "")
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+
+IDLE_FILES = ("selectors.py", "threading.py", "queue.py")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    parts = code.co_filename.replace("\\", "/").rsplit("/", 2)
+    return f"{code.co_name} ({'/'.join(parts[-2:])}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the Python stacks of all other threads at a fixed interval."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def sample(self, seconds: float, interval: float, include_idle: bool = False) -> Dict[str, int]:
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A CPU profile is already running")
+        try:
+            own = threading.get_ident()
+            counts: Counter = Counter()
+            names = {}
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own:
+                        continue
+                    if not include_idle and os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_label(frame))
+                        frame = frame.f_back
+                    if thread_id not in names:
+                        names = {t.ident: t.name for t in threading.enumerate()}
+                    stack.append(names.get(thread_id, str(thread_id)).replace(";", ":"))
+                    counts[";".join(reversed(stack))] += 1
+                time.sleep(interval)
+            return dict(counts)
+        finally:
+            self._lock.release()
+
+
+class HeapTracker:
+    def __init__(self):
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.previous: Optional[tracemalloc.Snapshot] = None
+
+    @staticmethod
+    def _take() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+
+    def start(self, frames: int) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.baseline = self.previous = self._take()
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self.baseline = self.previous = None
+
+    def diff(self, compare_to: str, group_by: str, limit: int) -> dict:
+        if not tracemalloc.is_tracing() or self.baseline is None:
+            raise RuntimeError("Heap tracing is off; POST /debug/profile/heap/start first")
+        snapshot = self._take()
+        reference = self.baseline if compare_to == "baseline" else self.previous
+        stats = snapshot.compare_to(reference, group_by)
+        self.previous = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "compared_to": compare_to,
+            "top": [
+                {
+                    "where": [str(frame) for frame in stat.traceback],
+                    "size_bytes": stat.size,
+                    "size_diff_bytes": stat.size_diff,
+                    "count": stat.count,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in stats[:limit]
+            ],
+        }
+
+
+cpu_profiler = SamplingProfiler()
+heap_tracker = HeapTracker()
+
+
+def require_debug_token(x_debug_token: Optional[str] = Header(None)):
+    if not DEBUG_PROFILE_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_debug_token or not hmac.compare_digest(x_debug_token, DEBUG_PROFILE_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+
+
+router = APIRouter(prefix="/debug/profile", tags=["Debug"], dependencies=[Depends(require_debug_token)], include_in_schema=False)
+
+
+@router.get("/cpu", response_class=PlainTextResponse)
+async def cpu_profile(
+    seconds: float = Query(10, gt=0),
+    interval_ms: float = Query(10, ge=1, le=1000),
+    idle: bool = Query(False, description="Include threads that are only waiting"),
+):
+    """Sampled CPU profile of this worker in collapsed-stack (flame graph) format."""
+    if seconds > PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=422, detail=f"seconds must be at most {PROFILE_MAX_SECONDS:g}")
+    if cpu_profiler.busy:
+        raise HTTPException(status_code=409, detail="A CPU profile is already running")
+    logger.info("CPU profile started for %.1fs at %.0f ms", seconds, interval_ms)
+    try:
+        counts = await asyncio.to_thread(cpu_profiler.sample, seconds, interval_ms / 1000, idle)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(counts.items()))
+
+
+@router.post("/heap/start")
+async def heap_start(frames: int = Query(10, ge=1, le=100)):
+    await asyncio.to_thread(heap_tracker.start, frames)
+    logger.info("Heap tracing started (%d frames)", frames)
+    return {"tracing": True, "frames": frames}
+
+
+@router.get("/heap")
+async def heap_diff(
+    compare_to: str = Query("previous", pattern="^(previous|baseline)$"),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(25, ge=1, le=500),
+):
+    """Top allocation sites and their growth since the previous snapshot or the baseline."""
+    try:
+        return await asyncio.to_thread(heap_tracker.diff, compare_to, group_by, limit)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/heap/stop")
+async def heap_stop():
+    heap_tracker.stop()
+    logger.info("Heap tracing stopped")
+    return {"tracing": False}
@@ -15,6 +15,7 @@ from app.use_cases.update_workspace_invite import UpdateWorkspace_invite
 from app.use_cases.get_workspace_invite import GetWorkspace_invite
 from app.use_cases.delete_workspace_invite import DeleteWorkspace_invite
 from app.use_cases.search_workspace_invite import SearchWorkspace_invite
+from app.utils.deadline import DeadlineExceeded
 
 logger = logging.getLogger(__name__)
 
@@ -44,10 +45,26 @@ def get_workspace_invite_router(relational_db):
                 "offset": offset,
                 "total": total
             }
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.exception(f"Exception during search for workspace_invites: {e}")
             raise HTTPException(status_code=500, detail="Internal server error during search")
 
+    @router.get("/batch", response_model=List[Workspace_inviteResponse])
+    def get_workspace_invite_batch(ids: str = Query(..., description="Comma-separated ids, at most 100")):
+        """
+        Fetch several workspace_invites in one call. Unknown ids are left out of the result.
+        """
+        try:
+            item_ids = list(dict.fromkeys(UUID(i.strip()) for i in ids.split(",") if i.strip()))
+        except ValueError:
+            raise HTTPException(status_code=422, detail="ids must be a comma-separated list of UUIDs")
+        if len(item_ids) > 100:
+            raise HTTPException(status_code=422, detail="At most 100 ids per batch")
+        logger.info(f"Fetching {len(item_ids)} workspace_invites by id")
+        return GetWorkspace_invite(relational_db).execute_many(item_ids)
+
     @router.get("/{item_id}", response_model=Workspace_inviteResponse)
     def get_workspace_invite(item_id: UUID):
         logger.info(f"Fetching workspace_invite with id={item_id}")
@@ -81,6 +98,8 @@ def get_workspace_invite_router(relational_db):
                 raise HTTPException(status_code=400, detail=detail)
             logger.error(f"Integrity error during create: {str(e.orig)}")
             raise HTTPException(status_code=400, detail=str(e.orig).split("\n")[0])
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.exception(f"Exception during create for workspace_invite: {e}")
             raise HTTPException(status_code=500, detail="Internal server error during create")
@@ -105,6 +124,8 @@ def get_workspace_invite_router(relational_db):
                 raise HTTPException(status_code=400, detail=detail)
             logger.error(f"Integrity error during update: {str(e.orig)}")
             raise HTTPException(status_code=400, detail=str(e.orig).split("\n")[0])
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.exception(f"Exception during update for workspace_invite with id={item_id}: {e}")
             raise HTTPException(status_code=500, detail="Internal server error during update")
@@ -123,6 +144,8 @@ def get_workspace_invite_router(relational_db):
                 raise HTTPException(status_code=404, detail="Workspace_invite not found")
             logger.info(f"Deleted workspace_invite with id={item_id}")
             return {"detail": "Workspace_invite deleted"}
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.exception(f"Exception during delete for workspace_invite with id={item_id}: {e}")
             raise HTTPException(status_code=500, detail="Internal server error during delete")
@@ -1,3 +1,4 @@
+from typing import List
 from uuid import UUID
 from app.schemas.workspace_invite import Workspace_inviteResponse
 
@@ -10,3 +11,6 @@ class GetWorkspace_invite:
         if item is None:
             return None
         return Workspace_inviteResponse.from_orm(item)
+
+    def execute_many(self, item_ids: List[UUID]) -> List[Workspace_inviteResponse]:
+        return [Workspace_inviteResponse.from_orm(item) for item in self.relational_db.get_by_ids(item_ids)]
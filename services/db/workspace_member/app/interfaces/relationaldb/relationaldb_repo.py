@@ -10,6 +10,10 @@ class RelationalDBRepo(ABC):
     def get_by_id(self, item_id: int) -> Any:
         pass
 
+    @abstractmethod
+    def get_by_ids(self, item_ids: List[int]) -> List[Any]:
+        pass
+
     @abstractmethod
     def create(self, data: Any) -> Any:
         pass
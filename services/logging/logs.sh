@@ -13,12 +13,14 @@ print_usage() {
     echo "  query [service]    - Show recent logs (service: web_bff, account_setup, auth, db, or all)"
     echo "  errors             - Show only error/warning logs"
     echo "  stats              - Show log statistics"
+    echo "  trace <trace_id>   - Show the spans and log lines of one trace"
     echo ""
     echo "Examples:"
     echo "  $0 tail            - Tail all services"
     echo "  $0 tail web_bff    - Tail only web_bff service"
     echo "  $0 query account_setup - Show recent account_setup logs"
     echo "  $0 errors          - Show error logs only"
+    echo "  $0 trace 4bf92f3577b34da6a3ce929d0e0e4736 - Everything recorded for one request"
 }
 
 format_output() {
@@ -157,6 +159,22 @@ case "$1" in
             stats '{job=~".+"}' --since=1h
         ;;
         
+    "trace")
+        if [ -z "$2" ]; then
+            echo "Missing trace id"
+            print_usage
+            exit 1
+        fi
+
+        echo "🧵 Spans and logs for trace: $2"
+        echo "---"
+
+        docker run --rm --network=service_network \
+            grafana/logcli:latest \
+            --addr="http://ergolux_loki:3100" \
+            query --limit=500 --forward --since=24h "{job=~\".+\"} |= \"$2\""
+        ;;
+
     "")
         print_usage
         ;;
@@ -0,0 +1,78 @@
+import os
+import ipaddress
+from contextvars import ContextVar
+from typing import Optional
+
+import httpx
+
+# The caller's address, forwarded to upstreams.
+#
+# Upstreams see the BFF as the TCP peer of every request. Auth rate-limits per
+# client, so each upstream call carries the caller's address in
+# X-Forwarded-For (auth believes it only from its TRUSTED_PROXIES). If the BFF
+# itself runs behind a load balancer, list that in TRUSTED_PROXIES here
+# (comma-separated addresses or CIDRs) and the client is read from the
+# balancer's X-Forwarded-For, right to left, skipping trusted hops.
+
+FORWARDED_FOR = "X-Forwarded-For"
+TRUSTED_PROXIES = tuple(
+    ipaddress.ip_network(part.strip(), strict=False)
+    for part in os.getenv("TRUSTED_PROXIES", "").split(",")
+    if part.strip()
+)
+
+_client_ip: ContextVar[Optional[str]] = ContextVar("client_ip", default=None)
+
+
+def _address(value: str):
+    try:
+        return ipaddress.ip_address(value.strip())
+    except ValueError:
+        return None
+
+
+def resolve_client_ip(peer: Optional[str], forwarded_for: Optional[str], trusted=TRUSTED_PROXIES) -> Optional[str]:
+    peer_address = _address(peer) if peer else None
+    if peer_address is None or not any(peer_address in network for network in trusted):
+        return str(peer_address) if peer_address is not None else None
+    hops = [hop for hop in (forwarded_for or "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        address = _address(hop)
+        if address is None:
+            break
+        if not any(address in network for network in trusted):
+            return str(address)
+    return str(peer_address)
+
+
+def current_client_ip() -> Optional[str]:
+    return _client_ip.get()
+
+
+async def forward_client_ip(request: httpx.Request) -> None:
+    """httpx request hook: tell the upstream who the caller is."""
+    address = _client_ip.get()
+    if address:
+        request.headers[FORWARDED_FOR] = address
+
+
+class ClientIpMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        peer = scope["client"][0] if scope.get("client") else None
+        forwarded_for = None
+        for key, value in scope.get("headers", []):
+            if key == b"x-forwarded-for":
+                forwarded_for = value.decode("latin-1")
+                break
+        token = _client_ip.set(resolve_client_ip(peer, forwarded_for))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _client_ip.reset(token)
@@ -0,0 +1,153 @@
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+logger = logging.getLogger(__name__)
+
+# Declarative composition of upstream calls for BFF views.
+#
+# A View is a set of named Calls; each Call lists the calls it needs (`after`)
+# and receives their results through the ViewContext. Every call starts as soon
+# as its dependencies finish, so independent calls run concurrently and a view
+# takes as long as its slowest dependency chain rather than the sum of its
+# calls.
+#
+#   PROFILE_VIEW = View(
+#       "profile",
+#       user=Call(fetch_user, timeout=2),
+#       workspaces=Call(fetch_workspaces, after=("user",), required=False, fallback=[]),
+#       invites=Call(fetch_invites, after=("user",), required=False, fallback=[]),
+#   )
+#   result = await PROFILE_VIEW.resolve(request_scope(request), user_id=user_id)
+#
+# A required call that fails cancels the rest of the view and its exception is
+# re-raised as is (a timeout becomes a 504). An optional call that fails yields
+# its fallback and is listed in result.errors. Calls that hit the same upstream
+# resource can share one request through RequestScope.memo().
+
+
+class RequestScope:
+    """Per-request memo of in-flight and finished upstream calls."""
+
+    def __init__(self):
+        self._memo: Dict[Hashable, asyncio.Future] = {}
+
+    async def memo(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._memo.get(key)
+        if future is None:
+            future = self._memo[key] = asyncio.ensure_future(factory())
+        return await asyncio.shield(future)
+
+
+def request_scope(request: Request) -> RequestScope:
+    scope = getattr(request.state, "composition_scope", None)
+    if scope is None:
+        scope = request.state.composition_scope = RequestScope()
+    return scope
+
+
+@dataclass
+class Call:
+    fn: Callable[["ViewContext"], Awaitable[Any]]
+    after: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    required: bool = True
+    fallback: Any = None
+
+
+@dataclass
+class ViewContext:
+    inputs: Dict[str, Any]
+    results: Dict[str, Any]
+    scope: RequestScope
+
+    def __getitem__(self, name: str) -> Any:
+        return self.results[name]
+
+    async def memo(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        return await self.scope.memo(key, factory)
+
+
+@dataclass
+class ViewResult:
+    results: Dict[str, Any]
+    errors: Dict[str, str] = field(default_factory=dict)
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> Any:
+        return self.results[name]
+
+
+class View:
+    def __init__(self, name: str, **calls: Call):
+        self.name = name
+        self.calls = calls
+        self._check_graph()
+
+    def _check_graph(self) -> None:
+        for name, call in self.calls.items():
+            unknown = set(call.after) - set(self.calls)
+            if unknown:
+                raise ValueError(f"View {self.name}: {name} depends on unknown calls {sorted(unknown)}")
+        visiting, done = set(), set()
+
+        def visit(name, path):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"View {self.name}: dependency cycle {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dep in self.calls[name].after:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.calls:
+            visit(name, [])
+
+    async def resolve(self, scope: Optional[RequestScope] = None, **inputs) -> ViewResult:
+        started = time.perf_counter()
+        result = ViewResult(results={})
+        context = ViewContext(inputs=inputs, results=result.results, scope=scope or RequestScope())
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run(name: str, call: Call):
+            if call.after:
+                await asyncio.gather(*(tasks[dep] for dep in call.after))
+            call_started = time.perf_counter()
+            try:
+                if call.timeout is None:
+                    value = await call.fn(context)
+                else:
+                    value = await asyncio.wait_for(call.fn(context), timeout=call.timeout)
+            except Exception as e:
+                if call.required:
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise HTTPException(status_code=504, detail=f"Upstream call {self.name}.{name} timed out") from e
+                    raise
+                logger.warning("[WEB-BFF] View %s: optional call %s failed, using fallback: %s", self.name, name, str(e) or type(e).__name__)
+                result.errors[name] = str(e) or type(e).__name__
+                value = call.fallback
+            finally:
+                result.timings_ms[name] = round((time.perf_counter() - call_started) * 1000, 2)
+            result.results[name] = value
+
+        for name, call in self.calls.items():
+            tasks[name] = asyncio.ensure_future(run(name, call))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        logger.debug(
+            "[WEB-BFF] View %s resolved in %.1fms (calls: %s)",
+            self.name, (time.perf_counter() - started) * 1000, result.timings_ms
+        )
+        return result
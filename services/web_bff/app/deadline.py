@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# End-to-end request deadlines.
+#
+# Every request gets a deadline of REQUEST_TIMEOUT_MS from arrival, or sooner
+# if the caller sent a shorter X-Request-Timeout-Ms. The handler runs as a task
+# that is cancelled when the deadline passes (answered 504 if nothing has been
+# sent yet) or when the client disconnects, so in-flight upstream calls are
+# abandoned instead of running to completion. Once the response has started
+# only a disconnect stops it; streamed bodies are not cut short.
+#
+# Upstream calls carry the remaining budget in X-Request-Timeout-Ms, and their
+# httpx timeouts are shortened to fit it. The header holds a relative budget in
+# milliseconds rather than an absolute time, so hosts need not agree on the
+# clock; each hop measures from when it received the request. Auth and the
+# generated DB services honor it the same way and map it to Postgres
+# statement_timeout.
+
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+REQUEST_TIMEOUT_MS = float(os.getenv("REQUEST_TIMEOUT_MS", "15000"))
+
+# Long-running by design (profiling), so not bound by the request deadline
+EXEMPT_PATH_PREFIXES = ("/debug/",)
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline, or None outside a request."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def _requested_budget(scope) -> Optional[float]:
+    name = DEADLINE_HEADER.lower().encode("latin-1")
+    for key, value in scope.get("headers", []):
+        if key == name:
+            try:
+                return max(float(value) / 1000, 0.0)
+            except ValueError:
+                return None
+    return None
+
+
+async def propagate_deadline(request: httpx.Request) -> None:
+    """httpx request hook: forward the remaining budget and cap the call's timeouts by it."""
+    left = remaining()
+    if left is None:
+        return
+    if left <= 0:
+        raise httpx.TimeoutException("Request deadline exceeded", request=request)
+    request.headers[DEADLINE_HEADER] = str(int(left * 1000))
+    timeout = request.extensions.get("timeout")
+    if timeout:
+        request.extensions["timeout"] = {
+            key: left if value is None else min(value, left) for key, value in timeout.items()
+        }
+
+
+class DeadlineMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path", "").startswith(EXEMPT_PATH_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        budget = REQUEST_TIMEOUT_MS / 1000
+        requested = _requested_budget(scope)
+        if requested is not None:
+            budget = min(budget, requested)
+        token = _deadline.set(time.monotonic() + budget)
+
+        # Read the client's messages ourselves so a disconnect is seen while the
+        # handler is busy, and hand them on in order when it asks
+        messages: asyncio.Queue = asyncio.Queue()
+        disconnected = asyncio.Event()
+        response_started = False
+
+        async def pump():
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    return
+
+        async def queued_receive():
+            return await messages.get()
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        handler = asyncio.ensure_future(self.app(scope, queued_receive, tracked_send))
+        reader = asyncio.ensure_future(pump())
+        watcher = asyncio.ensure_future(disconnected.wait())
+        try:
+            timed_out = False
+            while not handler.done():
+                left = None if response_started else remaining()
+                if left is not None and left <= 0:
+                    timed_out = True
+                    break
+                await asyncio.wait({handler, watcher}, timeout=left, return_when=asyncio.FIRST_COMPLETED)
+                if watcher.done() and not handler.done():
+                    break
+
+            if handler.done():
+                handler.result()
+                return
+
+            handler.cancel()
+            try:
+                await handler
+            except asyncio.CancelledError:
+                pass
+            if timed_out:
+                logger.warning("[WEB-BFF] %s %s exceeded its %.0f ms deadline", scope.get("method"), scope.get("path"), budget * 1000)
+                if not response_started:
+                    await send({
+                        "type": "http.response.start",
+                        "status": 504,
+                        "headers": [(b"content-type", b"application/json")],
+                    })
+                    await send({"type": "http.response.body", "body": json.dumps({"detail": "Request deadline exceeded"}).encode()})
+            else:
+                logger.info("[WEB-BFF] Client disconnected, cancelled %s %s", scope.get("method"), scope.get("path"))
+        finally:
+            for task in (reader, watcher, handler):
+                task.cancel()
+            _deadline.reset(token)
@@ -0,0 +1,152 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+import httpx
+from fastapi import Request
+
+from app.upstreams import UPSTREAMS, upstream
+
+logger = logging.getLogger(__name__)
+
+# Request-scoped batching of per-id upstream reads (DataLoader style).
+#
+# Every load(id) made during the same event-loop tick is collected, deduped
+# and resolved by one batch call; results stay memoized for the rest of the
+# request. record_loader(request, service) fetches records through the
+# generated services' GET /batch?ids=... endpoint and falls back to one GET
+# /{id} per record (run concurrently) when the upstream predates that endpoint;
+# that is re-checked every NO_BATCH_RECHECK_SECONDS, so a 404 from a replica
+# mid-deploy does not turn batching off for good. Records are matched to the
+# requested ids in canonical form (UUIDs lower-case and hyphenated), and missing
+# records load as None.
+
+MAX_BATCH_SIZE = 100
+BATCH_PATH = "batch"
+NO_BATCH_RECHECK_SECONDS = float(os.getenv("NO_BATCH_RECHECK_SECONDS", "60"))
+
+BatchFn = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+# Upstreams found to have no batch endpoint, with when to try /batch again
+_no_batch_endpoint: Dict[str, float] = {}
+
+
+def canonical_id(value: Hashable) -> str:
+    """The form an upstream returns an id in: UUIDs lower-case and hyphenated."""
+    text = str(value).strip()
+    try:
+        return str(uuid.UUID(text))
+    except ValueError:
+        return text
+
+
+class DataLoader:
+    def __init__(self, batch_fn: BatchFn, max_batch_size: int = MAX_BATCH_SIZE):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+
+    def load(self, key: Hashable) -> "asyncio.Future":
+        future = self._futures.get(key)
+        if future is None or future.cancelled():
+            loop = asyncio.get_running_loop()
+            future = self._futures[key] = loop.create_future()
+            if not self._queue:
+                # Dispatch after every coroutine ready in this tick has queued its keys
+                loop.call_soon(self._dispatch)
+            self._queue.append(key)
+        return future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> List[Any]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self) -> None:
+        queue, self._queue = self._queue, []
+        for start in range(0, len(queue), self.max_batch_size):
+            keys = queue[start:start + self.max_batch_size]
+            task = asyncio.ensure_future(self._run_batch(keys))
+            futures = [self._futures[key] for key in keys]
+
+            def abandon(_, futures=futures, task=task):
+                # Every caller was cancelled (deadline or disconnect), so stop the upstream call too
+                if all(future.cancelled() for future in futures):
+                    task.cancel()
+
+            for future in futures:
+                future.add_done_callback(abandon)
+
+    async def _run_batch(self, keys: List[Hashable]) -> None:
+        try:
+            found = await self.batch_fn(keys)
+        except Exception as e:
+            for key in keys:
+                # Let a later load() retry instead of replaying the failure
+                future = self._futures.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key in keys:
+            future = self._futures[key]
+            if not future.done():
+                future.set_result(found.get(key))
+
+
+def _service_url(service: str) -> str:
+    return UPSTREAMS[service].rstrip("/")
+
+
+async def _fetch_one(service: str, item_id: str) -> Optional[dict]:
+    async with upstream(service) as client:
+        response = await client.get(f"{_service_url(service)}/{item_id}", extensions={"hedge": True})
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+
+def _lacks_batch_endpoint(response: httpx.Response) -> bool:
+    if response.status_code in (404, 405):
+        return True
+    # Older services route /batch to GET /{item_id} and reject "batch" as an id
+    if response.status_code == 422:
+        try:
+            return response.json().get("error") == "Validation error"
+        except ValueError:
+            return False
+    return False
+
+
+async def fetch_records(service: str, ids: List[Hashable]) -> Dict[Hashable, Any]:
+    """Fetch records by id from a generated DB service: one batch call, else one call per id."""
+    if _no_batch_endpoint.get(service, 0) <= time.monotonic():
+        async with upstream(service) as client:
+            response = await client.get(
+                f"{_service_url(service)}/{BATCH_PATH}",
+                params={"ids": ",".join(str(i) for i in ids)},
+                extensions={"hedge": True},
+            )
+        if not _lacks_batch_endpoint(response):
+            response.raise_for_status()
+            by_id = {canonical_id(record.get("id")): record for record in response.json()}
+            _no_batch_endpoint.pop(service, None)
+            return {i: by_id.get(canonical_id(i)) for i in ids}
+        logger.info("[WEB-BFF] %s has no batch endpoint; loading records one by one for %.0fs", service, NO_BATCH_RECHECK_SECONDS)
+        _no_batch_endpoint[service] = time.monotonic() + NO_BATCH_RECHECK_SECONDS
+
+    records = await asyncio.gather(*(_fetch_one(service, str(i)) for i in ids))
+    return dict(zip(ids, records))
+
+
+def record_loader(request: Request, service: str) -> DataLoader:
+    """The request's loader for records of `service`, created on first use."""
+    loaders = getattr(request.state, "record_loaders", None)
+    if loaders is None:
+        loaders = request.state.record_loaders = {}
+    loader = loaders.get(service)
+    if loader is None:
+        loader = loaders[service] = DataLoader(lambda ids: fetch_records(service, ids))
+    return loader
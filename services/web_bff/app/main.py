@@ -1,28 +1,41 @@
 import logging
+import logging.handlers
 import os
+import queue
+import asyncio
 from pathlib import Path
 
 # Configure logging with file output for log aggregation
 log_dir = Path("/app/logs")
 log_dir.mkdir(exist_ok=True)
 
+# Handlers run on a listener thread; request handlers only enqueue records
+log_formatter = logging.Formatter('%(asctime)s %(levelname)s:%(name)s:%(message)s%(trace_suffix)s', defaults={"trace_suffix": ""})
+file_handler = logging.FileHandler('/app/logs/web_bff.log')
+console_handler = logging.StreamHandler()  # Keep console output for development
+for handler in (file_handler, console_handler):
+    handler.setFormatter(log_formatter)
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+log_listener.start()
+
+# The trace id is read from the request's context, so tag records before they are queued
+from app.tracing import TraceIdLogFilter
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.addFilter(TraceIdLogFilter())
+
 logging.basicConfig(
     level=logging.DEBUG,
-    format='%(asctime)s %(levelname)s:%(name)s:%(message)s',
-    handlers=[
-        logging.FileHandler('/app/logs/web_bff.log'),
-        logging.StreamHandler()  # Keep console output for development
-    ]
+    handlers=[queue_handler]
 )
 
 logger = logging.getLogger(__name__)
 logger.info("Starting Web BFF service with file logging enabled")
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-import os
-from starlette.middleware.base import BaseHTTPMiddleware
+from contextlib import asynccontextmanager
 
 # from app.routes.views import router as views_router
 from app.routes.views import router as views_router
@@ -31,8 +44,34 @@ from app.routes.account_setup import router as account_setup_router
 from app.routes.user_setup import router as user_setup_router
 from app.routes.workspaces import router as workspaces_router
 from app.routes.dev import router as dev_router
+from app.profiling import router as profiling_router
+from app.upstreams import open_clients, close_clients, pool_stats
+from app.request_logging import RequestLoggingMiddleware
+from app.deadline import DeadlineMiddleware
+from app.client_ip import ClientIpMiddleware
+from app.tracing import TraceMiddleware, run_exporter
+from app.loop_monitor import LOOP_MONITOR, loop_monitor
+from app.metrics import render_metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await open_clients()
+    background = [asyncio.create_task(run_exporter())]
+    if LOOP_MONITOR:
+        background.append(asyncio.create_task(loop_monitor.run()))
+    yield
+    for task in background:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await close_clients()
+    log_listener.stop()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Open CORS and CSP policies for development
 if os.getenv("ENV", "dev").lower() == "dev":
@@ -65,88 +104,21 @@ if os.getenv("ENV", "dev").lower() == "dev":
         )
         return response
 
-class LogRawRequestMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        import time
-        import json
-        from fastapi.responses import JSONResponse
-        from starlette.responses import StreamingResponse
-        
-        # Log incoming request
-        body = await request.body()
-        start_time = time.time()
-        logging.info(f"RAW REQUEST: {request.method} {request.url} | Headers: {dict(request.headers)} | Body: {body!r}")
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Log response
-        process_time = time.time() - start_time
-        
-        # Capture response body for logging - this is tricky with FastAPI
-        response_body = "N/A"
-        original_response = response
-        
-        try:
-            # Check if it's a streaming response (which includes JSONResponse)
-            body_iterator = getattr(response, 'body_iterator', None)
-            if body_iterator is not None:
-                # Collect all chunks from the stream
-                body_chunks = []
-                async for chunk in body_iterator:
-                    if chunk:  # Only add non-empty chunks
-                        body_chunks.append(chunk)
-                
-                if body_chunks:
-                    # Reconstruct the full body
-                    response_body_bytes = b''.join(body_chunks)
-                    response_body = response_body_bytes.decode('utf-8', errors='ignore')
-                    
-                    # Create a new response with the same content to avoid consuming the original
-                    from starlette.responses import Response
-                    response = Response(
-                        content=response_body_bytes,
-                        status_code=response.status_code,
-                        headers=dict(response.headers),
-                        media_type=getattr(response, 'media_type', 'application/json')
-                    )
-            elif hasattr(response, 'body') and response.body is not None:
-                # For non-streaming responses
-                response_body_attr = getattr(response, 'body', None)
-                if isinstance(response_body_attr, bytes):
-                    response_body = response_body_attr.decode('utf-8', errors='ignore')
-                elif isinstance(response_body_attr, str):
-                    response_body = response_body_attr
-                else:
-                    response_body = str(response_body_attr)
-                    
-        except Exception as e:
-            # If anything goes wrong, use the original response and log the error
-            response = original_response
-            response_body = f"[Error capturing response: {str(e)}]"
-        
-        # Try to format JSON for better readability
-        try:
-            if response_body and response_body not in ["N/A"] and isinstance(response_body, str):
-                stripped = response_body.strip()
-                if len(stripped) > 0 and (stripped[0] == '{' or stripped[0] == '['):
-                    parsed_json = json.loads(response_body)
-                    response_body = json.dumps(parsed_json, separators=(',', ':'))
-        except (json.JSONDecodeError, TypeError):
-            # Not JSON or can't parse, keep as is
-            pass
-        
-        logging.info(f"RAW RESPONSE: {request.method} {request.url} | Status: {response.status_code} | Time: {process_time:.3f}s | Headers: {dict(response.headers)} | Body: {response_body}")
-        
-        return response
-
-app.add_middleware(LogRawRequestMiddleware)
+# Innermost, so every upstream call made by a handler forwards the caller's address
+app.add_middleware(ClientIpMiddleware)
+# Added before the logger so deadline 504s and cancellations are logged too
+app.add_middleware(DeadlineMiddleware)
+app.add_middleware(RequestLoggingMiddleware)
+# Outermost, so the server span covers logging, deadlines and every 504
+app.add_middleware(TraceMiddleware)
 
 app.include_router(views_router)
 app.include_router(auth_router)  
 app.include_router(account_setup_router, prefix="/account-setup")
 app.include_router(user_setup_router, prefix="/user-setup")
 app.include_router(workspaces_router, prefix="/workspaces")
+# Disabled unless DEBUG_PROFILE_TOKEN is set
+app.include_router(profiling_router)
 
 # Only include dev router in development mode
 if os.getenv("ENV", "dev").lower() == "dev":
@@ -155,3 +127,13 @@ if os.getenv("ENV", "dev").lower() == "dev":
 @app.get("/health", tags=["Health"])
 async def health_check():
     return {"status": "web-bff ok"}
+
+@app.get("/health/upstreams", tags=["Health"])
+async def upstream_pools():
+    """Connection pool state of the shared upstream clients."""
+    return pool_stats()
+
+@app.get("/metrics", response_class=PlainTextResponse, tags=["Health"])
+async def metrics():
+    """Prometheus text exposition of this worker's in-process metrics."""
+    return render_metrics()
@@ -0,0 +1,119 @@
+import os
+import re
+import time
+import random
+import logging
+
+logger = logging.getLogger("web_bff.requests")
+
+# Request/response logging as a pure ASGI middleware.
+#
+# Messages pass through untouched; the middleware only copies the first
+# LOG_BODY_MAX_BYTES of each body as it streams by, so responses are never
+# buffered and streaming endpoints keep streaming. Once the response has been
+# sent, one line is logged if the request is sampled: every response with a
+# status >= LOG_SAMPLE_MIN_STATUS, plus LOG_SAMPLE_RATE of the rest. Secret
+# headers and secret-looking body fields are redacted before formatting.
+
+_dev = os.getenv("ENV", "dev").lower() == "dev"
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0" if _dev else "0.05"))
+LOG_SAMPLE_MIN_STATUS = int(os.getenv("LOG_SAMPLE_MIN_STATUS", "400"))
+LOG_BODY_MAX_BYTES = int(os.getenv("LOG_BODY_MAX_BYTES", "2048"))
+
+REDACTED = "[REDACTED]"
+SECRET_HEADERS = {b"authorization", b"cookie", b"set-cookie", b"x-api-key", b"proxy-authorization"}
+# JSON ("password": "x") and form (password=x) fields. A JSON string value is
+# matched whole, escapes included, up to its closing quote or the end of the
+# logged prefix when the body was cut off inside it.
+SECRET_FIELDS = re.compile(
+    r'(?i)((?<!\w)"?(?:password|new_password|access_token|refresh_token|token|secret|code)"?\s*[:=]\s*)'
+    r'("(?:[^"\\]|\\.)*(?:"|\\?$)|[^"&,\s}]*)'
+)
+
+
+def _redact_field(match) -> str:
+    if match.group(2).startswith('"'):
+        return f'{match.group(1)}"{REDACTED}"'
+    return match.group(1) + REDACTED
+
+
+def redact_headers(headers) -> dict:
+    return {
+        name.decode("latin-1"): REDACTED if name.lower() in SECRET_HEADERS else value.decode("latin-1")
+        for name, value in headers
+    }
+
+
+def redact_body(prefix: bytes, total: int) -> str:
+    if not prefix:
+        return ""
+    text = SECRET_FIELDS.sub(_redact_field, prefix.decode("utf-8", errors="replace"))
+    if total > len(prefix):
+        text += f"... [{total} bytes]"
+    return text
+
+
+class _BodyTee:
+    __slots__ = ("prefix", "total")
+
+    def __init__(self):
+        self.prefix = bytearray()
+        self.total = 0
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self.total += len(chunk)
+        room = LOG_BODY_MAX_BYTES - len(self.prefix)
+        if room > 0:
+            self.prefix += chunk[:room]
+
+
+class RequestLoggingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        request_body = _BodyTee()
+        response_body = _BodyTee()
+        response_start = {}
+
+        async def tee_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                request_body.feed(message.get("body", b""))
+            return message
+
+        async def tee_send(message):
+            if message["type"] == "http.response.start":
+                response_start.update(message)
+            elif message["type"] == "http.response.body":
+                response_body.feed(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, tee_receive, tee_send)
+        finally:
+            status = response_start.get("status", 500)
+            if status >= LOG_SAMPLE_MIN_STATUS or random.random() < LOG_SAMPLE_RATE:
+                self._log(scope, status, time.perf_counter() - started, request_body, response_body, response_start)
+
+    @staticmethod
+    def _log(scope, status, elapsed, request_body, response_body, response_start):
+        path = scope.get("path", "")
+        if scope.get("query_string"):
+            path += "?" + SECRET_FIELDS.sub(_redact_field, scope["query_string"].decode("latin-1"))
+        logger.log(
+            logging.WARNING if status >= 500 else logging.INFO,
+            "%s %s | Status: %d | Time: %.3fs | Request headers: %s | Request body: %s | Response headers: %s | Response body: %s",
+            scope.get("method"), path, status, elapsed,
+            redact_headers(scope.get("headers", [])),
+            redact_body(bytes(request_body.prefix), request_body.total),
+            redact_headers(response_start.get("headers", [])),
+            redact_body(bytes(response_body.prefix), response_body.total),
+        )
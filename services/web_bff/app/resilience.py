@@ -0,0 +1,261 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, Optional
+
+import httpx
+
+from app.metrics import Counter, Gauge
+from app.deadline import expired
+from app import tracing
+
+logger = logging.getLogger(__name__)
+
+# Failure isolation for upstream calls, applied inside each shared client's
+# transport (see app/upstreams.py) so routes need no changes.
+#
+# Circuit breaker: once BREAKER_MIN_CALLS of the last BREAKER_WINDOW calls have
+# been made and at least BREAKER_FAILURE_RATIO of them failed (transport error,
+# timeout or 5xx), the breaker opens and calls fail immediately with
+# CircuitOpenError, an httpx.TransportError, so the routes' existing
+# `except httpx.RequestError` paths answer 502 without waiting on a sick
+# upstream. After BREAKER_OPEN_SECONDS one probe call is let through
+# (half-open); its outcome closes or re-opens the breaker.
+#
+# Retry budget: GET/HEAD calls that fail with a connection error or
+# 502/503/504 are retried at most UPSTREAM_MAX_RETRIES times, and only while
+# the upstream's budget has a token. Every call adds UPSTREAM_RETRY_RATIO
+# tokens (capped at UPSTREAM_RETRY_BUDGET), so retries stay a bounded fraction
+# of traffic and cannot multiply load during an outage. Nothing is retried once
+# the request's deadline has passed.
+#
+# Hedging: a GET sent with extensions={"hedge": True} gets a second copy if the
+# first has not answered within the upstream's recent p95 latency (or
+# UPSTREAM_HEDGE_DELAY_MS until there are enough samples). The first response
+# wins and the other is cancelled. The copy is sent as its own httpx.Request.
+# Hedges spend retry budget too. Only hedge idempotent reads.
+
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "10"))
+BREAKER_FAILURE_RATIO = float(os.getenv("BREAKER_FAILURE_RATIO", "0.5"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "10"))
+UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", "1"))
+UPSTREAM_RETRY_RATIO = float(os.getenv("UPSTREAM_RETRY_RATIO", "0.1"))
+UPSTREAM_RETRY_BUDGET = float(os.getenv("UPSTREAM_RETRY_BUDGET", "10"))
+UPSTREAM_HEDGE_DELAY_MS = float(os.getenv("UPSTREAM_HEDGE_DELAY_MS", "100"))
+
+RETRYABLE_METHODS = {"GET", "HEAD"}
+RETRYABLE_STATUSES = {502, 503, 504}
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+breaker_trips = Counter("bff_upstream_breaker_trips_total", "Times an upstream circuit breaker opened", ("upstream",))
+breaker_rejections = Counter("bff_upstream_breaker_rejections_total", "Calls failed fast by an open circuit breaker", ("upstream",))
+upstream_retries = Counter("bff_upstream_retries_total", "Upstream calls retried", ("upstream",))
+retry_budget_exhausted = Counter("bff_upstream_retry_budget_exhausted_total", "Retries or hedges skipped because the budget was empty", ("upstream",))
+upstream_hedges = Counter("bff_upstream_hedges_total", "Hedged requests sent, by which copy answered first", ("upstream", "winner"))
+
+BREAKERS: Dict[str, "CircuitBreaker"] = {}
+
+
+class CircuitOpenError(httpx.TransportError):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.outcomes: Deque[bool] = deque(maxlen=BREAKER_WINDOW)
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        BREAKERS[name] = self
+
+    def allow(self) -> bool:
+        if self.state == OPEN and time.monotonic() - self.opened_at >= BREAKER_OPEN_SECONDS:
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def record(self, ok: bool) -> None:
+        if self.state == HALF_OPEN:
+            self.probe_in_flight = False
+            if ok:
+                logger.info("[WEB-BFF] Circuit for %s closed", self.name)
+                self.state = CLOSED
+                self.outcomes.clear()
+            else:
+                self._open()
+            return
+        self.outcomes.append(ok)
+        if self.state == CLOSED and len(self.outcomes) >= BREAKER_MIN_CALLS:
+            failures = self.outcomes.count(False)
+            if failures / len(self.outcomes) >= BREAKER_FAILURE_RATIO:
+                self._open()
+
+    def _open(self) -> None:
+        logger.warning("[WEB-BFF] Circuit for %s opened for %.0fs", self.name, BREAKER_OPEN_SECONDS)
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.outcomes.clear()
+        breaker_trips.inc(upstream=self.name)
+
+
+class RetryBudget:
+    def __init__(self):
+        self.tokens = UPSTREAM_RETRY_BUDGET
+
+    def deposit(self) -> None:
+        self.tokens = min(UPSTREAM_RETRY_BUDGET, self.tokens + UPSTREAM_RETRY_RATIO)
+
+    def withdraw(self) -> bool:
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+def _copy_request(request: httpx.Request) -> httpx.Request:
+    """A separate request for a concurrent attempt; a Request must not be in two sends at once."""
+    return httpx.Request(
+        request.method,
+        request.url,
+        headers=request.headers.copy(),
+        content=request.read(),
+        extensions=dict(request.extensions),
+    )
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """Wraps an upstream's pooled transport with a breaker, retry budget and hedging."""
+
+    def __init__(self, name: str, inner: httpx.AsyncHTTPTransport):
+        self.name = name
+        self.inner = inner
+        self.breaker = CircuitBreaker(name)
+        self.budget = RetryBudget()
+        self.latencies: Deque[float] = deque(maxlen=200)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        # One client span per logical call, covering its retries and hedges
+        with tracing.span(f"{request.method} {self.name}", tracing.CLIENT, {
+            "http.request.method": request.method,
+            "server.address": request.url.host,
+            "url.path": request.url.path,
+        }) as call:
+            tracing.inject(request.headers)
+            response = await self._handle(request)
+            call.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 500:
+                call.set_error(f"HTTP {response.status_code}")
+            return response
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.budget.deposit()
+        retryable = request.method in RETRYABLE_METHODS
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                breaker_rejections.inc(upstream=self.name)
+                raise CircuitOpenError(f"Circuit open for {self.name}", request=request)
+            try:
+                if retryable and request.extensions.get("hedge"):
+                    response = await self._hedged(request)
+                else:
+                    response = await self._send(request)
+            except asyncio.CancelledError:
+                if self.breaker.state == HALF_OPEN:
+                    self.breaker.probe_in_flight = False
+                raise
+            except httpx.TransportError:
+                self.breaker.record(False)
+                if retryable and attempt < UPSTREAM_MAX_RETRIES and self._spend():
+                    attempt += 1
+                    await self._backoff(attempt)
+                    continue
+                raise
+
+            self.breaker.record(response.status_code < 500)
+            if (retryable and response.status_code in RETRYABLE_STATUSES
+                    and attempt < UPSTREAM_MAX_RETRIES and self._spend()):
+                await response.aclose()
+                attempt += 1
+                await self._backoff(attempt)
+                continue
+            return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    def _spend(self) -> bool:
+        if expired():
+            # Nobody is waiting for the answer any more
+            return False
+        if self.budget.withdraw():
+            upstream_retries.inc(upstream=self.name)
+            return True
+        retry_budget_exhausted.inc(upstream=self.name)
+        return False
+
+    async def _backoff(self, attempt: int) -> None:
+        await asyncio.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        self.latencies.append(time.perf_counter() - started)
+        return response
+
+    def hedge_delay(self) -> float:
+        if len(self.latencies) < 20:
+            return UPSTREAM_HEDGE_DELAY_MS / 1000
+        ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    async def _hedged(self, request: httpx.Request) -> httpx.Response:
+        primary = asyncio.ensure_future(self._send(request))
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay())
+        if done:
+            return primary.result()
+        if not self.budget.withdraw():
+            retry_budget_exhausted.inc(upstream=self.name)
+            return await primary
+
+        hedge = asyncio.ensure_future(self._send(_copy_request(request)))
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        upstream_hedges.inc(upstream=self.name, winner="hedge" if task is hedge else "primary")
+                        for other in done - {task}:
+                            if other.exception() is None:
+                                await other.result().aclose()
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            # A loser that finished before it could be cancelled still holds a connection
+            for outcome in await asyncio.gather(*pending, return_exceptions=True):
+                if isinstance(outcome, httpx.Response):
+                    await outcome.aclose()
+
+
+def _breaker_states():
+    for name, breaker in BREAKERS.items():
+        yield (name,), _STATE_VALUES[breaker.state]
+
+
+Gauge("bff_upstream_breaker_state", "Circuit breaker state per upstream (0 closed, 1 half-open, 2 open)", ("upstream",), _breaker_states)
@@ -6,6 +6,9 @@ import logging
 import os
 import urllib.parse
 
+from app.upstreams import upstream
+from app.streaming import open_stream, passthrough
+
 router = APIRouter(tags=["Account Setup"])
 
 logging.basicConfig(level=logging.INFO)
@@ -211,7 +214,7 @@ async def signup(request: SignupRequest):
     """
     logger.info(f"[WEB-BFF] Outgoing API Request: POST {SETUP_SERVICE_URL}signup with payload: {request.dict()}")
     try:
-        async with httpx.AsyncClient() as client:
+        async with upstream("account") as client:
             response = await client.post(f"{SETUP_SERVICE_URL}signup", json=request.dict())
 
         logger.info(f"[WEB-BFF] API Response: {response.status_code} - {response.text}")
@@ -257,7 +260,7 @@ async def confirm(request: ConfirmRequest):
     """
     logger.info(f"[WEB-BFF] Outgoing API Request: POST {SETUP_SERVICE_URL}confirm with payload: {request.dict()}")
     try:
-        async with httpx.AsyncClient() as client:
+        async with upstream("account") as client:
             response = await client.post(f"{SETUP_SERVICE_URL}confirm", json=request.dict())
 
         logger.info(f"[WEB-BFF] API Response: {response.status_code} - {response.text}")
@@ -302,7 +305,7 @@ async def status(email: EmailStr):
     """
     logger.info(f"[WEB-BFF] Outgoing API Request: GET {SETUP_SERVICE_URL}status/{email}")
     try:
-        async with httpx.AsyncClient() as client:
+        async with upstream("account") as client:
             response = await client.get(f"{SETUP_SERVICE_URL}status/{email}")
 
         logger.info(f"[WEB-BFF] API Response: {response.status_code} - {response.text}")
@@ -345,13 +348,14 @@ async def emails():
     """
     logger.info(f"[WEB-BFF] Outgoing API Request: GET {SETUP_SERVICE_URL}emails")
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{SETUP_SERVICE_URL}emails")
+        response = await open_stream("account", "GET", f"{SETUP_SERVICE_URL}emails")
 
-        logger.info(f"[WEB-BFF] API Response: {response.status_code} - {response.text}")
+        logger.info(f"[WEB-BFF] API Response: {response.status_code}")
         if response.status_code == 200:
-            return {"emails": response.json()}
+            # Wrap the upstream list as {"emails": [...]} without parsing it
+            return passthrough(response, prefix=b'{"emails":', suffix=b"}", media_type="application/json")
         else:
+            await response.aread()
             raise HTTPException(status_code=response.status_code, detail=response.text)
 
     except httpx.RequestError as e:
@@ -384,7 +388,7 @@ async def email_for_code(code: str):
     """
     logger.info(f"[WEB-BFF] Outgoing API Request: GET {SETUP_SERVICE_URL}email-for-code/{code}")
     try:
-        async with httpx.AsyncClient() as client:
+        async with upstream("account") as client:
             response = await client.get(f"{SETUP_SERVICE_URL}email-for-code/{code}")
 
         logger.info(f"[WEB-BFF] API Response: {response.status_code} - {response.text}")
@@ -467,7 +471,7 @@ async def dev_get_code(email: str):
         account_service_dev_url = f"http://host.docker.internal:8601/dev/get-code/{urllib.parse.quote(decoded_email, safe='')}"
         logger.info(f"[WEB-BFF] Outgoing API Request: GET {account_service_dev_url}")
         
-        async with httpx.AsyncClient() as client:
+        async with upstream("account") as client:
             response = await client.get(account_service_dev_url)
 
         logger.info(f"[WEB-BFF] Account service API Response: {response.status_code} - {response.text}")
@@ -2,11 +2,28 @@ from fastapi import Request, Response, APIRouter, HTTPException, Form
 from fastapi.responses import JSONResponse
 import httpx, os, urllib.parse, logging
 
+from app.signed_token import verify_locally
+from app.upstreams import upstream, cookie_header
+from app.token_cache import token_validation_cache
+
 router = APIRouter(prefix="/auth", tags=["auth"])
 logger = logging.getLogger(__name__)
 
 AUTH_SERVICE_URL = os.getenv("AUTH_SERVICE_URL", "http://auth_service:8000")
 HUMAN_SERVICE_URL = os.getenv("HUMAN_SERVICE_URL", "http://human_service:8000")
+# Auth's device when the caller sends no X-Device-ID
+DEFAULT_DEVICE_ID = "web_browser"
+
+
+def _request_token(request: Request):
+    """The access token auth will validate: its cookie wins over the Authorization header."""
+    auth_header = request.headers.get("authorization") or ""
+    if request.cookies.get("access_token"):
+        return request.cookies["access_token"]
+    if auth_header.startswith("Bearer "):
+        return auth_header.split(" ")[1]
+    return None
+
 
 @router.post("/login")
 async def login(
@@ -19,7 +36,7 @@ async def login(
     logger.debug("Proxying login request to %s", login_url)
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
+        async with upstream("auth") as client:
             auth_response = await client.post(
                 login_url,
                 data={"email": email, "password": password},
@@ -46,7 +63,7 @@ async def login(
     # Query human service for additional user info by created_by field
     human_url = f"{HUMAN_SERVICE_URL}/?created_by={user_id}&limit=1"
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
+        async with upstream("human") as client:
             human_response = await client.get(human_url)
             logger.debug("Human service response: %d %s", human_response.status_code, human_response.text)
     except httpx.RequestError:
@@ -67,14 +84,6 @@ async def login(
             detail="No human profile found for this user",
         )
 
-    # Human service returns paginated results, get first result
-    human_data = human_response.json()
-    if not human_data.get("results") or len(human_data["results"]) == 0:
-        raise HTTPException(
-            status_code=404,
-            detail="No human profile found for this user",
-        )
-
     human_json = human_data["results"][0]  # Get first human record
     # Merge names and id into the user object
     user["first_name"] = human_json.get("first_name")
@@ -164,33 +173,66 @@ async def validate(request: Request):
             detail="Access token required in Authorization header. Use 'Bearer <access_token>' format."
         )
     
+    token = _request_token(request)
+    device_id = request.headers.get("x-device-id", DEFAULT_DEVICE_ID)
+    claims = await verify_locally(token) if token else None
+    if claims:
+        # Auth binds a session to its device; so does the local path
+        if claims.device_id != device_id:
+            logger.warning("Signed access token for device %s presented as %s", claims.device_id, device_id)
+            raise HTTPException(status_code=401, detail="Invalid access token")
+        # The token carries only ids: answer with the profile auth last returned
+        # for this user, or ask auth once to get it
+        user = token_validation_cache.cached_user(claims.user_id)
+        if user is not None:
+            logger.debug("Signed access token verified locally for user %s", claims.user_id)
+            return {"user": user}
+
+    cached = token_validation_cache.get(token) if token else None
+    if cached is not None:
+        status_code, value = cached
+        if status_code == 200:
+            return value
+        raise HTTPException(status_code=status_code, detail=value)
+    cache_generation = token_validation_cache.generation
+
     if auth_header:
         headers["Authorization"] = auth_header
         logger.debug("Forwarding Authorization header to auth service")
+    if "x-device-id" in request.headers:
+        headers["X-Device-ID"] = device_id
 
     try:
-        async with httpx.AsyncClient(timeout=10, cookies=cookies) as client:
-            auth_response = await client.get(validate_url, headers=headers)
+        async with upstream("auth") as client:
+            auth_response = await client.get(validate_url, headers=cookie_header(cookies, headers))
             logger.debug("Auth validate response: %d %s", auth_response.status_code, auth_response.text)
     except httpx.RequestError:
         logger.exception("Error contacting auth service for validate")
         raise HTTPException(status_code=502, detail="Failed to contact auth service")
 
     if auth_response.status_code != 200:
+        detail = auth_response.json().get("detail", "Validation failed")
+        if token:
+            token_validation_cache.put_rejected(token, auth_response.status_code, detail)
         raise HTTPException(
             status_code=auth_response.status_code,
-            detail=auth_response.json().get("detail", "Validation failed"),
+            detail=detail,
         )
 
     auth_json = auth_response.json()
 
     # Ensure output format is { "user": { ... } } even if backend returns user_id only
     if "user" in auth_json:
-        return auth_json
+        result = auth_json
     elif "user_id" in auth_json:
-        return { "user": { "id": auth_json["user_id"] } }
+        result = { "user": { "id": auth_json["user_id"] } }
+    else:
+        raise HTTPException(status_code=500, detail="Invalid validate response format")
 
-    raise HTTPException(status_code=500, detail="Invalid validate response format")
+    if token:
+        user_id = (result.get("user") or {}).get("id")
+        token_validation_cache.put_valid(token, result, str(user_id) if user_id else None, generation=cache_generation)
+    return result
 
 @router.post("/refresh")
 async def refresh(request: Request, response: Response):
@@ -219,12 +261,12 @@ async def refresh(request: Request, response: Response):
             "User-Agent": request.headers.get("user-agent", "web-bff")
         }
         
-        # FIXED: Use cookies parameter instead of headers for httpx
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        # The shared client never stores cookies, so forward the caller's explicitly
+        async with upstream("auth") as client:
             auth_response = await client.post(
                 refresh_url,
-                headers=headers,
-                cookies=cookies  # This properly forwards cookies to auth service
+                headers=cookie_header(cookies, headers),
+                timeout=30.0
             )
         
         logger.info("Auth service response status: %s", auth_response.status_code)
@@ -248,6 +290,13 @@ async def refresh(request: Request, response: Response):
     
     auth_json = auth_response.json()
     logger.info("Token refresh successful")
+
+    # The old access token is superseded; stop serving it from the validation cache
+    old_token = _request_token(request)
+    if old_token:
+        token_validation_cache.invalidate_token(old_token)
+    if (auth_json.get("user") or {}).get("id"):
+        token_validation_cache.invalidate_user(str(auth_json["user"]["id"]))
     
     # Extract token data from auth service response
     tokens = auth_json.get("tokens", {})
@@ -298,11 +347,10 @@ async def logout(request: Request, response: Response):
             "User-Agent": request.headers.get("user-agent", "web-bff")
         }
         
-        async with httpx.AsyncClient() as client:
+        async with upstream("auth") as client:
             auth_response = await client.post(
                 logout_url,
-                headers=headers,
-                cookies=cookies,
+                headers=cookie_header(cookies, headers),
                 timeout=30.0
             )
         
@@ -311,6 +359,11 @@ async def logout(request: Request, response: Response):
         # Even if auth service is down, clear cookies locally
         pass
     
+    # After auth has revoked the session, so a concurrent validate cannot re-cache it
+    token = _request_token(request)
+    if token:
+        token_validation_cache.invalidate_token(token)
+
     # Clear cookies regardless of auth service response
     response.delete_cookie("access_token", path="/")
     response.delete_cookie("refresh_token", path="/", httponly=True)
@@ -7,6 +7,9 @@ import httpx
 import logging
 import json
 
+from app.upstreams import upstream
+from app.loader import record_loader
+
 router = APIRouter(tags=["User Setup"])
 
 logging.basicConfig(level=logging.INFO)
@@ -84,7 +87,7 @@ This endpoint validates that a workspace exists and is accessible for new user r
 It checks workspace validity and returns workspace details including name and icon.
 Used during the user setup flow to confirm workspace invitation validity.
 """)
-async def validate_workspace(workspace_id: int):
+async def validate_workspace(workspace_id: int, request: Request):
     """
     Validates that a workspace exists and can be joined by new users.
     
@@ -100,14 +103,12 @@ async def validate_workspace(workspace_id: int):
     logger.info(f"[WEB-BFF] Validating workspace ID: {workspace_id}")
     
     try:
-        async with httpx.AsyncClient() as client:
-            # Call workspace service to get workspace details using integer ID
-            response = await client.get(f"{WORKSPACE_SERVICE_URL}{workspace_id}")
+        # Call workspace service to get workspace details using integer ID (batched per request)
+        workspace_data = await record_loader(request, "workspace").load(workspace_id)
         
-        logger.info(f"[WEB-BFF] Workspace validation response: {response.status_code}")
+        logger.info(f"[WEB-BFF] Workspace validation response: {'found' if workspace_data else 'not found'}")
         
-        if response.status_code == 200:
-            workspace_data = response.json()
+        if workspace_data is not None:
             logger.info(f"[WEB-BFF] Workspace validation successful for: {workspace_data.get('name', 'Unknown')}")
             
             return WorkspaceValidationResponse(
@@ -116,7 +117,7 @@ async def validate_workspace(workspace_id: int):
                 workspace_icon_file_tag=workspace_data.get("icon_file_tag"),
                 error_details=None
             )
-        elif response.status_code == 404:
+        else:
             logger.warning(f"[WEB-BFF] Workspace not found: {workspace_id}")
             return WorkspaceValidationResponse(
                 valid=False,
@@ -124,15 +125,15 @@ async def validate_workspace(workspace_id: int):
                 workspace_icon_file_tag=None,
                 error_details="Workspace not found or no longer accessible"
             )
-        else:
-            logger.error(f"[WEB-BFF] Workspace validation failed: {response.status_code} - {response.text}")
-            return WorkspaceValidationResponse(
-                valid=False,
-                workspace_name=None,
-                workspace_icon_file_tag=None,
-                error_details=f"Workspace validation failed: {response.text}"
-            )
             
+    except httpx.HTTPStatusError as e:
+        logger.error(f"[WEB-BFF] Workspace validation failed: {e.response.status_code} - {e.response.text}")
+        return WorkspaceValidationResponse(
+            valid=False,
+            workspace_name=None,
+            workspace_icon_file_tag=None,
+            error_details=f"Workspace validation failed: {e.response.text}"
+        )
     except httpx.RequestError as e:
         logger.error(f"[WEB-BFF] Error during workspace validation: {str(e)}")
         raise HTTPException(
@@ -210,7 +211,7 @@ async def complete_user_setup(request: UserSetupRequest, response: Response):
         if has_workspace_id:
             logger.info(f"[WEB-BFF] Validating existing workspace: {request.workspace_id}")
             
-            async with httpx.AsyncClient() as client:
+            async with upstream("workspace") as client:
                 workspace_response = await client.get(f"{WORKSPACE_SERVICE_URL}{request.workspace_id}")
             
             if workspace_response.status_code != 200:
@@ -239,7 +240,7 @@ async def complete_user_setup(request: UserSetupRequest, response: Response):
                 "owner_id": "00000000-0000-0000-0000-000000000001"     # Will be updated after user creation
             }
             
-            async with httpx.AsyncClient() as client:
+            async with upstream("workspace") as client:
                 workspace_response = await client.post(f"{WORKSPACE_SERVICE_URL}", json=workspace_payload)
             
             if workspace_response.status_code != 200:
@@ -276,7 +277,7 @@ async def complete_user_setup(request: UserSetupRequest, response: Response):
         
         logger.info(f"[WEB-BFF] Human service payload: {human_payload}")
         
-        async with httpx.AsyncClient() as client:
+        async with upstream("human") as client:
             human_response = await client.post(f"{HUMAN_SERVICE_URL}", json=human_payload)
         
         if human_response.status_code != 200:
@@ -306,7 +307,7 @@ async def complete_user_setup(request: UserSetupRequest, response: Response):
             "last_name": request.last_name
         }
         
-        async with httpx.AsyncClient() as client:
+        async with upstream("auth") as client:
             auth_response = await client.post(
                 f"{AUTH_SERVICE_URL}register", 
                 data=auth_payload,  # Use data for form encoding
@@ -438,7 +439,7 @@ async def _perform_rollback(workspace_id: Optional[int], human_id: Optional[str]
     
     if human_id:
         try:
-            async with httpx.AsyncClient() as client:
+            async with upstream("human") as client:
                 await client.delete(f"{HUMAN_SERVICE_URL}{human_id}")
             logger.info(f"[WEB-BFF] Rollback: Deleted human record {human_id}")
         except Exception as e:
@@ -446,7 +447,7 @@ async def _perform_rollback(workspace_id: Optional[int], human_id: Optional[str]
     
     if workspace_id:
         try:
-            async with httpx.AsyncClient() as client:
+            async with upstream("workspace") as client:
                 await client.delete(f"{WORKSPACE_SERVICE_URL}{workspace_id}")
             logger.info(f"[WEB-BFF] Rollback: Deleted workspace {workspace_id}")
         except Exception as e:
@@ -4,6 +4,9 @@ from pydantic import BaseModel, Field
 import logging
 import httpx
 
+from app.upstreams import upstream
+from app.streaming import open_stream, passthrough
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/views/directory", tags=["Human Directory"])
@@ -77,7 +80,7 @@ async def create_human(
         # Log the exact payload being sent to the microservice
         payload = body.dict()
         logger.info(f"Payload sent to human microservice: {payload}")
-        async with httpx.AsyncClient() as client:
+        async with upstream("human") as client:
             resp = await client.post(f"{HUMAN_SERVICE_URL}/", json=payload)
         resp.raise_for_status()
         logger.info(f"Human created successfully: {resp.json()}")
@@ -98,7 +101,7 @@ async def bulk_create_humans(
     logger.info(f"Workspace: {body.workspace_id}, Created By: {body.created_by}")
     try:
         payload = {"workspace_id": body.workspace_id, "user_id": body.created_by, "humans": body.humans}
-        async with httpx.AsyncClient() as client:
+        async with upstream("human") as client:
             resp = await client.post(f"{HUMAN_SERVICE_URL}/bulk", json=payload)
         resp.raise_for_status()
         logger.info(f"Bulk humans created successfully: {resp.json()}")
@@ -130,11 +133,11 @@ async def get_humans(
     params.pop("workspace_id", None)
     params.pop("created_by", None)
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{HUMAN_SERVICE_URL}/", params=params)
+        # The page is returned unchanged, so relay the upstream bytes instead of re-encoding them
+        resp = await open_stream("human", "GET", f"{HUMAN_SERVICE_URL}/", params=params)
         resp.raise_for_status()
-        logger.info(f"Humans fetched successfully: {resp.json()}")
-        return resp.json()
+        logger.info(f"Humans fetched successfully: {resp.status_code}")
+        return passthrough(resp)
     except httpx.HTTPStatusError as e:
         log_httpx_error(e, "get_humans")
         raise HTTPException(status_code=e.response.status_code, detail=e.response.text)
@@ -144,13 +147,14 @@ async def get_humans(
 
 @router.get("/{human_id}", summary="Get a Single Human Record")
 async def get_human(
+    request: Request,
     human_id: str = Path(..., description="Human UUID"),
-    request: Request = None,
 ):
     logger.info(f"Received get_human request for id={human_id}")
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{HUMAN_SERVICE_URL}/{human_id}")
+        # A single lookup has nothing to batch with; a hedged GET cuts its tail latency
+        async with upstream("human") as client:
+            resp = await client.get(f"{HUMAN_SERVICE_URL}/{human_id}", extensions={"hedge": True})
         resp.raise_for_status()
         logger.info(f"Human fetched successfully: {resp.json()}")
         return resp.json()
@@ -172,7 +176,7 @@ async def bulk_update_humans(
     logger.info(f"Workspace: {body.workspace_id}, Created By: {body.created_by}")
     try:
         payload = {"workspace_id": body.workspace_id, "user_id": body.created_by, "updates": body.updates}
-        async with httpx.AsyncClient() as client:
+        async with upstream("human") as client:
             resp = await client.patch(f"{HUMAN_SERVICE_URL}/bulk", json=payload)
         resp.raise_for_status()
         logger.info(f"Bulk humans updated successfully: {resp.json()}")
@@ -200,7 +204,7 @@ async def update_human(
     logger.info(f"Workspace: {workspace_id}, Created By: {user_id}")
     try:
         payload = {"workspace_id": workspace_id, "user_id": user_id, **updates}
-        async with httpx.AsyncClient() as client:
+        async with upstream("human") as client:
             resp = await client.patch(f"{HUMAN_SERVICE_URL}/{id}", json=payload)
         resp.raise_for_status()
         logger.info(f"Human updated successfully for id={id}: {resp.json()}")
@@ -223,7 +227,7 @@ async def bulk_delete_humans(
     logger.info(f"Workspace: {body.workspace_id}, Created By: {body.created_by}")
     try:
         payload = {"workspace_id": body.workspace_id, "user_id": body.created_by, "ids": body.ids}
-        async with httpx.AsyncClient() as client:
+        async with upstream("human") as client:
             resp = await client.request("DELETE", f"{HUMAN_SERVICE_URL}/bulk", json=payload)
         resp.raise_for_status()
         logger.info(f"Bulk humans deleted successfully: {resp.json()}")
@@ -245,7 +249,7 @@ async def delete_human(
     logger.info(f"Workspace: {body.workspace_id}, Created By: {body.created_by}")
     try:
         payload = body.dict()
-        async with httpx.AsyncClient() as client:
+        async with upstream("human") as client:
             resp = await client.request("DELETE", f"{HUMAN_SERVICE_URL}/{id}", json=payload)
         resp.raise_for_status()
         logger.info(f"Human deleted successfully for id={id}: {resp.json()}")
@@ -4,6 +4,9 @@ from typing import List, Optional, Dict, Any
 import httpx
 import logging
 
+from app.upstreams import upstream
+from app.streaming import open_stream, passthrough
+
 router = APIRouter(tags=["Workspaces"])
 
 logging.basicConfig(level=logging.INFO)
@@ -64,9 +67,9 @@ async def validate_workspace_for_signup(workspace_id: int):
     logger.info(f"[WEB-BFF] Validating workspace for signup: {workspace_id}")
     
     try:
-        async with httpx.AsyncClient() as client:
+        async with upstream("workspace") as client:
             # Use the existing search endpoint to find the workspace
-            response = await client.get(f"{WORKSPACE_SERVICE_URL}", params={"workspace_id": workspace_id})
+            response = await client.get(f"{WORKSPACE_SERVICE_URL}", params={"workspace_id": workspace_id}, extensions={"hedge": True})
         
         logger.info(f"[WEB-BFF] Workspace validation response: {response.status_code}")
         
@@ -120,7 +123,7 @@ async def check_workspace_name_exists(name: str) -> bool:
     """
     logger.info(f"[WEB-BFF] Checking if workspace name '{name}' already exists")
     try:
-        async with httpx.AsyncClient() as client:
+        async with upstream("workspace") as client:
             # Use the search endpoint with name filter
             response = await client.get(f"{WORKSPACE_SERVICE_URL}", params={"name": name})
         
@@ -183,17 +186,16 @@ async def search_workspaces(
     
     try:
         logger.info(f"[WEB-BFF] Sending workspace search request to workspace_service with params: {params}")
-        async with httpx.AsyncClient() as client:
-            response = await client.get(WORKSPACE_SERVICE_URL, params=params)
+        response = await open_stream("workspace", "GET", WORKSPACE_SERVICE_URL, params=params)
         
         logger.info(f"[WEB-BFF] Received workspace search response: {response.status_code}")
         
         if response.status_code == 200:
-            search_results = response.json()
-            logger.info(f"[WEB-BFF] Workspace search successful, found {search_results.get('total', 0)} workspaces")
-            logger.debug(f"[WEB-BFF] Raw search results: {search_results}")
-            return search_results
+            # Already in WorkspaceSearchResponse shape; relay it without re-serializing
+            logger.info("[WEB-BFF] Workspace search successful, streaming results")
+            return passthrough(response)
         else:
+            await response.aread()
             logger.warning(f"[WEB-BFF] Workspace search failed with status code {response.status_code}: {response.text}")
             return {
                 "results": [],
@@ -248,7 +250,7 @@ async def create_workspace(request: Request, workspace_request: WorkspaceRequest
 
     try:
         logger.info(f"[WEB-BFF] Sending API request to workspace_service at {WORKSPACE_SERVICE_URL}")
-        async with httpx.AsyncClient() as client:
+        async with upstream("workspace") as client:
             response = await client.post(f"{WORKSPACE_SERVICE_URL}", json=payload)
 
         logger.info(f"[WEB-BFF] Received response from workspace_service: {response.status_code} - {response.text}")
@@ -0,0 +1,139 @@
+import os
+import hmac
+import time
+import base64
+import struct
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+
+from app.upstreams import upstream
+
+# Local verification of the signed access tokens issued by the auth service when
+# it runs with ACCESS_TOKEN_FORMAT=signed. The token format, MAC and Bloom filter
+# layout mirror services/auth/app/common/signed_token.py and bloom_filter.py.
+#
+# A token is accepted locally only when its signature and expiry check out, the
+# revocation filter is fresh and the session id is not in it. /auth/validate
+# also requires its device id to match the caller's X-Device-ID, as auth does. Anything else
+# (filter stale or unavailable, possible revocation) falls back to auth /validate,
+# which stays authoritative.
+
+logger = logging.getLogger(__name__)
+
+AUTH_SERVICE_URL = os.getenv("AUTH_SERVICE_URL", "http://auth_service:8000")
+SIGNED_TOKEN_SECRET = os.getenv("SIGNED_TOKEN_SECRET", "")
+REVOCATION_FILTER_REFRESH = float(os.getenv("REVOCATION_FILTER_REFRESH", "5"))
+REVOCATION_FILTER_MAX_AGE = float(os.getenv("REVOCATION_FILTER_MAX_AGE", "30"))
+
+TOKEN_PREFIX = "st1"
+BLOOM_HEADER = struct.Struct(">IB")
+
+
+@dataclass(frozen=True)
+class SignedClaims:
+    user_id: str
+    session_id: str
+    device_id: str
+    issued_at: int
+    expires_at: int
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def is_signed_token(token: Optional[str]) -> bool:
+    return bool(token) and token.startswith(TOKEN_PREFIX + ".")
+
+
+def verify_access_token(secret: str, token: str, now: Optional[int] = None) -> Optional[SignedClaims]:
+    if not is_signed_token(token):
+        return None
+
+    message, _, signature = token.rpartition(".")
+    try:
+        expected = hmac.new(secret.encode(), message.encode("ascii"), hashlib.sha256).digest()
+        if not hmac.compare_digest(_b64decode(signature), expected):
+            return None
+        fields = _b64decode(message[len(TOKEN_PREFIX) + 1:]).decode().split("|")
+        user_id, session_id, device_id, issued_at, expires_at = fields
+        claims = SignedClaims(user_id, session_id, device_id, int(issued_at), int(expires_at))
+    except ValueError:
+        return None
+
+    if claims.expires_at <= (now if now is not None else int(time.time())):
+        return None
+    return claims
+
+
+class RevocationFilter:
+    """Deny-list of session ids fetched from auth and refreshed lazily."""
+
+    def __init__(self):
+        self._bits = None
+        self._size_bits = 0
+        self._num_hashes = 0
+        self.generated_at = 0
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _load(self, encoded: str, generated_at: int):
+        data = base64.b64decode(encoded)
+        self._size_bits, self._num_hashes = BLOOM_HEADER.unpack_from(data)
+        self._bits = data[BLOOM_HEADER.size:]
+        self.generated_at = generated_at
+
+    def is_fresh(self) -> bool:
+        return self._bits is not None and time.time() - self.generated_at <= REVOCATION_FILTER_MAX_AGE
+
+    def might_be_revoked(self, session_id: str) -> bool:
+        digest = hashlib.blake2b(session_id.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self._num_hashes):
+            pos = (h1 + i * h2) % self._size_bits
+            if not self._bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    async def refresh_if_due(self):
+        if time.time() - self._fetched_at < REVOCATION_FILTER_REFRESH:
+            return
+        async with self._lock:
+            if time.time() - self._fetched_at < REVOCATION_FILTER_REFRESH:
+                return
+            self._fetched_at = time.time()
+            try:
+                async with upstream("auth") as client:
+                    response = await client.get(f"{AUTH_SERVICE_URL}/api/internal/revocation-filter", timeout=2)
+                if response.status_code == 200:
+                    body = response.json()
+                    self._load(body["filter"], int(body["generated_at"]))
+                else:
+                    logger.warning("[WEB-BFF] Revocation filter unavailable: %d", response.status_code)
+            except (httpx.RequestError, KeyError, ValueError) as e:
+                logger.warning("[WEB-BFF] Failed to refresh revocation filter: %s", str(e))
+
+
+revocation_filter = RevocationFilter()
+
+
+async def verify_locally(token: str) -> Optional[SignedClaims]:
+    """Return claims when the token can be trusted without asking auth, else None."""
+    if not SIGNED_TOKEN_SECRET or not is_signed_token(token):
+        return None
+
+    claims = verify_access_token(SIGNED_TOKEN_SECRET, token)
+    if claims is None:
+        return None
+
+    await revocation_filter.refresh_if_due()
+
+    if not revocation_filter.is_fresh() or revocation_filter.might_be_revoked(claims.session_id):
+        return None
+    return claims
@@ -0,0 +1,68 @@
+import logging
+from typing import Optional
+
+import httpx
+from starlette.responses import StreamingResponse
+
+from app.upstreams import upstream
+
+logger = logging.getLogger(__name__)
+
+# Pass-through of upstream response bodies.
+#
+# For proxies that return an upstream body unchanged, parsing it with
+# resp.json() only for FastAPI to serialize it again is wasted CPU, and holding
+# it whole costs memory proportional to the page. open_stream() sends the
+# request without reading the body, and passthrough() relays it chunk by chunk
+# with the upstream's content headers, so memory stays bounded whatever the
+# response size. An optional prefix/suffix wraps the body at the byte level
+# (e.g. {"emails": ...}) without parsing it. The upstream connection goes back
+# to the pool when the stream ends or the client disconnects.
+
+PASSTHROUGH_HEADERS = ("content-type", "content-length", "content-encoding", "etag", "last-modified", "cache-control")
+
+
+async def open_stream(service: str, method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request on the shared client and return once headers arrive.
+
+    Error responses are read in full so callers can inspect .text and call
+    raise_for_status() as usual; successful bodies are left unread for
+    passthrough().
+    """
+    async with upstream(service) as client:
+        request = client.build_request(method, url, **kwargs)
+        response = await client.send(request, stream=True)
+    if response.status_code >= 400:
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+    return response
+
+
+def passthrough(response: httpx.Response, prefix: bytes = b"", suffix: bytes = b"", media_type: Optional[str] = None) -> StreamingResponse:
+    wrapped = bool(prefix or suffix)
+    headers = {}
+    for name in PASSTHROUGH_HEADERS:
+        value = response.headers.get(name)
+        if value is None:
+            continue
+        if wrapped and name in ("content-length", "content-encoding", "etag"):
+            # The body changes, and wrapped bodies are relayed decoded
+            continue
+        headers[name] = value
+
+    async def body():
+        try:
+            if prefix:
+                yield prefix
+            chunks = response.aiter_bytes() if wrapped else response.aiter_raw()
+            async for chunk in chunks:
+                yield chunk
+            if suffix:
+                yield suffix
+        finally:
+            # Also runs when the client disconnects mid-stream
+            await response.aclose()
+
+    return StreamingResponse(body(), status_code=response.status_code, headers=headers, media_type=media_type)
@@ -0,0 +1,134 @@
+import os
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from app.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# Short-lived cache of /auth/validate results, keyed by SHA-256 of the token so
+# raw tokens are never held as keys.
+#
+# Valid tokens are cached for VALIDATION_CACHE_TTL seconds and rejected ones
+# (401/403) for VALIDATION_CACHE_NEGATIVE_TTL; auth errors and 5xx are never
+# cached. At most VALIDATION_CACHE_MAX_ENTRIES entries are kept, evicting the
+# least recently used. Logout and refresh through the BFF drop the token and
+# every cached token of the same user, so this replica stops accepting them at
+# once; a logout handled by another replica or by auth directly is picked up
+# within the TTL. A validation that was in flight during an invalidation is
+# not cached (see `generation`). Set VALIDATION_CACHE_TTL=0 to disable caching.
+
+_dev = os.getenv("ENV", "dev").lower() == "dev"
+VALIDATION_CACHE_TTL = float(os.getenv("VALIDATION_CACHE_TTL", "2" if _dev else "10"))
+VALIDATION_CACHE_NEGATIVE_TTL = float(os.getenv("VALIDATION_CACHE_NEGATIVE_TTL", "2"))
+VALIDATION_CACHE_MAX_ENTRIES = int(os.getenv("VALIDATION_CACHE_MAX_ENTRIES", "10000"))
+CACHEABLE_REJECTIONS = {401, 403}
+
+token_cache_lookups = Counter(
+    "bff_token_validation_cache_lookups_total",
+    "Token validation cache lookups by result",
+    ("result",)
+)
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class TokenValidationCache:
+    def __init__(self, ttl: float, negative_ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        # key -> (expires_at, status_code, body or detail, user_id)
+        self._entries: "OrderedDict[str, Tuple[float, int, object, Optional[str]]]" = OrderedDict()
+        self._by_user: Dict[str, Set[str]] = {}
+        # Bumped by every invalidation; callers snapshot it before asking auth
+        self.generation = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, token: str) -> Optional[Tuple[int, object]]:
+        """Return (status_code, body) for a fresh entry, or None on a miss."""
+        if not self.enabled:
+            return None
+        key = token_key(token)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            token_cache_lookups.inc(result="miss")
+            return None
+        self._entries.move_to_end(key)
+        token_cache_lookups.inc(result="hit" if entry[1] == 200 else "negative_hit")
+        return entry[1], entry[2]
+
+    def cached_user(self, user_id: str) -> Optional[dict]:
+        """The user object from any fresh valid entry of this user, or None."""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        for key in self._by_user.get(str(user_id), ()):
+            expires_at, status_code, body, _ = self._entries[key]
+            if status_code == 200 and expires_at > now and isinstance(body.get("user"), dict):
+                return dict(body["user"])
+        return None
+
+    def put_valid(self, token: str, body: dict, user_id: Optional[str], generation: Optional[int] = None) -> None:
+        """Cache a valid token, unless an invalidation happened since `generation` was read."""
+        if generation is not None and generation != self.generation:
+            return
+        self._put(token, self.ttl, 200, body, user_id)
+
+    def put_rejected(self, token: str, status_code: int, detail: str) -> None:
+        if status_code in CACHEABLE_REJECTIONS:
+            self._put(token, min(self.negative_ttl, self.ttl), status_code, detail, None)
+
+    def _put(self, token: str, ttl: float, status_code: int, value: object, user_id: Optional[str]) -> None:
+        if not self.enabled or ttl <= 0:
+            return
+        key = token_key(token)
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, status_code, value, user_id)
+        if user_id:
+            self._by_user.setdefault(user_id, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> Optional[str]:
+        entry = self._entries.pop(key, None)
+        if entry is None or not entry[3]:
+            return None
+        keys = self._by_user.get(entry[3])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[entry[3]]
+        return entry[3]
+
+    def invalidate_token(self, token: str) -> None:
+        """Drop the token and, if it was cached as valid, every token of its user."""
+        self.generation += 1
+        user_id = self._remove(token_key(token))
+        if user_id:
+            self.invalidate_user(user_id)
+
+    def invalidate_user(self, user_id: str) -> None:
+        self.generation += 1
+        for key in list(self._by_user.get(str(user_id), ())):
+            self._remove(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_validation_cache = TokenValidationCache(
+    ttl=VALIDATION_CACHE_TTL,
+    negative_ttl=VALIDATION_CACHE_NEGATIVE_TTL,
+    max_entries=VALIDATION_CACHE_MAX_ENTRIES,
+)
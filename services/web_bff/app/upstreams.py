@@ -0,0 +1,151 @@
+import os
+import logging
+from contextlib import asynccontextmanager
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Mapping, Optional
+
+import httpx
+
+from app.resilience import ResilientTransport
+from app.deadline import propagate_deadline
+from app.client_ip import forward_client_ip
+
+logger = logging.getLogger(__name__)
+
+# One long-lived httpx.AsyncClient per upstream service.
+#
+# Clients are opened in the app lifespan (open_clients) and closed on shutdown,
+# so requests reuse kept-alive connections instead of paying a TCP handshake per
+# call. Pool size, keep-alive and timeouts come from UPSTREAM_* env vars and
+# apply to every upstream. UPSTREAM_HTTP2=true negotiates HTTP/2 where the
+# upstream offers it over TLS (requires the optional `h2` package); plain
+# http:// service URLs stay on HTTP/1.1 keep-alive.
+#
+# The clients are shared by all users, so they never store cookies: a
+# Set-Cookie from one user's auth response must not be sent on the next user's
+# request. Forward the caller's cookies per request with cookie_header().
+#
+# Each client's transport adds a circuit breaker, retry budget and optional
+# hedging in front of the pool (app/resilience.py), and every call carries the
+# caller's remaining deadline (app/deadline.py) and address (app/client_ip.py).
+
+UPSTREAMS = {
+    "auth": os.getenv("AUTH_SERVICE_URL", "http://auth_service:8000"),
+    "human": os.getenv("HUMAN_SERVICE_URL", "http://human_service:8000"),
+    "workspace": os.getenv("WORKSPACE_SERVICE_URL", "http://workspace_service:8000"),
+    "account": os.getenv("ACCOUNT_SERVICE_URL", "http://account_service:8000"),
+}
+
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "100"))
+UPSTREAM_MAX_KEEPALIVE = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "20"))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30"))
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "2"))
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "10"))
+UPSTREAM_POOL_TIMEOUT = float(os.getenv("UPSTREAM_POOL_TIMEOUT", "5"))
+UPSTREAM_HTTP2 = os.getenv("UPSTREAM_HTTP2", "false").lower() == "true"
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_request_counts: Dict[str, int] = {}
+
+
+def _http2_available() -> bool:
+    if not UPSTREAM_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("[WEB-BFF] UPSTREAM_HTTP2=true but the h2 package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def _new_client(name: str, http2: bool) -> httpx.AsyncClient:
+    async def count_request(request: httpx.Request):
+        _request_counts[name] = _request_counts.get(name, 0) + 1
+
+    pooled = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE,
+            keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY,
+        ),
+        http2=http2,
+    )
+    client = httpx.AsyncClient(
+        transport=ResilientTransport(name, pooled),
+        timeout=httpx.Timeout(UPSTREAM_TIMEOUT, connect=UPSTREAM_CONNECT_TIMEOUT, pool=UPSTREAM_POOL_TIMEOUT),
+        event_hooks={"request": [count_request, propagate_deadline, forward_client_ip]},
+    )
+    # An empty allow-list rejects every Set-Cookie, so the shared jar stays empty
+    client.cookies.jar.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return client
+
+
+async def open_clients() -> None:
+    http2 = _http2_available()
+    for name in UPSTREAMS:
+        if name not in _clients:
+            _clients[name] = _new_client(name, http2)
+    logger.info(
+        "[WEB-BFF] Upstream clients ready for %s (max %d connections, %d keep-alive, http2=%s)",
+        ", ".join(UPSTREAMS), UPSTREAM_MAX_CONNECTIONS, UPSTREAM_MAX_KEEPALIVE, http2
+    )
+
+
+async def close_clients() -> None:
+    for name in list(_clients):
+        client = _clients.pop(name)
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning("[WEB-BFF] Failed to close %s client: %s", name, str(e))
+
+
+def get_client(name: str) -> httpx.AsyncClient:
+    client = _clients.get(name)
+    if client is None:
+        # Only reached outside the app lifespan, e.g. a script importing a route
+        logger.warning("[WEB-BFF] Upstream client %s used before startup; opening it now", name)
+        client = _clients[name] = _new_client(name, _http2_available())
+    return client
+
+
+@asynccontextmanager
+async def upstream(name: str):
+    """Borrow the shared client: `async with upstream("human") as client:`.
+
+    Leaving the block does not close the client or its connections.
+    """
+    yield get_client(name)
+
+
+def cookie_header(cookies: Mapping[str, str], headers: Optional[dict] = None) -> dict:
+    """Return `headers` plus a Cookie header carrying the caller's cookies."""
+    headers = dict(headers or {})
+    if cookies:
+        headers["Cookie"] = "; ".join(f"{key}={value}" for key, value in cookies.items())
+    return headers
+
+
+def pool_stats() -> Dict[str, dict]:
+    """Connection pool state per upstream, read from httpcore's pool."""
+    stats = {}
+    for name, client in _clients.items():
+        transport = client._transport
+        pool = getattr(transport.inner, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for c in connections if c.is_idle())
+        stats[name] = {
+            "url": UPSTREAMS.get(name),
+            "connections": len(connections),
+            "idle": idle,
+            "active": len(connections) - idle,
+            "http2": sum(1 for c in connections if getattr(c, "_connection", None) is not None and "HTTP2" in type(c._connection).__name__),
+            "queued_requests": sum(1 for r in getattr(pool, "_requests", []) if r.connection is None),
+            "requests_total": _request_counts.get(name, 0),
+            "max_connections": UPSTREAM_MAX_CONNECTIONS,
+            "max_keepalive": UPSTREAM_MAX_KEEPALIVE,
+            "breaker": transport.breaker.state,
+            "retry_tokens": round(transport.budget.tokens, 1),
+        }
+    return stats
@@ -0,0 +1,51 @@
+import ipaddress
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.client_ip import ClientIpMiddleware, forward_client_ip, resolve_client_ip
+
+
+def proxy_app(seen: list) -> FastAPI:
+    """A BFF-like app whose one route calls an upstream with the forwarding hook."""
+    def upstream(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("x-forwarded-for"))
+        return httpx.Response(200, json={})
+
+    app = FastAPI()
+    app.add_middleware(ClientIpMiddleware)
+
+    @app.post("/auth/login")
+    async def login():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream), event_hooks={"request": [forward_client_ip]}) as client:
+            await client.post("http://auth_service:8000/login")
+        return {}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_each_caller_address_is_forwarded_upstream():
+    seen = []
+    app = proxy_app(seen)
+    for address in ("198.51.100.1", "198.51.100.2"):
+        transport = httpx.ASGITransport(app, client=(address, 50000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bff") as client:
+            await client.post("/auth/login")
+    assert seen == ["198.51.100.1", "198.51.100.2"]
+
+
+@pytest.mark.asyncio
+async def test_client_forwarded_for_is_not_passed_through_untrusted():
+    seen = []
+    transport = httpx.ASGITransport(proxy_app(seen), client=("198.51.100.1", 50000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bff") as client:
+        await client.post("/auth/login", headers={"X-Forwarded-For": "8.8.8.8"})
+    assert seen == ["198.51.100.1"]
+
+
+def test_load_balancer_hops_are_skipped_when_trusted():
+    trusted = (ipaddress.ip_network("10.0.0.0/8"),)
+    assert resolve_client_ip("10.0.0.2", "8.8.8.8, 198.51.100.4", trusted) == "198.51.100.4"
+    assert resolve_client_ip("10.0.0.2", None, trusted) == "10.0.0.2"
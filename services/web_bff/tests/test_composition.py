@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.composition import Call, RequestScope, View
+
+
+def sleeper(seconds: float, value):
+    async def fn(ctx):
+        await asyncio.sleep(seconds)
+        return value
+    return fn
+
+
+async def failing(ctx):
+    raise RuntimeError("upstream down")
+
+
+@pytest.mark.asyncio
+async def test_independent_calls_overlap():
+    view = View(
+        "dashboard",
+        profile=Call(sleeper(0.2, "profile")),
+        workspaces=Call(sleeper(0.2, "workspaces")),
+        invites=Call(sleeper(0.2, "invites")),
+    )
+
+    started = time.perf_counter()
+    result = await view.resolve()
+    elapsed = time.perf_counter() - started
+
+    assert (result["profile"], result["workspaces"], result["invites"]) == ("profile", "workspaces", "invites")
+    assert elapsed < 0.35
+
+
+@pytest.mark.asyncio
+async def test_dependent_call_sees_its_dependency_and_waits_for_it():
+    async def greeting(ctx):
+        return f"hello {ctx['user']}"
+
+    view = View("chain", user=Call(sleeper(0.05, "ann")), greeting=Call(greeting, after=("user",)))
+
+    assert (await view.resolve())["greeting"] == "hello ann"
+
+
+@pytest.mark.asyncio
+async def test_required_call_timeout_fails_the_view_with_504():
+    view = View("slow", fast=Call(sleeper(0, 1)), slow=Call(sleeper(1, 2), timeout=0.05))
+
+    started = time.perf_counter()
+    with pytest.raises(HTTPException) as raised:
+        await view.resolve()
+
+    assert raised.value.status_code == 504
+    assert time.perf_counter() - started < 0.5
+
+
+@pytest.mark.asyncio
+async def test_optional_failures_use_their_fallback():
+    view = View(
+        "partial",
+        profile=Call(sleeper(0, "profile")),
+        invites=Call(failing, required=False, fallback=[]),
+        activity=Call(sleeper(1, ["late"]), timeout=0.05, required=False, fallback=[]),
+    )
+
+    result = await view.resolve()
+
+    assert (result["profile"], result["invites"], result["activity"]) == ("profile", [], [])
+    assert set(result.errors) == {"invites", "activity"}
+
+
+@pytest.mark.asyncio
+async def test_required_failure_fails_the_view_and_cancels_the_rest():
+    cancelled = asyncio.Event()
+
+    async def long_call(ctx):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    view = View("broken", profile=Call(failing), workspaces=Call(long_call))
+
+    with pytest.raises(RuntimeError, match="upstream down"):
+        await view.resolve()
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_memo_is_shared_within_a_request_only():
+    fetches = []
+
+    async def fetch_user():
+        fetches.append(1)
+        await asyncio.sleep(0.05)
+        return {"id": "42"}
+
+    async def via_memo(ctx):
+        return await ctx.memo(("user", "42"), fetch_user)
+
+    view = View("memo", header=Call(via_memo), sidebar=Call(via_memo))
+
+    scope = RequestScope()
+    first = await view.resolve(scope)
+    again = await view.resolve(scope)
+    assert first["header"] == first["sidebar"] == again["header"] == {"id": "42"}
+    assert len(fetches) == 1
+
+    await view.resolve(RequestScope())
+    assert len(fetches) == 2
+
+
+def test_unknown_dependencies_and_cycles_are_rejected():
+    with pytest.raises(ValueError, match="unknown"):
+        View("bad", a=Call(failing, after=("missing",)))
+    with pytest.raises(ValueError, match="cycle"):
+        View("loop", a=Call(failing, after=("b",)), b=Call(failing, after=("a",)))
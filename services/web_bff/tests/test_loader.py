@@ -0,0 +1,100 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+
+from app import loader, upstreams
+from app.loader import DataLoader, canonical_id, fetch_records
+
+HUMAN_ID = str(uuid.uuid4())
+
+
+@pytest.fixture
+def human_service(monkeypatch):
+    """Route the shared "human" client to a handler the test controls."""
+    calls = []
+    state = {"batch": True, "fail": False}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if state["fail"]:
+            return httpx.Response(500, json={"error": "database unavailable"})
+        if request.url.path == "/batch":
+            if not state["batch"]:
+                return httpx.Response(404, json={"error": "Not Found"})
+            ids = request.url.params["ids"].split(",")
+            return httpx.Response(200, json=[{"id": canonical_id(i)} for i in ids if canonical_id(i) == HUMAN_ID])
+        item_id = request.url.path.lstrip("/")
+        if canonical_id(item_id) == HUMAN_ID:
+            return httpx.Response(200, json={"id": HUMAN_ID})
+        return httpx.Response(404, json={"error": "Not Found"})
+
+    monkeypatch.setitem(upstreams._clients, "human", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(loader, "_no_batch_endpoint", {})
+    return calls, state
+
+
+@pytest.mark.asyncio
+async def test_loads_in_one_tick_share_a_deduplicated_batch():
+    batches = []
+
+    async def batch_fn(keys):
+        batches.append(list(keys))
+        return {key: key * 2 for key in keys}
+
+    dataloader = DataLoader(batch_fn)
+    assert await asyncio.gather(dataloader.load(1), dataloader.load(2), dataloader.load(1)) == [2, 4, 2]
+    assert await dataloader.load(2) == 4
+    assert batches == [[1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_reaches_every_caller_and_is_retried():
+    attempts = []
+
+    async def batch_fn(keys):
+        attempts.append(keys)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream down")
+        return {key: "ok" for key in keys}
+
+    dataloader = DataLoader(batch_fn)
+    results = await asyncio.gather(dataloader.load("a"), dataloader.load("b"), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert await dataloader.load("a") == "ok"
+
+
+@pytest.mark.asyncio
+async def test_non_canonical_uuids_match_their_records(human_service):
+    upper, bare = HUMAN_ID.upper(), HUMAN_ID.replace("-", "")
+    records = await fetch_records("human", [upper, bare])
+    assert records[upper] == {"id": HUMAN_ID}
+    assert records[bare] == {"id": HUMAN_ID}
+
+
+@pytest.mark.asyncio
+async def test_missing_batch_endpoint_is_rechecked_after_the_ttl(human_service, monkeypatch):
+    calls, state = human_service
+    state["batch"] = False
+    assert await fetch_records("human", [HUMAN_ID]) == {HUMAN_ID: {"id": HUMAN_ID}}
+    assert calls == ["/batch", f"/{HUMAN_ID}"]
+
+    # Within the TTL the per-id fallback is used straight away
+    await fetch_records("human", [HUMAN_ID])
+    assert calls[2:] == [f"/{HUMAN_ID}"]
+
+    # Once it has passed, /batch is tried again and batching resumes
+    state["batch"] = True
+    monkeypatch.setattr(loader, "_no_batch_endpoint", {"human": 0.0})
+    await fetch_records("human", [HUMAN_ID])
+    assert calls[3:] == ["/batch"]
+    assert "human" not in loader._no_batch_endpoint
+
+
+@pytest.mark.asyncio
+async def test_upstream_errors_are_not_reported_as_missing(human_service):
+    _, state = human_service
+    state["fail"] = True
+    with pytest.raises(httpx.HTTPStatusError):
+        await fetch_records("human", [HUMAN_ID])
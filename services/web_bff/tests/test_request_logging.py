@@ -0,0 +1,48 @@
+import json
+
+from app.request_logging import REDACTED, redact_body, redact_headers
+
+
+def redact(text: str) -> str:
+    body = text.encode()
+    return redact_body(body, len(body))
+
+
+def test_json_password_with_spaces_is_redacted_whole():
+    logged = redact(json.dumps({"email": "a@example.com", "password": "correct horse battery staple"}))
+
+    assert "horse" not in logged and "staple" not in logged
+    assert json.loads(logged) == {"email": "a@example.com", "password": REDACTED}
+
+
+def test_json_value_with_escaped_quotes_and_commas_is_redacted_whole():
+    secret = 'p\\"a, ss"} word'
+    logged = redact(json.dumps({"new_password": secret, "name": "Ann"}))
+
+    assert json.loads(logged) == {"new_password": REDACTED, "name": "Ann"}
+
+
+def test_string_cut_off_by_the_prefix_limit_is_redacted_to_the_end():
+    body = json.dumps({"refresh_token": "abc def ghi"}).encode()
+    prefix = body[:-8]
+
+    logged = redact_body(prefix, len(body))
+
+    assert "abc" not in logged
+    assert logged.startswith(f'{{"refresh_token": "{REDACTED}"')
+    assert logged.endswith(f"... [{len(body)} bytes]")
+
+
+def test_form_and_non_string_values_are_redacted():
+    assert redact("username=ann&password=hunter2&next=/") == f"username=ann&password={REDACTED}&next=/"
+    assert redact('{"code": 123456, "state": "x"}') == f'{{"code": {REDACTED}, "state": "x"}}'
+
+
+def test_fields_that_only_contain_a_secret_name_are_kept():
+    assert json.loads(redact(json.dumps({"zipcode": "12345", "tokens_used": 3}))) == {"zipcode": "12345", "tokens_used": 3}
+
+
+def test_secret_headers_are_redacted():
+    headers = [(b"Authorization", b"Bearer abc"), (b"cookie", b"session=1"), (b"accept", b"application/json")]
+
+    assert redact_headers(headers) == {"Authorization": REDACTED, "cookie": REDACTED, "accept": "application/json"}
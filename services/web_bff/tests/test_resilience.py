@@ -0,0 +1,137 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app import resilience
+from app.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, ResilientTransport, RetryBudget
+
+
+def transport(handler, name="test") -> ResilientTransport:
+    return ResilientTransport(name, httpx.MockTransport(handler))
+
+
+def test_breaker_opens_at_the_failure_ratio():
+    breaker = CircuitBreaker("ratio")
+    for ok in [True] * (resilience.BREAKER_MIN_CALLS // 2) + [False] * (resilience.BREAKER_MIN_CALLS // 2 - 1):
+        breaker.record(ok)
+    assert breaker.state == CLOSED
+
+    breaker.record(False)
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_half_open_breaker_lets_one_probe_through(monkeypatch):
+    breaker = CircuitBreaker("probe")
+    breaker._open()
+    monkeypatch.setattr(resilience, "BREAKER_OPEN_SECONDS", 0)
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record(True)
+
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_the_breaker(monkeypatch):
+    breaker = CircuitBreaker("reprobe")
+    breaker._open()
+    monkeypatch.setattr(resilience, "BREAKER_OPEN_SECONDS", 0)
+    assert breaker.allow()
+
+    breaker.record(False)
+
+    assert breaker.state == OPEN
+
+
+def test_retry_budget_refills_by_ratio_up_to_the_cap():
+    budget = RetryBudget()
+    budget.tokens = 0
+
+    assert not budget.withdraw()
+    for _ in range(round(1 / resilience.UPSTREAM_RETRY_RATIO) + 1):
+        budget.deposit()
+    assert budget.withdraw()
+
+    for _ in range(10_000):
+        budget.deposit()
+    assert budget.tokens == resilience.UPSTREAM_RETRY_BUDGET
+
+
+@pytest.mark.asyncio
+async def test_get_is_retried_while_the_budget_lasts():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503 if len(calls) == 1 else 200)
+
+    async with httpx.AsyncClient(transport=transport(handler)) as client:
+        response = await client.get("http://upstream/items")
+
+    assert response.status_code == 200
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_no_retry_when_the_budget_is_empty_or_the_method_is_unsafe():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(503)
+
+    resilient = transport(handler)
+    resilient.budget.tokens = 0
+    async with httpx.AsyncClient(transport=resilient) as client:
+        assert (await client.get("http://upstream/items")).status_code == 503
+        resilient.budget.tokens = resilience.UPSTREAM_RETRY_BUDGET
+        assert (await client.post("http://upstream/items", json={})).status_code == 503
+
+    assert calls == ["GET", "POST"]
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_fails_fast_as_a_transport_error():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200)
+
+    resilient = transport(handler)
+    resilient.breaker._open()
+    async with httpx.AsyncClient(transport=resilient) as client:
+        with pytest.raises(httpx.RequestError) as raised:
+            await client.get("http://upstream/items")
+
+    assert isinstance(raised.value, CircuitOpenError)
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_hedge_is_sent_as_a_separate_request(monkeypatch):
+    monkeypatch.setattr(resilience, "UPSTREAM_HEDGE_DELAY_MS", 10)
+    sent = []
+
+    async def handler(request):
+        sent.append(request)
+        if len(sent) == 1:
+            await asyncio.sleep(1)
+            return httpx.Response(200, json={"copy": "primary"})
+        return httpx.Response(200, json={"copy": "hedge"})
+
+    async with httpx.AsyncClient(transport=transport(handler)) as client:
+        response = await client.get("http://upstream/items/1", headers={"x-test": "1"}, extensions={"hedge": True})
+
+    assert response.json() == {"copy": "hedge"}
+    primary, hedge = sent
+    assert primary is not hedge
+    assert hedge.url == primary.url
+    assert hedge.headers["x-test"] == "1"
+    assert hedge.extensions["hedge"] is True
@@ -0,0 +1,127 @@
+import time
+
+import httpx
+import pytest
+
+from fastapi import FastAPI
+
+from app import signed_token, upstreams
+from app.routes import auth
+from app.token_cache import TokenValidationCache
+from app.signed_token import RevocationFilter, SignedClaims, verify_access_token, verify_locally
+
+# Produced by services/auth (app/common/signed_token.py and bloom_filter.py) with
+# secret "test-secret": the BFF must read auth's tokens and filters as auth writes them.
+SECRET = "test-secret"
+ACTIVE = "st1.NDJ8c2Vzc2lvbi0xfHdlYl9icm93c2VyfDE3MDAwMDAwMDB8NDEwMjQ0NDgwMA.IsyB2JD-GoFm8cBBYH57TLgnSrfHwFBL8iKPhu0rATI"
+REVOKED = "st1.NDJ8c2Vzc2lvbi0yfHdlYl9icm93c2VyfDE3MDAwMDAwMDB8NDEwMjQ0NDgwMA._HmiWbivy08H-axt1aGgiDgh0PL6g8q-Z7lPuTihHek"
+# Bloom filter holding "session-2"
+FILTER = "AAAADwokSQ=="
+PROFILE = {"user": {"id": "42", "email": "user@example.com", "name": "Ann"}}
+
+
+@pytest.fixture
+def auth_service(monkeypatch):
+    """Serve FILTER from a fake auth and reset the BFF's cached copy."""
+    state = {"generated_at": int(time.time()), "status": 200, "calls": 0, "validations": []}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/validate":
+            state["validations"].append(request.headers.get("x-device-id"))
+            return httpx.Response(200, json=PROFILE)
+        state["calls"] += 1
+        assert request.url.path == "/api/internal/revocation-filter"
+        return httpx.Response(state["status"], json={"filter": FILTER, "generated_at": state["generated_at"]})
+
+    monkeypatch.setitem(upstreams._clients, "auth", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(signed_token, "SIGNED_TOKEN_SECRET", SECRET)
+    monkeypatch.setattr(signed_token, "revocation_filter", RevocationFilter())
+    return state
+
+
+def test_verifies_tokens_signed_by_auth():
+    assert verify_access_token(SECRET, ACTIVE) == SignedClaims("42", "session-1", "web_browser", 1700000000, 4102444800)
+    assert verify_access_token("other-secret", ACTIVE) is None
+    assert verify_access_token(SECRET, ACTIVE, now=4102444800) is None
+    assert verify_access_token(SECRET, ACTIVE[:-2] + "xx") is None
+
+
+def test_reads_the_filter_published_by_auth():
+    revocations = RevocationFilter()
+    revocations._load(FILTER, int(time.time()))
+
+    assert revocations.is_fresh()
+    assert revocations.might_be_revoked("session-2")
+    assert not revocations.might_be_revoked("session-1")
+
+
+@pytest.mark.asyncio
+async def test_active_token_is_accepted_locally(auth_service):
+    claims = await verify_locally(ACTIVE)
+
+    assert claims is not None and claims.session_id == "session-1"
+    assert auth_service["calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_revoked_session_falls_back_to_auth(auth_service):
+    assert await verify_locally(REVOKED) is None
+
+
+@pytest.mark.asyncio
+async def test_stale_or_missing_filter_falls_back_to_auth(auth_service):
+    auth_service["generated_at"] = int(time.time() - signed_token.REVOCATION_FILTER_MAX_AGE - 1)
+    assert await verify_locally(ACTIVE) is None
+
+    signed_token.revocation_filter = RevocationFilter()
+    auth_service["status"] = 503
+    assert await verify_locally(ACTIVE) is None
+
+
+@pytest.mark.asyncio
+async def test_nothing_is_verified_locally_without_a_secret(auth_service, monkeypatch):
+    monkeypatch.setattr(signed_token, "SIGNED_TOKEN_SECRET", "")
+
+    assert await verify_locally(ACTIVE) is None
+    assert auth_service["calls"] == 0
+
+
+async def validate(headers):
+    app = FastAPI()
+    app.include_router(auth.router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bff") as client:
+        return await client.get("/auth/validate", headers=headers)
+
+
+@pytest.fixture
+def validation_cache(monkeypatch):
+    cache = TokenValidationCache(ttl=30, negative_ttl=2, max_entries=100)
+    monkeypatch.setattr(auth, "token_validation_cache", cache)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_locally_verified_token_gets_the_same_payload_as_auth(auth_service, validation_cache):
+    first = await validate({"Authorization": f"Bearer {ACTIVE}"})
+    assert first.json() == PROFILE
+    assert len(auth_service["validations"]) == 1
+
+    # Another token of the same user, verified locally: the profile comes from the cache
+    validation_cache.invalidate_token(ACTIVE)
+    validation_cache.put_valid("opaque-token-of-42", PROFILE, "42")
+    again = await validate({"Authorization": f"Bearer {ACTIVE}"})
+
+    assert again.json() == PROFILE
+    assert len(auth_service["validations"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_token_presented_from_another_device_is_rejected(auth_service, validation_cache):
+    response = await validate({"Authorization": f"Bearer {ACTIVE}", "X-Device-ID": "ios_app"})
+
+    assert response.status_code == 401
+    assert auth_service["validations"] == []
+
+    response = await validate({"Authorization": f"Bearer {ACTIVE}", "X-Device-ID": "web_browser"})
+    assert response.json() == PROFILE
+    assert auth_service["validations"] == ["web_browser"]
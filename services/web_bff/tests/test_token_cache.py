@@ -0,0 +1,67 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app import upstreams
+from app.routes import auth
+from app.token_cache import TokenValidationCache, token_key
+
+VALID = {"user": {"id": "42"}}
+
+
+def cache() -> TokenValidationCache:
+    return TokenValidationCache(ttl=30, negative_ttl=2, max_entries=100)
+
+
+def test_logout_drops_every_cached_token_of_the_user():
+    tokens = cache()
+    tokens.put_valid("web-token", VALID, "42")
+    tokens.put_valid("phone-token", VALID, "42")
+    tokens.put_valid("other-user", {"user": {"id": "7"}}, "7")
+
+    tokens.invalidate_token("web-token")
+
+    assert tokens.get("web-token") is None
+    assert tokens.get("phone-token") is None
+    assert tokens.get("other-user") == (200, {"user": {"id": "7"}})
+
+
+def test_validation_from_before_an_invalidation_is_not_cached():
+    tokens = cache()
+    before = tokens.generation
+
+    tokens.invalidate_user("42")
+    tokens.put_valid("token", VALID, "42", generation=before)
+
+    assert tokens.get("token") is None
+
+
+def test_only_auth_rejections_are_cached_and_raw_tokens_are_not_kept():
+    tokens = cache()
+    tokens.put_rejected("revoked", 401, "Invalid access token")
+    tokens.put_rejected("auth-down", 503, "Service unavailable")
+
+    assert tokens.get("revoked") == (401, "Invalid access token")
+    assert tokens.get("auth-down") is None
+    assert list(tokens._entries) == [token_key("revoked")]
+
+
+@pytest.mark.asyncio
+async def test_validate_racing_a_logout_is_not_cached(monkeypatch):
+    tokens = cache()
+    monkeypatch.setattr(auth, "token_validation_cache", tokens)
+
+    def auth_service(request: httpx.Request) -> httpx.Response:
+        # The user logs out through this replica while auth is answering
+        tokens.invalidate_user("42")
+        return httpx.Response(200, json=VALID)
+
+    monkeypatch.setitem(upstreams._clients, "auth", httpx.AsyncClient(transport=httpx.MockTransport(auth_service)))
+    app = FastAPI()
+    app.include_router(auth.router)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bff") as client:
+        response = await client.get("/auth/validate", headers={"Authorization": "Bearer opaque-token"})
+
+    assert response.json() == VALID
+    assert tokens.get("opaque-token") is None